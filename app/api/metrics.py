@@ -0,0 +1,60 @@
+"""
+GET /metrics: métricas del proceso en formato de texto de Prometheus.
+Además de las que se registran por request (core.metrics), expone como
+gauges/contadores el estado que ya llevan el pool, el stream SSE, el
+worker de ejecución y los caches.
+
+Expone detalles internos (rutas, fallos de autenticación, pool): requiere
+X-Admin-Key salvo con METRICS_PUBLIC.
+"""
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+from core.metrics import CONTENT_TYPE, CounterFunc, GaugeFunc, registry
+from db.database import async_engine
+from db.pool_metrics import pool_metrics, pool_status
+from deps.deps import require_metrics
+from services.user_cache import user_cache
+import services.transaction_cache as transaction_cache
+from services.execution_worker import execution_worker
+from services.event_hub import event_hub
+
+
+def _estado_pool() -> dict:
+    estado = pool_status(async_engine.pool)
+    return {(clave,): estado[clave] for clave in ("checked_out", "idle", "overflow") if clave in estado}
+
+
+def _caches(clave: str) -> dict:
+    return {
+        ("users",): user_cache.stats()[clave],
+        ("transactions",): transaction_cache.stats()[clave],
+    }
+
+
+registry.registrar(GaugeFunc(
+    "db_pool_connections", "Conexiones del pool por estado", _estado_pool, ("state",)
+))
+registry.registrar(CounterFunc(
+    "db_pool_timeouts_total", "Checkouts que agotaron DB_POOL_TIMEOUT",
+    lambda: {(): pool_metrics.snapshot()["timeouts"]}
+))
+registry.registrar(GaugeFunc(
+    "sse_subscribers", "Suscriptores SSE abiertos", lambda: {(): event_hub.suscriptores}
+))
+registry.registrar(GaugeFunc(
+    "execution_in_flight", "Ejecuciones en curso en el worker", lambda: {(): execution_worker.en_curso}
+))
+registry.registrar(CounterFunc(
+    "cache_hits_total", "Aciertos de los caches en memoria", lambda: _caches("hits"), ("cache",)
+))
+registry.registrar(CounterFunc(
+    "cache_misses_total", "Fallos de los caches en memoria", lambda: _caches("misses"), ("cache",)
+))
+
+
+api_router = APIRouter()
+
+
+@api_router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics)])
+async def metricas():
+    return Response(registry.exponer(), media_type=CONTENT_TYPE)
@@ -1,34 +1,75 @@
 from schemas.user import UsuarioBase, EmailStr, BaseModel, UsuarioCreate, UsuarioResponse
 from schemas.token import BaseModel, Token
-from crud.user import crear_usuario, obtener_usuario_por_email
+from crud.user import crear_usuario, obtener_usuario_por_email, cambiar_estado_usuario
 from fastapi import Depends, HTTPException, status, APIRouter
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
-from core.security import verify_password, crear_token
-from deps.deps import get_current_user, get_db
+from core.security import verify_password_async, crear_token, verificar_token
+from core.revocation import revocation_list
+from core.metrics import registrar_fallo_auth
+from deps.deps import get_current_user, get_db, oauth2_scheme, require_admin
 
 api_router = APIRouter(tags=["Authentication"])
 
 @api_router.post("/usuarios", response_model=UsuarioResponse, status_code=status.HTTP_201_CREATED)
-def registrar_usuario(usuario: UsuarioCreate, db: Session = Depends(get_db)):
+async def registrar_usuario(usuario: UsuarioCreate, db: AsyncSession = Depends(get_db)):
     try:
-        return crear_usuario(db, usuario)
+        return await crear_usuario(db, usuario)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 @api_router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = obtener_usuario_por_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await obtener_usuario_por_email(db, form_data.username)
+    if not user:
+        registrar_fallo_auth("v1", "invalid_credentials")
         raise HTTPException(status_code=401, detail="Credenciales invalidas")
     
+    # bcrypt corre en el pool de procesos, fuera del event loop
+    valido, nuevo_hash = await verify_password_async(form_data.password, user.hashed_password)
+    if not valido:
+        registrar_fallo_auth("v1", "invalid_credentials")
+        raise HTTPException(status_code=401, detail="Credenciales invalidas")
+    
+    if not user.is_active:
+        registrar_fallo_auth("v1", "disabled")
+        raise HTTPException(status_code=403, detail="Usuario deshabilitado. Contacte al administrador.")
+    
+    # Rehash transparente si cambió BCRYPT_ROUNDS
+    if nuevo_hash:
+        user.hashed_password = nuevo_hash
+        await db.commit()
+    
     # Validar que el usuario tenga rol asignado
     if not user.role:
         raise HTTPException(status_code=403, detail="Usuario sin rol asignado. Contacte al administrador.")
     
-    token = crear_token(sub=user.email, role=user.role.value)
+    token = crear_token(sub=user.email, role=user.role.value, user_id=user.user_id, nombre=user.nombre)
     return {"access_token": token, "token_type": "bearer"}
 
 @api_router.get("/usuarios/me", response_model=UsuarioResponse)
-def leer_perfil(current_user = Depends(get_current_user)):
-    return current_user
\ No newline at end of file
+async def leer_perfil(current_user = Depends(get_current_user)):
+    return current_user
+
+@api_router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token: str = Depends(oauth2_scheme)):
+    # Revoca el token actual (lista de revocación en memoria del worker)
+    payload = verificar_token(token)
+    if payload is None:
+        raise HTTPException(status_code=401, detail="No autenticado")
+    revocation_list.revocar_token(payload.get("jti"), payload.get("exp"))
+
+@api_router.post("/usuarios/{user_id}/disable", response_model=UsuarioResponse, dependencies=[Depends(require_admin)])
+async def deshabilitar_usuario(user_id: str, db: AsyncSession = Depends(get_db)):
+    # Revoca todos sus tokens (en este worker al instante, en el resto al sincronizar)
+    usuario = await cambiar_estado_usuario(db, user_id, activo=False)
+    if usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return usuario
+
+@api_router.post("/usuarios/{user_id}/enable", response_model=UsuarioResponse, dependencies=[Depends(require_admin)])
+async def habilitar_usuario(user_id: str, db: AsyncSession = Depends(get_db)):
+    usuario = await cambiar_estado_usuario(db, user_id, activo=True)
+    if usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return usuario
@@ -1,10 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from schemas.transaction import TransactionCreate, TransactionResponse, MessageResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.transaction import (
+    TransactionCreate,
+    TransactionBatchCreate,
+    TransactionBatchTransition,
+    TransactionResponse,
+    BatchCreateResponse,
+    BatchTransitionResponse,
+    MessageResponse,
+    TransactionFilters,
+    TransactionEventResponse
+)
 from services.transaction_service import TransactionService
-from deps.auth import get_user_role, get_user_id
+from deps.auth import require_operador, require_aprobador, get_user_id, get_optional_user_id
 from deps.deps import get_db
+from deps.filters import get_transaction_filters
 import crud.transaction as crud_transaction
+from core.pagination import NEXT_CURSOR_HEADER, decode_cursor, siguiente_cursor
+from core.serialization import respuesta_transacciones
+from core.etag import ETAG_HEADER, coincide, etag_pagina, no_modificado
+from services.transaction_cache import obtener_etag, obtener_transaccion_cacheada, respuesta_cacheada
 
 
 api_router = APIRouter(tags=["v1 - Transactions"])
@@ -68,9 +84,9 @@ api_router = APIRouter(tags=["v1 - Transactions"])
 )
 async def crear_transaccion(
     transaccion: TransactionCreate,
-    user_role: str = Depends(get_user_role),
+    user_role: str = Depends(require_operador),
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Reglas:
@@ -83,7 +99,44 @@ async def crear_transaccion(
     - `X-User-Role`: OPERADOR
     - `X-User-Id`: Identificador del operador
     """
-    return TransactionService.crear_transaccion(db, transaccion, user_id, user_role)
+    return await TransactionService.crear_transaccion(db, transaccion, user_id, user_role)
+
+
+@api_router.post(
+    "/transactions/batch",
+    response_model=BatchCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Crear transacciones en lote",
+    description="Crea varias transacciones con un solo INSERT. Solo usuarios con rol OPERADOR.",
+    responses={
+        201: {"description": "Todas las transacciones fueron creadas"},
+        207: {"description": "Lote parcial (atomic=false): se crearon las válidas, ver `results`"},
+        409: {"description": "Lote atómico rechazado: no se creó ninguna, ver `results`"}
+    }
+)
+async def crear_transacciones_lote(
+    lote: TransactionBatchCreate,
+    response: Response,
+    user_role: str = Depends(require_operador),
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ## Reglas:
+    - Solo rol **OPERADOR** puede crear transacciones
+    - Todas se crean en estado **DRAFT**
+    - `atomic=true` (default): si algún elemento es inválido o su referencia ya existe, no se crea ninguno
+    - `atomic=false`: se crean los válidos y cada elemento reporta su resultado
+    
+    ## Headers requeridos:
+    - `X-User-Role`: OPERADOR
+    - `X-User-Id`: Identificador del operador
+    """
+    resultado = await TransactionService.crear_transacciones_lote(
+        db, lote.items, user_id, user_role, atomic=lote.atomic
+    )
+    response.status_code = TransactionService.codigo_http_lote(resultado)
+    return resultado
 
 
 @api_router.post(
@@ -132,8 +185,9 @@ async def crear_transaccion(
 )
 async def enviar_a_aprobacion(
     transaction_id: str,
-    user_role: str = Depends(get_user_role),
-    db: Session = Depends(get_db)
+    user_role: str = Depends(require_operador),
+    user_id: Optional[str] = Depends(get_optional_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Reglas:
@@ -143,8 +197,9 @@ async def enviar_a_aprobacion(
     
     ## Headers requeridos:
     - `X-User-Role`: OPERADOR
+    - `X-User-Id` (opcional): se registra en el historial
     """
-    transaction = TransactionService.enviar_a_aprobacion(db, transaction_id, user_role)
+    transaction = await TransactionService.enviar_a_aprobacion(db, transaction_id, user_role, user_id)
     return MessageResponse(
         message="Transacción enviada a aprobación exitosamente",
         transaction_id=transaction.transaction_id,
@@ -198,9 +253,9 @@ async def enviar_a_aprobacion(
 )
 async def aprobar_transaccion(
     transaction_id: str,
-    user_role: str = Depends(get_user_role),
+    user_role: str = Depends(require_aprobador),
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Reglas:
@@ -212,7 +267,7 @@ async def aprobar_transaccion(
     - `X-User-Role`: APROBADOR
     - `X-User-Id`: Identificador del aprobador
     """
-    transaction = TransactionService.aprobar_transaccion(db, transaction_id, user_id, user_role)
+    transaction = await TransactionService.aprobar_transaccion(db, transaction_id, user_id, user_role)
     return MessageResponse(
         message="Transacción aprobada exitosamente",
         transaction_id=transaction.transaction_id,
@@ -266,8 +321,9 @@ async def aprobar_transaccion(
 )
 async def rechazar_transaccion(
     transaction_id: str,
-    user_role: str = Depends(get_user_role),
-    db: Session = Depends(get_db)
+    user_role: str = Depends(require_aprobador),
+    user_id: Optional[str] = Depends(get_optional_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Reglas:
@@ -277,8 +333,9 @@ async def rechazar_transaccion(
     
     ## Headers requeridos:
     - `X-User-Role`: APROBADOR
+    - `X-User-Id` (opcional): necesario para rechazar una transacción reservada por uno mismo
     """
-    transaction = TransactionService.rechazar_transaccion(db, transaction_id, user_role)
+    transaction = await TransactionService.rechazar_transaccion(db, transaction_id, user_role, user_id)
     return MessageResponse(
         message="Transacción rechazada",
         transaction_id=transaction.transaction_id,
@@ -289,26 +346,28 @@ async def rechazar_transaccion(
 @api_router.post(
     "/transactions/{transaction_id}/execute",
     response_model=MessageResponse,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Ejecutar transacción",
-    description="Ejecuta una transacción aprobada (simulado).",
+    description="Encola la ejecución de una transacción aprobada. La liquidación la hace un worker "
+                "en segundo plano; la transacción pasa a EXECUTED al completarse.",
     responses={
-        200: {
-            "description": "Transacción ejecutada exitosamente",
+        202: {
+            "description": "Ejecución encolada",
             "content": {
                 "application/json": {
                     "example": {
-                        "message": "Transacción ejecutada exitosamente (simulado)",
+                        "message": "Ejecución encolada",
                         "transaction_id": "550e8400-e29b-41d4-a716-446655440000",
-                        "status": "EXECUTED"
+                        "status": "APPROVED"
                     }
                 }
             }
         },
-        400: {
-            "description": "Error de validación - estado inválido",
+        409: {
+            "description": "Estado inválido",
             "content": {
                 "application/json": {
-                    "example": {"detail": "Solo se pueden ejecutar transacciones en estado APPROVED"}
+                    "example": {"detail": "Solo se pueden ejecutar transacciones en estado APPROVED. Estado actual: DRAFT"}
                 }
             }
         },
@@ -326,15 +385,80 @@ async def rechazar_transaccion(
 # Ejecuta transacciones en estado APPROVED
 async def ejecutar_transaccion(
     transaction_id: str,
-    db: Session = Depends(get_db)
+    user_id: Optional[str] = Depends(get_optional_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
-    transaction = TransactionService.ejecutar_transaccion(db, transaction_id)
+    transaction = await TransactionService.ejecutar_transaccion(db, transaction_id, user_id)
     return MessageResponse(
-        message="Transacción ejecutada exitosamente",
+        message="Ejecución encolada",
         transaction_id=transaction.transaction_id,
         status=transaction.status
     )
 
+@api_router.post(
+    "/transactions/approve:batch",
+    response_model=BatchTransitionResponse,
+    summary="Aprobar transacciones en lote",
+    description="Aprueba varias transacciones con un solo UPDATE. Solo APROBADOR. "
+                "Cada ID reporta ok, not_found o wrong_state."
+)
+async def aprobar_transacciones_lote(
+    lote: TransactionBatchTransition,
+    user_role: str = Depends(require_aprobador),
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ## Headers requeridos:
+    - `X-User-Role`: APROBADOR
+    - `X-User-Id`: Identificador del aprobador
+    """
+    return await TransactionService.aprobar_lote(db, lote.transaction_ids, user_id, user_role)
+
+
+@api_router.post(
+    "/transactions/reject:batch",
+    response_model=BatchTransitionResponse,
+    summary="Rechazar transacciones en lote",
+    description="Rechaza varias transacciones con un solo UPDATE. Solo APROBADOR. "
+                "Cada ID reporta ok, not_found o wrong_state."
+)
+async def rechazar_transacciones_lote(
+    lote: TransactionBatchTransition,
+    user_role: str = Depends(require_aprobador),
+    user_id: Optional[str] = Depends(get_optional_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ## Headers requeridos:
+    - `X-User-Role`: APROBADOR
+    - `X-User-Id` (opcional): necesario para rechazar transacciones reservadas por uno mismo
+    """
+    return await TransactionService.rechazar_lote(db, lote.transaction_ids, user_role, user_id)
+
+
+@api_router.post(
+    "/transactions/execute:batch",
+    response_model=BatchTransitionResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Ejecutar transacciones en lote",
+    description="Encola la ejecución de varias transacciones aprobadas. Solo APROBADOR. "
+                "Cada ID reporta ok (encolada), not_found o wrong_state."
+)
+async def ejecutar_transacciones_lote(
+    lote: TransactionBatchTransition,
+    user_role: str = Depends(require_aprobador),
+    user_id: Optional[str] = Depends(get_optional_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ## Headers requeridos:
+    - `X-User-Role`: APROBADOR
+    - `X-User-Id` (opcional): queda como actor del evento de ejecución
+    """
+    return await TransactionService.ejecutar_lote(db, lote.transaction_ids, user_id)
+
+
 # Retorna toda la información de una transacción específica.
 @api_router.get(
     "/transactions/{transaction_id}",
@@ -344,17 +468,39 @@ async def ejecutar_transaccion(
 )
 async def consultar_transaccion(
     transaction_id: str,
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    transaction = crud_transaction.obtener_transaccion_por_id(db, transaction_id)
+    if if_none_match:
+        # Revalidación: basta con el ETag (del cache o de updated_at), sin serializar la fila
+        etag = await obtener_etag(db, transaction_id)
+        if etag is not None and coincide(if_none_match, etag):
+            return no_modificado(etag)
+    
+    # Read-through: un hit no consulta la BD ni serializa
+    entrada = await obtener_transaccion_cacheada(db, transaction_id)
     
-    if not transaction:
+    if not entrada:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transacción no encontrada"
         )
     
-    return transaction
+    return respuesta_cacheada(entrada)
+
+
+# Bitácora de auditoría de una transacción
+@api_router.get(
+    "/transactions/{transaction_id}/history",
+    response_model=List[TransactionEventResponse],
+    summary="Historial de transacción",
+    description="Eventos de la transacción en orden: creación, transiciones (con su actor) y ejecución."
+)
+async def historial_transaccion(
+    transaction_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    return await TransactionService.obtener_historial(db, transaction_id)
 
 
 # Endpoint adicional: Listar todas las transacciones
@@ -362,11 +508,27 @@ async def consultar_transaccion(
     "/transactions",
     response_model=list[TransactionResponse],
     summary="Listar transacciones",
-    description="Lista todas las transacciones."
+    description="Lista todas las transacciones ordenadas por fecha de creación. "
+                "Acepta filtros por estado, moneda, creador, aprobador, rango de monto y de fechas. "
+                "Para la siguiente página enviar el header X-Next-Cursor como `cursor`."
 )
 async def listar_transacciones(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    filtros: TransactionFilters = Depends(get_transaction_filters),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    return crud_transaction.obtener_todas_transacciones(db, skip=skip, limit=limit)
+    transactions = await crud_transaction.obtener_todas_transacciones(
+        db, skip=skip, limit=limit, cursor=decode_cursor(cursor) if cursor else None, filtros=filtros
+    )
+    
+    next_cursor = siguiente_cursor(transactions, limit)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    headers[ETAG_HEADER] = etag_pagina(transactions)
+    if coincide(if_none_match, headers[ETAG_HEADER]):
+        return no_modificado(headers[ETAG_HEADER], headers)
+    
+    # Filas ya validadas: serialización directa sin re-validar con Pydantic
+    return respuesta_transacciones(transactions, headers=headers)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
-from api.v2 import transactions
+from api.v2 import transactions, approvals, monitoring
 
 api_router = APIRouter()
 
 api_router.include_router(transactions.api_router)
+api_router.include_router(approvals.api_router)
+api_router.include_router(monitoring.api_router)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import setting
+from schemas.transaction import ClaimResponse
+from services.transaction_service import TransactionService
+from deps.auth_v2 import require_aprobador_v2
+from deps.deps import get_db
+
+
+api_router = APIRouter(tags=["v2 - Approvals"])
+
+
+@api_router.post(
+    "/approvals/claim",
+    response_model=ClaimResponse,
+    summary="Reservar transacciones pendientes (v2 - JWT)",
+    description="Reserva al aprobador las siguientes `n` transacciones PENDING_APPROVAL sin reserva vigente. "
+                "Aprobadores concurrentes nunca reciben la misma transacción; mientras la reserva esté "
+                "vigente solo quien la tiene puede aprobarla o rechazarla. Solo APROBADOR."
+)
+async def reservar_aprobaciones_v2(
+    n: int = Query(10, ge=1, le=setting.APPROVAL_CLAIM_MAX, description="Cantidad a reservar"),
+    current_user = Depends(require_aprobador_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    return await TransactionService.reservar_aprobaciones(
+        db, n, current_user.user_id, current_user.role.value
+    )
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends
+from core.config import setting
+from deps.deps import require_admin
+from db.database import async_engine
+from db.pool_metrics import pool_status
+from services.user_cache import user_cache
+import services.transaction_cache as transaction_cache
+from services.execution_worker import execution_worker
+from services.event_hub import event_hub
+
+
+# Estado interno del proceso: solo administradores (X-Admin-Key)
+api_router = APIRouter(tags=["v2 - Monitoring"], dependencies=[Depends(require_admin)])
+
+
+@api_router.get(
+    "/monitoring/pool",
+    summary="Estado del pool de conexiones",
+    description="Conexiones en uso, libres y en overflow del worker actual, con tiempos de espera por checkout."
+)
+async def estado_pool():
+    return {
+        "config": {
+            "pool_size": setting.DB_POOL_SIZE,
+            "max_overflow": setting.DB_MAX_OVERFLOW,
+            "pool_timeout": setting.DB_POOL_TIMEOUT,
+            "pool_recycle": setting.DB_POOL_RECYCLE,
+            "pool_pre_ping": setting.DB_POOL_PRE_PING,
+        },
+        "pool": pool_status(async_engine.pool),
+    }
+
+
+@api_router.get(
+    "/monitoring/cache",
+    summary="Estado de los caches en memoria",
+    description="Tamaño, hits, misses y expulsiones de los caches del worker actual."
+)
+async def estado_cache():
+    return {
+        "users": user_cache.stats(),
+        "transactions": transaction_cache.stats(),
+    }
+
+
+@api_router.get(
+    "/monitoring/executor",
+    summary="Estado del worker de ejecución",
+    description="Contadores del worker de ejecución en segundo plano de este proceso."
+)
+async def estado_executor():
+    return execution_worker.stats()
+
+
+@api_router.get(
+    "/monitoring/stream",
+    summary="Estado del stream de eventos",
+    description="Suscriptores SSE, eventos publicados y entregados y clientes desconectados por lentos en este proceso."
+)
+async def estado_stream():
+    return event_hub.stats()
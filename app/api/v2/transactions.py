@@ -1,17 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from schemas.transaction import TransactionCreateV2, TransactionResponse, MessageResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.transaction import (
+    TransactionCreateV2,
+    TransactionBatchCreateV2,
+    TransactionBatchTransition,
+    TransactionResponse,
+    BatchCreateResponse,
+    BatchTransitionResponse,
+    MessageResponse,
+    TransactionFilters,
+    TransactionSummaryResponse,
+    TransactionEventResponse
+)
 from services.transaction_service import TransactionService
 from services.reference_service import ReferenceService
+from services.export_service import ExportService
+from services.summary_service import SummaryService
+from services.event_hub import event_hub
+from models.transaction import UserRole
 from deps.auth_v2 import (
     get_current_user_v2,
     require_operador_v2,
     require_aprobador_v2
 )
 from deps.deps import get_db
+from deps.filters import get_transaction_filters
 import crud.transaction as crud_transaction
 from crud.transaction import crear_transaccion
 from schemas.transaction import TransactionCreate
+from core.pagination import NEXT_CURSOR_HEADER, decode_cursor, siguiente_cursor
+from core.serialization import respuesta_transacciones
+from core.etag import ETAG_HEADER, coincide, etag_pagina, no_modificado
+from services.transaction_cache import obtener_etag, obtener_transaccion_cacheada, respuesta_cacheada
 
 
 api_router = APIRouter(tags=["v2 - Transactions (JWT + Auto-Reference)"])
@@ -27,10 +49,11 @@ api_router = APIRouter(tags=["v2 - Transactions (JWT + Auto-Reference)"])
 async def crear_transaccion_v2(
     transaccion: TransactionCreateV2,
     current_user = Depends(require_operador_v2),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
 
-    reference = ReferenceService.generar_siguiente_reference(db)
+    # En la transacción del request: si la creación falla, el número se devuelve
+    reference = await ReferenceService.generar_siguiente_reference(db)
     
     transaccion_completa = TransactionCreate(
         reference=reference,
@@ -41,13 +64,38 @@ async def crear_transaccion_v2(
     user_id = current_user.user_id
     user_role = current_user.role.value
     
-    transaction = TransactionService.crear_transaccion(
+    transaction = await TransactionService.crear_transaccion(
         db, transaccion_completa, user_id, user_role
     )
     
     return transaction
 
 
+@api_router.post(
+    "/transactions/batch",
+    response_model=BatchCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Crear transacciones en lote (v2 - JWT + Reference Auto)",
+    description="Crea varias transacciones con un solo INSERT. Las referencias se reservan en un solo paso, después de validar el lote.",
+    responses={
+        201: {"description": "Todas las transacciones fueron creadas"},
+        207: {"description": "Lote parcial (atomic=false): se crearon las válidas, ver `results`"},
+        409: {"description": "Lote atómico rechazado: no se creó ninguna, ver `results`"}
+    }
+)
+async def crear_transacciones_lote_v2(
+    lote: TransactionBatchCreateV2,
+    response: Response,
+    current_user = Depends(require_operador_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    resultado = await TransactionService.crear_transacciones_lote_v2(
+        db, lote.items, current_user.user_id, current_user.role.value, atomic=lote.atomic
+    )
+    response.status_code = TransactionService.codigo_http_lote(resultado)
+    return resultado
+
+
 @api_router.post(
     "/transactions/{transaction_id}/submit",
     response_model=MessageResponse,
@@ -57,11 +105,13 @@ async def crear_transaccion_v2(
 async def enviar_a_aprobacion_v2(
     transaction_id: str,
     current_user = Depends(require_operador_v2),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
 
     user_role = current_user.role.value
-    transaction = TransactionService.enviar_a_aprobacion(db, transaction_id, user_role)
+    transaction = await TransactionService.enviar_a_aprobacion(
+        db, transaction_id, user_role, current_user.user_id
+    )
     
     return MessageResponse(
         message="Transacción enviada a aprobación exitosamente",
@@ -79,12 +129,12 @@ async def enviar_a_aprobacion_v2(
 async def aprobar_transaccion_v2(
     transaction_id: str,
     current_user = Depends(require_aprobador_v2),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     user_id = current_user.user_id 
     user_role = current_user.role.value
     
-    transaction = TransactionService.aprobar_transaccion(db, transaction_id, user_id, user_role)
+    transaction = await TransactionService.aprobar_transaccion(db, transaction_id, user_id, user_role)
     
     return MessageResponse(
         message=f"Transacción aprobada por {current_user.nombre} ({user_id})",
@@ -102,10 +152,12 @@ async def aprobar_transaccion_v2(
 async def rechazar_transaccion_v2(
     transaction_id: str,
     current_user = Depends(require_aprobador_v2),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     user_role = current_user.role.value
-    transaction = TransactionService.rechazar_transaccion(db, transaction_id, user_role)
+    transaction = await TransactionService.rechazar_transaccion(
+        db, transaction_id, user_role, current_user.user_id
+    )
     
     return MessageResponse(
         message=f"Transacción rechazada por {current_user.nombre}",
@@ -117,23 +169,164 @@ async def rechazar_transaccion_v2(
 @api_router.post(
     "/transactions/{transaction_id}/execute",
     response_model=MessageResponse,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Ejecutar transacción (v2 - JWT)",
-    description="Ejecuta una transacción aprobada (simulado)."
+    description="Encola la ejecución de una transacción aprobada. La liquidación la hace un worker "
+                "en segundo plano; la transacción pasa a EXECUTED al completarse."
 )
 async def ejecutar_transaccion_v2(
     transaction_id: str,
     current_user = Depends(get_current_user_v2),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    transaction = TransactionService.ejecutar_transaccion(db, transaction_id)
+    transaction = await TransactionService.ejecutar_transaccion(db, transaction_id, current_user.user_id)
     
     return MessageResponse(
-        message=f"Transacción ejecutada por {current_user.nombre} (simulado)",
+        message=f"Ejecución encolada por {current_user.nombre}",
         transaction_id=transaction.transaction_id,
         status=transaction.status
     )
 
 
+@api_router.post(
+    "/transactions/approve:batch",
+    response_model=BatchTransitionResponse,
+    summary="Aprobar transacciones en lote (v2 - JWT)",
+    description="Aprueba varias transacciones con un solo UPDATE. Cada ID reporta ok, not_found o wrong_state."
+)
+async def aprobar_transacciones_lote_v2(
+    lote: TransactionBatchTransition,
+    current_user = Depends(require_aprobador_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    return await TransactionService.aprobar_lote(
+        db, lote.transaction_ids, current_user.user_id, current_user.role.value
+    )
+
+
+@api_router.post(
+    "/transactions/reject:batch",
+    response_model=BatchTransitionResponse,
+    summary="Rechazar transacciones en lote (v2 - JWT)",
+    description="Rechaza varias transacciones con un solo UPDATE. Cada ID reporta ok, not_found o wrong_state."
+)
+async def rechazar_transacciones_lote_v2(
+    lote: TransactionBatchTransition,
+    current_user = Depends(require_aprobador_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    return await TransactionService.rechazar_lote(
+        db, lote.transaction_ids, current_user.role.value, current_user.user_id
+    )
+
+
+@api_router.post(
+    "/transactions/execute:batch",
+    response_model=BatchTransitionResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Ejecutar transacciones en lote (v2 - JWT)",
+    description="Encola la ejecución de varias transacciones aprobadas. Solo APROBADOR. "
+                "Cada ID reporta ok (encolada), not_found o wrong_state."
+)
+async def ejecutar_transacciones_lote_v2(
+    lote: TransactionBatchTransition,
+    current_user = Depends(require_aprobador_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    return await TransactionService.ejecutar_lote(db, lote.transaction_ids, current_user.user_id)
+
+
+@api_router.get(
+    "/transactions/export",
+    summary="Exportar transacciones (v2 - JWT)",
+    description="Descarga en streaming (NDJSON o CSV) de las transacciones visibles para el usuario: "
+                "OPERADOR solo las suyas, APROBADOR todas. Memoria constante sin importar el volumen.",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}}
+)
+async def exportar_transacciones_v2(
+    formato: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    filtros: TransactionFilters = Depends(get_transaction_filters),
+    current_user = Depends(get_current_user_v2)
+):
+    # OPERADOR solo exporta sus transacciones; APROBADOR exporta todas
+    created_by = current_user.user_id if current_user.role == UserRole.OPERADOR else None
+    
+    query = crud_transaction.consulta_exportacion(created_by=created_by, filtros=filtros)
+    
+    media_type, filename = ExportService.FORMATOS[formato]
+    generador = ExportService.generar_csv(query) if formato == "csv" else ExportService.generar_ndjson(query)
+    
+    return StreamingResponse(
+        generador,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@api_router.get(
+    "/transactions/stream",
+    summary="Stream de eventos (v2 - JWT)",
+    description="Server-Sent Events con la creación y cada transición de las transacciones visibles para "
+                "el usuario: OPERADOR solo las suyas, APROBADOR todas. Para retomar tras una desconexión "
+                "se envía el último id recibido en Last-Event-ID (EventSource lo hace solo) o ?last_event_id=.",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}}
+)
+async def stream_transacciones_v2(
+    last_event_id: Optional[int] = Query(None, ge=0),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user = Depends(get_current_user_v2)
+):
+    if last_event_id_header is not None:
+        try:
+            last_event_id = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Last-Event-ID inválido"
+            )
+    
+    # OPERADOR solo recibe eventos de sus transacciones; APROBADOR de todas
+    created_by = current_user.user_id if current_user.role == UserRole.OPERADOR else None
+    
+    # Suscribirse antes de leer lo pendiente: lo que llegue mientras tanto queda en la cola
+    suscripcion = event_hub.suscribir(created_by)
+    if suscripcion is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Demasiados streams abiertos en este servidor. Reintente más tarde"
+        )
+    
+    pendientes = []
+    if last_event_id is not None:
+        try:
+            pendientes = await event_hub.pendientes_desde(last_event_id, created_by)
+        except Exception:
+            event_hub.cancelar(suscripcion)
+            raise
+    
+    return StreamingResponse(
+        event_hub.stream(suscripcion, pendientes),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@api_router.get(
+    "/transactions/summary",
+    response_model=TransactionSummaryResponse,
+    summary="Resumen de transacciones (v2 - JWT)",
+    description="Conteo y monto total por estado y moneda. Se mantiene de forma incremental, "
+                "por lo que responde en tiempo constante sin importar el volumen. Solo APROBADOR."
+)
+async def resumen_transacciones_v2(
+    current_user = Depends(require_aprobador_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    return await SummaryService.obtener_resumen(db)
+
+
 @api_router.get(
     "/transactions/{transaction_id}",
     response_model=TransactionResponse,
@@ -142,42 +335,80 @@ async def ejecutar_transaccion_v2(
 )
 async def consultar_transaccion_v2(
     transaction_id: str,
+    if_none_match: Optional[str] = Header(None),
     current_user = Depends(get_current_user_v2),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    transaction = crud_transaction.obtener_transaccion_por_id(db, transaction_id)
+    if if_none_match:
+        # Revalidación: basta con el ETag (del cache o de updated_at), sin serializar la fila
+        etag = await obtener_etag(db, transaction_id)
+        if etag is not None and coincide(if_none_match, etag):
+            return no_modificado(etag)
+    
+    # Read-through: un hit no consulta la BD ni serializa
+    entrada = await obtener_transaccion_cacheada(db, transaction_id)
     
-    if not transaction:
+    if not entrada:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transacción no encontrada"
         )
     
-    return transaction
+    return respuesta_cacheada(entrada)
+
+
+@api_router.get(
+    "/transactions/{transaction_id}/history",
+    response_model=list[TransactionEventResponse],
+    summary="Historial de transacción (v2 - JWT)",
+    description="Eventos de la transacción en orden: creación, transiciones (con su actor) y ejecución."
+)
+async def historial_transaccion_v2(
+    transaction_id: str,
+    current_user = Depends(get_current_user_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    return await TransactionService.obtener_historial(db, transaction_id)
 
 
 @api_router.get(
     "/transactions",
     response_model=list[TransactionResponse],
     summary="Listar transacciones (v2 - JWT)",
-    description="Lista transacciones del usuario autenticado."
+    description="Lista transacciones del usuario autenticado, ordenadas por fecha de creación. "
+                "Acepta filtros por estado, moneda, creador, aprobador, rango de monto y de fechas. "
+                "Para la siguiente página enviar el header X-Next-Cursor como `cursor`."
 )
 async def listar_transacciones_v2(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    filtros: TransactionFilters = Depends(get_transaction_filters),
+    if_none_match: Optional[str] = Header(None),
     current_user = Depends(get_current_user_v2),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
+    after = decode_cursor(cursor) if cursor else None
+    
     if current_user.role.value == "OPERADOR":
         # OPERADOR solo ve sus transacciones 
-        transactions = db.query(crud_transaction.Transaction).filter(
-            crud_transaction.Transaction.created_by == current_user.user_id
-        ).offset(skip).limit(limit).all()
+        transactions = await crud_transaction.obtener_transacciones_por_creador(
+            db, current_user.user_id, skip, limit, cursor=after, filtros=filtros
+        )
     else:
         # APROBADOR ve todas
-        transactions = crud_transaction.obtener_todas_transacciones(db, skip, limit)
+        transactions = await crud_transaction.obtener_todas_transacciones(
+            db, skip, limit, cursor=after, filtros=filtros
+        )
     
-    return transactions
+    next_cursor = siguiente_cursor(transactions, limit)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    headers[ETAG_HEADER] = etag_pagina(transactions)
+    if coincide(if_none_match, headers[ETAG_HEADER]):
+        return no_modificado(headers[ETAG_HEADER], headers)
+    
+    # Filas ya validadas: serialización directa sin re-validar con Pydantic
+    return respuesta_transacciones(transactions, headers=headers)
 
 
 @api_router.get(
@@ -186,11 +417,9 @@ async def listar_transacciones_v2(
     description="Muestra cuál será la próxima referencia que se generará."
 )
 async def preview_next_reference(
-    current_user = Depends(get_current_user_v2),
-    db: Session = Depends(get_db)
+    current_user = Depends(get_current_user_v2)
 ):
-    next_ref = ReferenceService.generar_siguiente_reference(db)
-    ultima_ref = ReferenceService.obtener_ultima_reference(db)
+    ultima_ref, next_ref = await ReferenceService.preview_references()
     
     return {
         "ultima_referencia": ultima_ref,
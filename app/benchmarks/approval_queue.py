@@ -0,0 +1,124 @@
+"""
+Benchmark de la cola de aprobación con varios aprobadores concurrentes.
+
+Crea un backlog de transacciones PENDING_APPROVAL y lo drena con K
+aprobadores en paralelo, en uno de dos modos:
+    claim: cada aprobador reserva con POST /api/v2/approvals/claim y aprueba lo suyo
+    race:  cada aprobador lista los pendientes y aprueba (modo anterior, con choques)
+
+Reporta throughput de aprobaciones, 409 recibidos y transacciones entregadas
+a más de un aprobador. Correr con distinto --approvers para ver cómo escala.
+
+Uso (desde la carpeta app/):
+    uvicorn main:app --port 8000
+    python -m benchmarks.approval_queue --base-url http://localhost:8000 --approvers 8 --backlog 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+
+
+async def _registrar_y_login(client: httpx.AsyncClient, role: str, etiqueta: str) -> dict:
+    sufijo = uuid.uuid4().hex[:8]
+    email = f"{etiqueta}-{sufijo}@example.com"
+    await client.post("/api/v1/auth/usuarios", json={
+        "nombre": f"Bench {etiqueta} {sufijo}", "email": email, "password": "bench-password", "role": role
+    })
+    response = await client.post("/api/v1/auth/login", data={"username": email, "password": "bench-password"})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def _crear_backlog(client: httpx.AsyncClient, operador: dict, total: int, concurrency: int):
+    ids = []
+    while len(ids) < total:
+        lote = min(500, total - len(ids))
+        response = await client.post(
+            "/api/v2/transactions/batch", headers=operador,
+            json={"items": [{"amount": "10.00", "currency": "USD"}] * lote}
+        )
+        response.raise_for_status()
+        ids.extend(r["transaction"]["transaction_id"] for r in response.json()["results"])
+
+    semaforo = asyncio.Semaphore(concurrency)
+
+    async def enviar(transaction_id: str):
+        async with semaforo:
+            await client.post(f"/api/v2/transactions/{transaction_id}/submit", headers=operador)
+
+    await asyncio.gather(*(enviar(i) for i in ids))
+
+
+async def correr(args) -> dict:
+    limits = httpx.Limits(max_connections=args.approvers * 2 + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=120) as client:
+        operador = await _registrar_y_login(client, "OPERADOR", "op")
+        aprobadores = [await _registrar_y_login(client, "APROBADOR", f"ap{i}") for i in range(args.approvers)]
+        await _crear_backlog(client, operador, args.backlog, args.approvers * 2)
+
+        entregadas: dict[str, int] = {}
+        aprobadas = 0
+        conflictos = 0
+
+        async def aprobador(headers: dict):
+            nonlocal aprobadas, conflictos
+            while True:
+                if args.mode == "claim":
+                    response = await client.post("/api/v2/approvals/claim", headers=headers, params={"n": args.n})
+                    lote = response.json()["transactions"]
+                else:
+                    response = await client.get(
+                        "/api/v2/transactions", headers=headers,
+                        params={"status": "PENDING_APPROVAL", "limit": args.n}
+                    )
+                    lote = response.json()
+                if not lote:
+                    return
+                for t in lote:
+                    entregadas[t["transaction_id"]] = entregadas.get(t["transaction_id"], 0) + 1
+                    r = await client.post(f"/api/v2/transactions/{t['transaction_id']}/approve", headers=headers)
+                    if r.status_code == 200:
+                        aprobadas += 1
+                    elif r.status_code == 409:
+                        conflictos += 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(aprobador(h) for h in aprobadores))
+        duracion = time.perf_counter() - inicio
+
+    return {
+        "mode": args.mode,
+        "approvers": args.approvers,
+        "backlog": args.backlog,
+        "aprobadas": aprobadas,
+        "conflictos_409": conflictos,
+        "entregadas_a_mas_de_uno": sum(1 for veces in entregadas.values() if veces > 1),
+        "duracion_s": round(duracion, 3),
+        "throughput_aprobaciones_s": round(aprobadas / duracion, 1) if duracion else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la cola de aprobación")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--mode", choices=["claim", "race"], default="claim")
+    parser.add_argument("--approvers", type=int, default=4)
+    parser.add_argument("--backlog", type=int, default=500)
+    parser.add_argument("--n", type=int, default=10, help="Transacciones por claim/listado")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(correr(args))
+    print(json.dumps(resultado, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultado, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
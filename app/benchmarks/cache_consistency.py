@@ -0,0 +1,151 @@
+"""
+Verificación de consistencia del cache de transacciones.
+
+Corre la app en proceso (sin servidor) con lectores concurrentes que
+consultan GET /api/v1/transactions/{id} mientras otra tarea lleva cada
+transacción por DRAFT → PENDING_APPROVAL → APPROVED → EXECUTED (la última
+por el worker de ejecución). Una lectura que empieza después de que una
+transición respondió nunca debe ver un estado anterior. --read-delay
+agrega una pausa aleatoria entre la lectura de la BD y el guardado en el
+cache para forzar la carrera lectura/invalidación; --no-guard desactiva la
+marca de invalidación para ver que sin ella sí hay lecturas viejas.
+
+Falla (exit 1) si hubo alguna lectura vieja. Usar una base de datos
+dedicada (se crean las tablas si no existen).
+
+Uso (desde la carpeta app/):
+    DATABASE_URL=sqlite:///./cache.db python -m benchmarks.cache_consistency --backend kv --read-delay 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+
+import httpx
+
+import init_db
+from core.cache import TTLCache
+import crud.transaction as crud_transaction
+import services.transaction_cache as transaction_cache
+from services.execution_worker import ExecutionWorker
+from services.gateway import MockGateway
+from main import app
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "cache-op"}
+APROBADOR = {"X-User-Role": "APROBADOR", "X-User-Id": "cache-ap"}
+ORDEN = {"DRAFT": 0, "PENDING_APPROVAL": 1, "APPROVED": 2, "EXECUTED": 3}
+
+
+async def correr(args) -> dict:
+    rng = random.Random(args.seed)
+    transaction_cache.transaction_cache = transaction_cache.crear_backend(args.backend)
+    if args.no_guard:
+        transaction_cache._invalidadas = TTLCache(max_size=0)
+
+    if args.read_delay > 0:
+        original = crud_transaction.obtener_transaccion_por_id
+
+        async def lectura_lenta(db, transaction_id):
+            transaction = await original(db, transaction_id)
+            await asyncio.sleep(rng.random() * args.read_delay)
+            return transaction
+
+        crud_transaction.obtener_transaccion_por_id = lectura_lenta
+
+    worker = ExecutionWorker(gateway=MockGateway(latencia=0.0), batch_size=args.transactions)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cache-check") as client:
+        prefijo = f"CC-{uuid.uuid4().hex[:8]}"
+        ids = []
+        for i in range(args.transactions):
+            response = await client.post("/api/v1/transactions", headers=OPERADOR, json={
+                "reference": f"{prefijo}-{i}", "amount": "10.00", "currency": "USD"
+            })
+            response.raise_for_status()
+            ids.append(response.json()["transaction_id"])
+
+        # transaction_id -> (estado mínimo esperado, hora en que la transición respondió)
+        confirmados = {i: (0, 0.0) for i in ids}
+        lecturas = 0
+        viejas = []
+        terminado = False
+
+        async def lector():
+            nonlocal lecturas
+            while not terminado:
+                transaction_id = rng.choice(ids)
+                minimo, desde = confirmados[transaction_id]
+                inicio = time.perf_counter()
+                response = await client.get(f"/api/v1/transactions/{transaction_id}")
+                lecturas += 1
+                visto = ORDEN[response.json()["status"]]
+                if inicio >= desde and visto < minimo:
+                    viejas.append({"transaction_id": transaction_id, "visto": visto, "esperado": minimo})
+
+        async def transicionar(transaction_id: str, accion: str, headers: dict, estado: str):
+            response = await client.post(f"/api/v1/transactions/{transaction_id}/{accion}", headers=headers)
+            response.raise_for_status()
+            if estado:
+                confirmados[transaction_id] = (ORDEN[estado], time.perf_counter())
+
+        lectores = [asyncio.create_task(lector()) for _ in range(args.readers)]
+        inicio = time.perf_counter()
+        for transaction_id in ids:
+            await transicionar(transaction_id, "submit", OPERADOR, "PENDING_APPROVAL")
+            await transicionar(transaction_id, "approve", APROBADOR, "APPROVED")
+            await transicionar(transaction_id, "execute", APROBADOR, None)
+            await asyncio.sleep(0)
+        while await worker.drenar():
+            pass
+        ejecutadas = time.perf_counter()
+        for transaction_id in ids:
+            confirmados[transaction_id] = (ORDEN["EXECUTED"], ejecutadas)
+
+        await asyncio.sleep(args.tail)
+        terminado = True
+        await asyncio.gather(*lectores)
+        duracion = time.perf_counter() - inicio
+
+    return {
+        "backend": args.backend,
+        "guard": not args.no_guard,
+        "transactions": args.transactions,
+        "readers": args.readers,
+        "read_delay_s": args.read_delay,
+        "reads": lecturas,
+        "stale_reads": len(viejas),
+        "stale_examples": viejas[:5],
+        "duration_s": round(duracion, 3),
+        "cache": transaction_cache.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificación de consistencia del cache de transacciones")
+    parser.add_argument("--backend", choices=["memory", "kv"], default="memory")
+    parser.add_argument("--transactions", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--read-delay", type=float, default=0.005, help="Pausa máxima entre leer la BD y guardar en cache")
+    parser.add_argument("--tail", type=float, default=0.5, help="Segundos de lecturas después de la última transición")
+    parser.add_argument("--no-guard", action="store_true", help="Desactivar la marca de invalidación")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    init_db.init_db()
+    resultado = asyncio.run(correr(args))
+    print(json.dumps(resultado, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultado, f, indent=2)
+
+    if resultado["stale_reads"] and not args.no_guard:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark de throughput con peticiones concurrentes.
+
+Lanza N peticiones concurrentes contra un servidor en ejecución y reporta
+throughput (req/s) y latencias. Sirve para comparar el comportamiento antes
+y después de un cambio: levantar el servidor en cada versión y correr el
+mismo comando.
+
+Uso (desde la carpeta app/):
+    uvicorn main:app --port 8000
+    python -m benchmarks.concurrency --base-url http://localhost:8000 --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+OPERADOR_HEADERS = {"X-User-Role": "OPERADOR", "X-User-Id": "op-bench"}
+
+
+def percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[k]
+
+
+async def _lanzar(client: httpx.AsyncClient, escenario: str) -> float:
+    inicio = time.perf_counter()
+    if escenario == "create":
+        response = await client.post(
+            "/api/v1/transactions",
+            headers=OPERADOR_HEADERS,
+            json={"reference": f"BENCH-{uuid.uuid4().hex[:12]}", "amount": "10.00", "currency": "USD"}
+        )
+    else:
+        response = await client.get("/api/v1/transactions", params={"limit": 20})
+    response.raise_for_status()
+    return time.perf_counter() - inicio
+
+
+async def correr(base_url: str, escenario: str, concurrency: int, total: int) -> dict:
+    latencias: list[float] = []
+    errores = 0
+    semaforo = asyncio.Semaphore(concurrency)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def tarea():
+            nonlocal errores
+            async with semaforo:
+                try:
+                    latencias.append(await _lanzar(client, escenario))
+                except httpx.HTTPError:
+                    errores += 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(tarea() for _ in range(total)))
+        duracion = time.perf_counter() - inicio
+
+    return {
+        "escenario": escenario,
+        "concurrency": concurrency,
+        "requests": total,
+        "errores": errores,
+        "duracion_s": round(duracion, 3),
+        "throughput_rps": round(len(latencias) / duracion, 1) if duracion else 0.0,
+        "latencia_ms": {
+            "media": round(statistics.fmean(latencias) * 1000, 2) if latencias else 0.0,
+            "p50": round(percentil(latencias, 50) * 1000, 2),
+            "p95": round(percentil(latencias, 95) * 1000, 2),
+            "p99": round(percentil(latencias, 99) * 1000, 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de peticiones concurrentes")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=["list", "create"], default="list")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(correr(args.base_url, args.scenario, args.concurrency, args.requests))
+    print(json.dumps(resultado, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultado, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
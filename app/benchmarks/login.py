@@ -0,0 +1,106 @@
+"""
+Benchmark de throughput de /auth/login.
+
+Simula una "tormenta de logins" concurrentes y, en paralelo, mide la latencia
+de un endpoint de transacciones para ver si el hash de contraseñas lo afecta.
+
+Uso (desde la carpeta app/):
+    uvicorn main:app --port 8000
+    python -m benchmarks.login --base-url http://localhost:8000 --register \
+        --email bench@example.com --password secret --concurrency 50 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.concurrency import percentil
+
+
+def _resumen(latencias: list[float]) -> dict:
+    return {
+        "requests": len(latencias),
+        "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+    }
+
+
+async def correr(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 5)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=120) as client:
+        if args.register:
+            await client.post("/api/v1/auth/usuarios", json={
+                "nombre": f"Bench {args.email}",
+                "email": args.email,
+                "password": args.password,
+                "role": "OPERADOR"
+            })
+
+        semaforo = asyncio.Semaphore(args.concurrency)
+        latencias_login: list[float] = []
+        latencias_probe: list[float] = []
+        errores = 0
+        terminado = asyncio.Event()
+
+        async def login():
+            nonlocal errores
+            async with semaforo:
+                inicio = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    data={"username": args.email, "password": args.password}
+                )
+                if response.status_code != 200:
+                    errores += 1
+                    return
+                latencias_login.append(time.perf_counter() - inicio)
+
+        async def probe():
+            # Endpoint de transacciones consultado mientras dura la tormenta
+            while not terminado.is_set():
+                inicio = time.perf_counter()
+                await client.get("/api/v1/transactions", params={"limit": 1})
+                latencias_probe.append(time.perf_counter() - inicio)
+                await asyncio.sleep(0.05)
+
+        tarea_probe = asyncio.create_task(probe())
+        inicio = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.requests)))
+        duracion = time.perf_counter() - inicio
+        terminado.set()
+        await tarea_probe
+
+    return {
+        "concurrency": args.concurrency,
+        "errores": errores,
+        "duracion_s": round(duracion, 3),
+        "login_throughput_rps": round(len(latencias_login) / duracion, 1) if duracion else 0.0,
+        "login": _resumen(latencias_login),
+        "transactions_probe": _resumen(latencias_probe),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de /auth/login")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default="bench-login@example.com")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--register", action="store_true", help="Registrar el usuario antes de empezar")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(correr(args))
+    print(json.dumps(resultado, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultado, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
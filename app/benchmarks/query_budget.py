@@ -0,0 +1,132 @@
+"""
+Presupuesto de consultas SQL por endpoint.
+
+Corre la app en proceso (sin servidor) y recorre el flujo completo con
+ambas APIs (v1 por headers, v2 con JWT). Cada request se envuelve en
+assert_max_queries con el máximo de consultas acordado para ese endpoint:
+una consulta de más (p.ej. releer la transacción tras el UPDATE) hace
+fallar el script (exit 1) listando las sentencias ejecutadas. Al agregar
+una consulta a propósito, actualizar PRESUPUESTO en el mismo cambio.
+
+Usar una base de datos dedicada (se crean las tablas si no existen).
+
+Uso (desde la carpeta app/):
+    DATABASE_URL=sqlite:///./budget.db python -m benchmarks.query_budget
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+
+import httpx
+
+import init_db
+from db.query_metrics import assert_max_queries
+from main import app
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "budget-op"}
+APROBADOR = {"X-User-Role": "APROBADOR", "X-User-Id": "budget-ap"}
+PASSWORD = "budget-secret"
+
+# Máximo de consultas por paso (el usuario JWT ya está en cache y el contador de referencias existe)
+PRESUPUESTO = {
+    "v1 crear": 3,
+    "v1 enviar": 3,
+    "v1 aprobar": 3,
+    "v1 consultar (miss)": 1,
+    "v1 consultar (hit)": 0,
+    "v1 listar": 1,
+    "v1 historial": 2,
+    "v1 ejecutar": 2,
+    "v1 transición inválida": 2,
+    "v2 login": 1,
+    "v2 crear": 4,
+    "v2 enviar": 3,
+    "v1 rechazar": 3,
+    "v2 consultar": 1,
+    "v2 listar": 1,
+    "v2 preview referencia": 1,
+}
+
+
+async def correr() -> list:
+    resultados = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://query-budget") as client:
+
+        async def paso(nombre: str, metodo: str, url: str, **kwargs) -> httpx.Response:
+            maximo = PRESUPUESTO[nombre]
+            try:
+                with assert_max_queries(maximo) as conteo:
+                    response = await client.request(metodo, url, **kwargs)
+                error = None
+            except AssertionError as e:
+                error = str(e)
+            resultados.append({"step": nombre, "queries": conteo.consultas, "max": maximo, "error": error})
+            return response
+
+        prefijo = f"QB-{uuid.uuid4().hex[:8]}"
+        response = await client.post("/api/v1/auth/usuarios", json={
+            "nombre": f"Budget {prefijo}", "email": f"{prefijo.lower()}@example.com",
+            "password": PASSWORD, "role": "OPERADOR"
+        })
+        response.raise_for_status()
+        email = response.json()["email"]
+
+        response = await paso("v1 crear", "POST", "/api/v1/transactions", headers=OPERADOR, json={
+            "reference": f"{prefijo}-1", "amount": "10.00", "currency": "USD"
+        })
+        transaction_id = response.json()["transaction_id"]
+        await paso("v1 enviar", "POST", f"/api/v1/transactions/{transaction_id}/submit", headers=OPERADOR)
+        await paso("v1 aprobar", "POST", f"/api/v1/transactions/{transaction_id}/approve", headers=APROBADOR)
+        await paso("v1 consultar (miss)", "GET", f"/api/v1/transactions/{transaction_id}")
+        await paso("v1 consultar (hit)", "GET", f"/api/v1/transactions/{transaction_id}")
+        await paso("v1 listar", "GET", "/api/v1/transactions", params={"limit": 20})
+        await paso("v1 historial", "GET", f"/api/v1/transactions/{transaction_id}/history")
+        await paso("v1 ejecutar", "POST", f"/api/v1/transactions/{transaction_id}/execute", headers=APROBADOR)
+        await paso("v1 transición inválida", "POST", f"/api/v1/transactions/{transaction_id}/submit", headers=OPERADOR)
+
+        response = await paso("v2 login", "POST", "/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+        jwt = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        # Sin medir: carga el usuario en cache y crea el contador TRX en una BD nueva
+        response = await client.post("/api/v2/transactions", headers=jwt, json={"amount": "1.00", "currency": "MXN"})
+        response.raise_for_status()
+        response = await paso("v2 crear", "POST", "/api/v2/transactions", headers=jwt, json={
+            "amount": "20.00", "currency": "MXN"
+        })
+        transaction_id = response.json()["transaction_id"]
+        await paso("v2 enviar", "POST", f"/api/v2/transactions/{transaction_id}/submit", headers=jwt)
+        await paso("v1 rechazar", "POST", f"/api/v1/transactions/{transaction_id}/reject", headers=APROBADOR)
+        await paso("v2 consultar", "GET", f"/api/v2/transactions/{transaction_id}", headers=jwt)
+        await paso("v2 listar", "GET", "/api/v2/transactions", headers=jwt, params={"limit": 20})
+        await paso("v2 preview referencia", "GET", "/api/v2/transactions/next-reference/preview", headers=jwt)
+
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presupuesto de consultas SQL por endpoint")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    init_db.init_db()
+    resultados = asyncio.run(correr())
+
+    for r in resultados:
+        marca = "OK  " if r["error"] is None else "FALLA"
+        print(f"{marca} {r['step']:<26} {r['queries']:>3} / {r['max']}")
+    fallidos = [r for r in resultados if r["error"]]
+    for r in fallidos:
+        print(f"\n[{r['step']}] {r['error']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+    if fallidos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Verificación de planes de consulta de los filtros de búsqueda.
+
+Siembra una tabla grande de transacciones, ejecuta ANALYZE y revisa el plan
+(EXPLAIN) de cada filtro del listado. Falla (exit 1) si alguno recorre la
+tabla completa: Seq Scan (o Index Scan sin condición) en PostgreSQL, SCAN
+en SQLite (incluido recorrer entero el índice de created_at filtrando fila
+por fila).
+
+Usar una base de datos dedicada: se crean las tablas si no existen y las
+filas sembradas (reference QP-*) se borran al terminar salvo --keep.
+
+Uso (desde la carpeta app/):
+    DATABASE_URL=sqlite:///./plans.db python -m benchmarks.query_plans --rows 100000
+"""
+import argparse
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from db.database import Base, engine
+from crud.transaction import _aplicar_filtros, _paginar
+from models.transaction import Transaction, TransactionStatus
+from schemas.transaction import TransactionFilters
+import init_db  # noqa: F401  (registra todos los modelos en Base)
+
+
+PREFIJO = "QP-"
+MONEDAS = ["USD", "EUR", "MXN", "COP", "CLP", "PEN", "ARS", "BRL"]
+INICIO = datetime(2024, 1, 1)
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compilar_explain(element, compiler, **kw):
+    if compiler.dialect.name == "postgresql":
+        prefijo = "EXPLAIN (FORMAT JSON) "
+    else:
+        prefijo = "EXPLAIN QUERY PLAN "
+    return prefijo + compiler.process(element.statement, **kw)
+
+
+def _filas(n: int, rng: random.Random):
+    estados = list(TransactionStatus)
+    for i in range(n):
+        creada = INICIO + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        estado = rng.choice(estados)
+        aprobada = estado in (TransactionStatus.APPROVED, TransactionStatus.EXECUTED)
+        yield {
+            "transaction_id": str(uuid.uuid4()),
+            "reference": f"{PREFIJO}{i:08d}",
+            "amount": Decimal(rng.randrange(100, 10_000_000)) / 100,
+            "currency": rng.choice(MONEDAS),
+            "status": estado,
+            "created_by": f"op-{rng.randrange(200):03d}",
+            "approved_by": f"ap-{rng.randrange(20):03d}" if aprobada else None,
+            "created_at": creada,
+            "updated_at": creada + timedelta(seconds=rng.randrange(7 * 24 * 3600)),
+        }
+
+
+def sembrar(conn, n: int, seed: int):
+    rng = random.Random(seed)
+    lote = []
+    for fila in _filas(n, rng):
+        lote.append(fila)
+        if len(lote) == 5000:
+            conn.execute(insert(Transaction), lote)
+            lote = []
+    if lote:
+        conn.execute(insert(Transaction), lote)
+    conn.execute(text("ANALYZE"))
+
+
+def escenarios():
+    """Filtros a verificar: uno por índice más las combinaciones usuales."""
+    dia = INICIO + timedelta(days=180)
+    return {
+        "status": TransactionFilters(status=TransactionStatus.PENDING_APPROVAL),
+        "currency": TransactionFilters(currency="EUR"),
+        "created_by": TransactionFilters(created_by="op-042"),
+        "approved_by": TransactionFilters(approved_by="ap-007"),
+        "amount_range": TransactionFilters(min_amount=Decimal("1000"), max_amount=Decimal("1010")),
+        "created_range": TransactionFilters(created_from=dia, created_to=dia + timedelta(days=1)),
+        "updated_range": TransactionFilters(updated_from=dia, updated_to=dia + timedelta(days=1)),
+        "created_by+status": TransactionFilters(created_by="op-042", status=TransactionStatus.DRAFT),
+        "status+currency": TransactionFilters(status=TransactionStatus.APPROVED, currency="USD"),
+    }
+
+
+def _nodos_pg(plan: dict):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from _nodos_pg(hijo)
+
+
+def analizar_plan(conn, query) -> tuple[list[str], bool]:
+    """Retorna (líneas del plan, usa_scan_completo)."""
+    filas = conn.execute(Explain(query)).all()
+
+    if conn.dialect.name == "postgresql":
+        documento = filas[0][0]
+        if isinstance(documento, str):
+            documento = json.loads(documento)
+        nodos = list(_nodos_pg(documento[0]["Plan"]))
+        lineas = [
+            f'{n["Node Type"]} {n.get("Index Name") or n.get("Relation Name") or ""}'.strip()
+            for n in nodos
+        ]
+        secuencial = any(
+            n.get("Relation Name") == Transaction.__tablename__
+            and (n["Node Type"] == "Seq Scan" or (n["Node Type"] == "Index Scan" and "Index Cond" not in n))
+            for n in nodos
+        )
+        return lineas, secuencial
+
+    # SQLite: (id, parent, notused, detail)
+    lineas = [fila[3] for fila in filas]
+    secuencial = any(linea.startswith(f"SCAN {Transaction.__tablename__}") for linea in lineas)
+    return lineas, secuencial
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica que los filtros de búsqueda usen índices")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--keep", action="store_true", help="No borrar las filas sembradas")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        sembrar(conn, args.rows, args.seed)
+
+    resultado = {}
+    fallidos = []
+    try:
+        with engine.connect() as conn:
+            for nombre, filtros in escenarios().items():
+                query = _paginar(_aplicar_filtros(select(Transaction), filtros), 0, args.limit, None)
+                lineas, secuencial = analizar_plan(conn, query)
+                resultado[nombre] = {"plan": lineas, "seq_scan": secuencial}
+                if secuencial:
+                    fallidos.append(nombre)
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(delete(Transaction).where(Transaction.reference.like(f"{PREFIJO}%")))
+
+    print(json.dumps({"rows": args.rows, "dialect": engine.dialect.name, "escenarios": resultado}, indent=2))
+
+    if fallidos:
+        print(f"Filtros con scan secuencial: {', '.join(fallidos)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
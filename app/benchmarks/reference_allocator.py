@@ -0,0 +1,100 @@
+"""
+Prueba de concurrencia del asignador de referencias TRX.
+
+Lanza varios procesos, cada uno creando transacciones v2 en paralelo
+contra la misma base de datos, y verifica que no haya referencias
+duplicadas ni creaciones fallidas.
+
+Uso (desde la carpeta app/, con DATABASE_URL apuntando a una BD de prueba):
+    python init_db.py
+    python -m benchmarks.reference_allocator --processes 4 --per-process 1000 --concurrency 25
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+from decimal import Decimal
+
+
+def _worker(per_process: int, concurrency: int, resultados) -> None:
+    from db.database import AsyncSessionLocal, async_engine
+    from schemas.transaction import TransactionCreate
+    from services.reference_service import ReferenceService
+    from services.transaction_service import TransactionService
+
+    async def crear(semaforo: asyncio.Semaphore) -> bool:
+        async with semaforo:
+            async with AsyncSessionLocal() as db:
+                reference = await ReferenceService.generar_siguiente_reference()
+                try:
+                    await TransactionService.crear_transaccion(
+                        db,
+                        TransactionCreate(reference=reference, amount=Decimal("1.00"), currency="USD"),
+                        "op-bench",
+                        "OPERADOR"
+                    )
+                    return True
+                except Exception:
+                    return False
+
+    async def correr():
+        semaforo = asyncio.Semaphore(concurrency)
+        ok = await asyncio.gather(*(crear(semaforo) for _ in range(per_process)))
+        await async_engine.dispose()
+        return sum(ok)
+
+    creadas = asyncio.run(correr())
+    resultados.put((creadas, per_process - creadas))
+
+
+async def _conteos() -> tuple[int, int]:
+    """Total de transacciones y referencias distintas."""
+    from sqlalchemy import func, select
+    from db.database import AsyncSessionLocal, async_engine
+    from models.transaction import Transaction
+
+    async with AsyncSessionLocal() as db:
+        total = await db.scalar(select(func.count()).select_from(Transaction))
+        distintas = await db.scalar(select(func.count(func.distinct(Transaction.reference))))
+    await async_engine.dispose()
+    return total, distintas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrencia del asignador de referencias")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--per-process", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    inicio_total, _ = asyncio.run(_conteos())
+    resultados = multiprocessing.Queue()
+    procesos = [
+        multiprocessing.Process(target=_worker, args=(args.per_process, args.concurrency, resultados))
+        for _ in range(args.processes)
+    ]
+
+    inicio = time.perf_counter()
+    for p in procesos:
+        p.start()
+    conteos = [resultados.get() for _ in procesos]
+    for p in procesos:
+        p.join()
+    duracion = time.perf_counter() - inicio
+
+    creadas = sum(c for c, _ in conteos)
+    fallidas = sum(f for _, f in conteos)
+    total, distintas = asyncio.run(_conteos())
+    nuevas, duplicadas = total - inicio_total, total - distintas
+
+    print(f"Procesos: {args.processes}  por proceso: {args.per_process}  concurrencia: {args.concurrency}")
+    print(f"Creadas: {creadas}  fallidas: {fallidas}  en {duracion:.2f}s ({creadas / duracion:.1f} tx/s)")
+    print(f"Filas nuevas en BD: {nuevas}  referencias duplicadas: {duplicadas}")
+
+    if fallidas or duplicadas or nuevas != creadas:
+        raise SystemExit("FALLO: hubo colisiones o creaciones fallidas")
+    print("OK: cero colisiones")
+
+
+if __name__ == "__main__":
+    main()
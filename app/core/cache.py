@@ -0,0 +1,175 @@
+"""
+Caches por proceso detrás de una interfaz común (CacheBackend):
+    TTLCache:     LRU en memoria con expiración (TTL); guarda objetos
+    LocalKVCache: almacén clave-valor de bytes con expiración por clave, con
+                  la semántica de un KV externo (GET/SETEX/DEL); sustituto
+                  local para probar un backend compartido
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class CacheBackend(ABC):
+
+    @property
+    @abstractmethod
+    def enabled(self) -> bool:
+        """False si el cache está desactivado (set no guarda nada)."""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Valor guardado, o None si no está o venció."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        """Guarda el valor con la expiración configurada."""
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """Elimina la clave si existe."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Elimina todas las claves."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Contadores del cache (tamaño, hits, misses, expulsiones...)."""
+
+
+class TTLCache(CacheBackend):
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entrada = self._data.get(key)
+            if entrada is None:
+                self.misses += 1
+                return None
+
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return valor
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / consultas, 4) if consultas else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class LocalKVCache(CacheBackend):
+    """
+    Sustituto local de un KV externo: solo guarda bytes (el llamador
+    serializa, como con un cliente de red), cada clave expira por su cuenta
+    y al llenarse se expulsa la clave escrita hace más tiempo.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            entrada = self._data.get(str(key))
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._data[str(key)]
+                    self.expirations += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entrada[1]
+
+    def set(self, key: Hashable, value: bytes) -> None:
+        if not self.enabled:
+            return
+        if not isinstance(value, (bytes, bytearray)):
+            raise TypeError("LocalKVCache solo guarda bytes")
+        with self._lock:
+            self._data.pop(str(key), None)  # reinsertar: pasa a ser la más reciente
+            self._data[str(key)] = (time.monotonic() + self.ttl, bytes(value))
+            while len(self._data) > self.max_size:
+                del self._data[next(iter(self._data))]
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(str(key), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / consultas, 4) if consultas else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
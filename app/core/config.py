@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Setting(BaseSettings):
@@ -5,6 +6,86 @@ class Setting(BaseSettings):
     ALGORITHM: str = "HS256"
     DATABASE_URL: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # True: v2 resuelve al usuario con los claims firmados del token (sin BD)
+    AUTH_STATELESS_JWT: bool = False
+
+    # Hash de contraseñas: costo de bcrypt y procesos dedicados (por worker).
+    # Al cambiar BCRYPT_ROUNDS los hashes se regeneran en el siguiente login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # Pool de conexiones (por worker de uvicorn)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0     # segundos esperando una conexión libre
+    DB_POOL_RECYCLE: int = 1800       # segundos antes de reciclar una conexión
+    DB_POOL_PRE_PING: bool = True     # descarta conexiones cerradas por el servidor
+
+    # Consultas SQL: umbral del log de consultas lentas (0 lo desactiva) y modo
+    # debug que devuelve consultas y tiempo en BD por request en headers X-DB-Query-*
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_QUERY_DEBUG_HEADERS: bool = False
+
+    # Asignación de referencias TRX: números reservados por viaje a la BD.
+    # 1 = sin huecos; >1 = bloques hi/lo por worker (puede dejar huecos al reiniciar)
+    REFERENCE_BLOCK_SIZE: int = 1
+
+    # Máximo de elementos por request en endpoints batch
+    BATCH_MAX_ITEMS: int = 500
+
+    # Cola de aprobación: duración de la reserva y máximo por /approvals/claim
+    APPROVAL_CLAIM_TTL_SECONDS: int = 300
+    APPROVAL_CLAIM_MAX: int = 50
+
+    # Ejecución en segundo plano (por worker de uvicorn). EXECUTION_GATEWAY:
+    # "mock" o la ruta "modulo:Clase" de un adaptador PaymentGateway
+    EXECUTION_WORKER_ENABLED: bool = True
+    EXECUTION_GATEWAY: str = "mock"
+    EXECUTION_BATCH_SIZE: int = 20
+    EXECUTION_CONCURRENCY: int = 8
+    EXECUTION_TIMEOUT_SECONDS: float = 10.0
+    EXECUTION_MAX_ATTEMPTS: int = 5
+    EXECUTION_RETRY_BACKOFF_SECONDS: float = 2.0   # se duplica en cada reintento
+    EXECUTION_POLL_INTERVAL_SECONDS: float = 1.0
+    MOCK_GATEWAY_LATENCY_SECONDS: float = 0.05
+    MOCK_GATEWAY_FAILURE_RATE: float = 0.0
+
+    # Idempotency-Key: vigencia de la respuesta guardada, espera máxima de un
+    # duplicado concurrente y lease de una clave "en curso" (el worker que la
+    # ejecuta lo renueva cada tercio; vencido, la clave se da por abandonada)
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_WAIT_SECONDS: float = 30.0
+    IDEMPOTENCY_LOCK_SECONDS: float = 60.0
+
+    # Cache de lecturas de transacciones (por worker). Backend "memory" (LRU)
+    # o "kv" (almacén clave-valor de bytes). TTL 0 lo desactiva
+    TRANSACTION_CACHE_BACKEND: str = "memory"
+    TRANSACTION_CACHE_MAX_SIZE: int = 10000
+    TRANSACTION_CACHE_TTL_SECONDS: float = 30.0
+
+    # Stream SSE de eventos (por worker): búfer para Last-Event-ID, cola por
+    # suscriptor, keep-alive y sondeo de eventos de otros procesos (0 lo desactiva)
+    SSE_MAX_SUBSCRIBERS: int = 10000
+    SSE_BUFFER_SIZE: int = 1000
+    SSE_QUEUE_SIZE: int = 100
+    SSE_REPLAY_MAX: int = 1000
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_POLL_INTERVAL_SECONDS: float = 1.0
+    SSE_GAP_WAIT_SECONDS: float = 10.0
+
+    # Cache de usuarios autenticados (por worker). TTL 0 lo desactiva
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: float = 60.0
+
+    # Administración de usuarios (header X-Admin-Key). Sin valor, los
+    # endpoints de administración responden 403
+    ADMIN_API_KEY: Optional[str] = None
+    # GET /metrics sin X-Admin-Key (solo si el puerto no es accesible desde
+    # fuera, p.ej. el scraper de Prometheus en la red interna)
+    METRICS_PUBLIC: bool = False
+    # Cada cuánto cada worker recarga de la BD los usuarios deshabilitados
+    # en su lista de revocación (0 = solo al iniciar)
+    REVOCATION_SYNC_SECONDS: float = 30.0
 
     class Config:
         env_file = ".env"
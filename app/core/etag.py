@@ -0,0 +1,56 @@
+"""
+ETags fuertes y GET condicional (If-None-Match) para las lecturas de
+transacciones.
+
+La versión de una transacción es (transaction_id, updated_at): todo cambio
+visible en TransactionResponse pasa por un UPDATE que renueva updated_at.
+Una consulta individual con If-None-Match se resuelve leyendo solo
+updated_at (sin cargar ni serializar la fila); un listado compara el ETag
+de la página con el de los (transaction_id, updated_at) obtenidos y omite
+la serialización si coincide.
+"""
+import hashlib
+from datetime import datetime
+from typing import Iterable, Mapping, Optional
+from fastapi import Response, status
+
+ETAG_HEADER = "ETag"
+
+
+def _etag(partes: Iterable[str]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        h.update(parte.encode())
+        h.update(b"\x00")
+    return f'"{h.hexdigest()}"'
+
+
+def etag_transaccion(transaction_id: str, updated_at: datetime) -> str:
+    return _etag((transaction_id, updated_at.isoformat()))
+
+
+def etag_pagina(transacciones: Iterable) -> str:
+    """ETag de un listado: cambia si cambia, entra o sale cualquier transacción de la página."""
+    return _etag(f"{t.transaction_id}|{t.updated_at.isoformat()}" for t in transacciones)
+
+
+def coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110): acepta listas, W/ y "*"."""
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*":
+            return True
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == etag:
+            return True
+    return False
+
+
+def no_modificado(etag: str, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={**(headers or {}), ETAG_HEADER: etag}
+    )
@@ -0,0 +1,292 @@
+"""
+Idempotency-Key para los POST que crean o cambian transacciones.
+
+Middleware ASGI: la primera solicitud con una clave la registra "en curso"
+(PK única por cliente + clave), se ejecuta normalmente y su respuesta se
+guarda por IDEMPOTENCY_TTL_SECONDS. Los reintentos con la misma clave
+reciben la respuesta guardada sin llegar a los endpoints ni al servicio.
+Un duplicado concurrente espera a que termine la primera en vez de
+ejecutarse dos veces.
+
+Mientras corre, el worker renueva el lease de la clave (lock_expires_at);
+solo con el lease vencido (el worker murió) otra solicitud puede tomarla,
+así una solicitud lenta nunca se ejecuta dos veces.
+
+Solo se guardan las respuestas 2xx y los 4xx de validación, que se
+repetirían igual. 401/403/409, 5xx y demás liberan la clave: dependen del
+estado (credenciales, rol, transición) y el reintento debe ejecutarse.
+Sin identidad del cliente (ni token ni X-User-Id) la clave se ignora.
+
+Si la respuesta ya se envió pero no se pudo guardar, la clave queda como
+no repetible (409): el efecto ya ocurrió y un reintento no debe repetirlo.
+"""
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from fastapi.responses import ORJSONResponse
+from core.config import setting
+from core.security import verificar_token
+from db.database import AsyncSessionLocal
+from models.idempotency import IdempotencyKey
+import crud.idempotency as crud_idempotency
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Creación, lotes, transiciones y reserva de aprobaciones
+RUTAS = re.compile(
+    r"^/api/v[12]/(transactions(/batch|/[^/]+/(submit|approve|reject|execute)|/(approve|reject|execute):batch)?"
+    r"|approvals/claim)$"
+)
+MAX_LARGO_CLAVE = 255
+# 4xx deterministas: mismo cuerpo, misma respuesta
+ESTADOS_4XX_GUARDADOS = {400, 404, 422}
+PURGA_CADA = 500  # claves registradas entre purgas de vencidas
+# Se guarda en lugar de una respuesta ya enviada que no se pudo guardar
+NO_REPETIBLE = (
+    409,
+    json.dumps([["content-type", "application/json"]]),
+    json.dumps({"detail": "La solicitud original se ejecutó pero su respuesta no está disponible; "
+                          "consultar el recurso en vez de reintentar"}).encode()
+)
+
+
+def _alcance(headers: Dict[bytes, bytes]) -> Optional[str]:
+    """Identidad del cliente: las claves de distintos usuarios no chocan. None si no hay."""
+    auth = headers.get(b"authorization", b"")
+    if auth[:7].lower() == b"bearer ":
+        payload = verificar_token(auth[7:].decode("latin-1"))
+        if payload and payload.get("sub"):
+            return f"jwt:{payload['sub']}"
+        return f"token:{hashlib.sha256(auth).hexdigest()}"
+
+    user_id = headers.get(b"x-user-id")
+    if user_id:
+        return f"v1:{headers.get(b'x-user-role', b'').decode('latin-1')}:{user_id.decode('latin-1')}"
+    return None
+
+
+def _guardable(status_code: Optional[int]) -> bool:
+    return status_code is not None and (200 <= status_code < 300 or status_code in ESTADOS_4XX_GUARDADOS)
+
+
+def _lease() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=setting.IDEMPOTENCY_LOCK_SECONDS)
+
+
+def _hash_solicitud(scope, cuerpo: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(scope["method"].encode())
+    h.update(scope["path"].encode())
+    h.update(b"?" + scope.get("query_string", b""))
+    h.update(cuerpo)
+    return h.hexdigest()
+
+
+async def _leer_cuerpo(receive) -> bytes:
+    partes = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        partes.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(partes)
+
+
+class IdempotencyMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+        # (scope, key) -> evento de fin, para despertar duplicados del mismo proceso
+        self._en_curso: Dict[Tuple[str, str], asyncio.Event] = {}
+        self._registradas = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not RUTAS.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        key = headers.get(b"idempotency-key", b"").decode("latin-1").strip()
+        alcance = _alcance(headers)
+        if not key or alcance is None:
+            await self.app(scope, receive, send)
+            return
+
+        if len(key) > MAX_LARGO_CLAVE:
+            await self._error(scope, receive, send, 400, f"{IDEMPOTENCY_HEADER} no puede superar {MAX_LARGO_CLAVE} caracteres")
+            return
+
+        cuerpo = await _leer_cuerpo(receive)
+        request_hash = _hash_solicitud(scope, cuerpo)
+
+        for _ in range(3):
+            ahora = datetime.utcnow()
+            expira = ahora + timedelta(seconds=setting.IDEMPOTENCY_TTL_SECONDS)
+            async with AsyncSessionLocal() as db:
+                if await crud_idempotency.reservar_clave(db, alcance, key, request_hash, expira, _lease()):
+                    break
+                existente = await crud_idempotency.obtener_clave(db, alcance, key)
+
+            if existente is None:
+                continue  # se liberó mientras tanto: reintentar el registro
+
+            if existente.expires_at <= ahora:
+                async with AsyncSessionLocal() as db:
+                    await crud_idempotency.eliminar_expirada(db, alcance, key, ahora)
+                continue
+
+            if existente.request_hash != request_hash:
+                await self._error(scope, receive, send, 422, f"{IDEMPOTENCY_HEADER} ya usada con otra solicitud")
+                return
+
+            if existente.status_code is None and not self._lease_vencido(existente):
+                existente = await self._esperar(alcance, key)
+                if existente is None or existente.request_hash != request_hash:
+                    continue  # la primera falló y liberó la clave: ejecutar esta
+
+            if existente.status_code is None:
+                if not self._lease_vencido(existente):
+                    await self._error(scope, receive, send, 409, f"Solicitud con el mismo {IDEMPOTENCY_HEADER} aún en curso")
+                    return
+                # El worker que la tenía dejó de renovar el lease: tomarla
+                async with AsyncSessionLocal() as db:
+                    if await crud_idempotency.tomar_clave(
+                        db, alcance, key, datetime.utcnow(), _lease(), setting.IDEMPOTENCY_LOCK_SECONDS
+                    ):
+                        break
+                continue
+
+            await self._repetir(existente, send)
+            return
+        else:
+            await self._error(scope, receive, send, 409, f"Solicitud con el mismo {IDEMPOTENCY_HEADER} aún en curso")
+            return
+
+        await self._ejecutar(scope, receive, send, cuerpo, alcance, key)
+
+    @staticmethod
+    def _lease_vencido(clave: IdempotencyKey) -> bool:
+        """En curso sin renovar el lease: el worker que la tenía murió."""
+        if clave.lock_expires_at is not None:
+            return clave.lock_expires_at <= datetime.utcnow()
+        return clave.created_at + timedelta(seconds=setting.IDEMPOTENCY_LOCK_SECONDS) <= datetime.utcnow()
+
+    @staticmethod
+    async def _renovar_lease(alcance: str, key: str) -> None:
+        """Heartbeat de la solicitud en curso: renueva el lease cada tercio de su duración."""
+        while True:
+            await asyncio.sleep(setting.IDEMPOTENCY_LOCK_SECONDS / 3)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await crud_idempotency.renovar_lease(db, alcance, key, _lease())
+            except Exception:
+                logger.exception("No se pudo renovar el lease de %s", IDEMPOTENCY_HEADER)
+
+    async def _ejecutar(self, scope, receive, send, cuerpo: bytes, alcance: str, key: str):
+        evento = asyncio.Event()
+        self._en_curso[(alcance, key)] = evento
+        respuesta = {"status": None, "headers": [], "body": bytearray()}
+        entregado = False
+
+        async def receive_con_cuerpo():
+            nonlocal entregado
+            if not entregado:
+                entregado = True
+                return {"type": "http.request", "body": cuerpo, "more_body": False}
+            return await receive()
+
+        async def send_capturando(message):
+            if message["type"] == "http.response.start":
+                respuesta["status"] = message["status"]
+                respuesta["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                respuesta["body"] += message.get("body", b"")
+            await send(message)
+
+        heartbeat = asyncio.create_task(self._renovar_lease(alcance, key))
+        try:
+            await self.app(scope, receive_con_cuerpo, send_capturando)
+        finally:
+            heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat
+            try:
+                async with AsyncSessionLocal() as db:
+                    if not _guardable(respuesta["status"]):
+                        await crud_idempotency.eliminar_clave(db, alcance, key)
+                    else:
+                        await self._guardar(db, alcance, key, respuesta)
+                    await self._purgar_si_corresponde(db)
+            finally:
+                self._en_curso.pop((alcance, key), None)
+                evento.set()
+
+    @staticmethod
+    async def _guardar(db, alcance: str, key: str, respuesta: dict) -> None:
+        """
+        Guarda la respuesta ya enviada. Si falla, la clave no se puede
+        liberar (el reintento repetiría el efecto): se guarda NO_REPETIBLE.
+        """
+        headers = json.dumps([[k.decode("latin-1"), v.decode("latin-1")] for k, v in respuesta["headers"]])
+        try:
+            await crud_idempotency.guardar_respuesta(
+                db, alcance, key, respuesta["status"], headers, bytes(respuesta["body"])
+            )
+        except Exception:
+            logger.exception("No se pudo guardar la respuesta de %s; la clave queda no repetible", IDEMPOTENCY_HEADER)
+            await db.rollback()
+            async with AsyncSessionLocal() as otra:
+                await crud_idempotency.guardar_respuesta(otra, alcance, key, *NO_REPETIBLE)
+
+    async def _esperar(self, alcance: str, key: str) -> Optional[IdempotencyKey]:
+        """
+        Espera a que la primera solicitud termine (evento local o sondeo de
+        la BD si está en otro proceso). Retorna la clave (terminada, aún en curso
+        o con el lease vencido), o None si se liberó.
+        """
+        loop = asyncio.get_running_loop()
+        limite = loop.time() + setting.IDEMPOTENCY_WAIT_SECONDS
+        pausa = 0.02
+
+        while True:
+            restante = limite - loop.time()
+            evento = self._en_curso.get((alcance, key))
+            if evento is not None:
+                try:
+                    await asyncio.wait_for(evento.wait(), timeout=max(0.0, min(restante, 1.0)))
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(max(0.0, min(pausa, restante)))
+                pausa = min(pausa * 2, 0.5)
+
+            async with AsyncSessionLocal() as db:
+                clave = await crud_idempotency.obtener_clave(db, alcance, key)
+            if clave is None or clave.status_code is not None or self._lease_vencido(clave) or loop.time() >= limite:
+                return clave
+
+    @staticmethod
+    async def _repetir(clave: IdempotencyKey, send):
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in json.loads(clave.response_headers or "[]")]
+        headers.append((REPLAYED_HEADER.lower().encode(), b"true"))
+        await send({"type": "http.response.start", "status": clave.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": clave.response_body or b""})
+
+    @staticmethod
+    async def _error(scope, receive, send, status_code: int, detail: str):
+        await ORJSONResponse({"detail": detail}, status_code=status_code)(scope, receive, send)
+
+    async def _purgar_si_corresponde(self, db) -> None:
+        self._registradas += 1
+        if self._registradas % PURGA_CADA == 0:
+            await crud_idempotency.purgar_expiradas(db, datetime.utcnow())
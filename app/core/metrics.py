@@ -0,0 +1,254 @@
+"""
+Métricas en formato de texto de Prometheus (GET /metrics), por proceso.
+
+Contadores, gauges e histogramas mínimos con etiquetas: registrar un valor
+es un lock y una suma (los histogramas además un bisect sobre los límites),
+así que pueden quedar activos en producción. Las etiquetas son siempre de
+cardinalidad acotada (plantilla de ruta, no la URL; rol, no el usuario).
+
+Con varios workers de uvicorn cada proceso expone sus propios valores;
+Prometheus los distingue por instancia y se suman al consultar.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette agrega el charset
+
+# Límites de los histogramas de latencia (segundos)
+BUCKETS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_DB = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+Etiquetas = Tuple[str, ...]
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_etiquetas(nombres: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(str(v))}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _formatear_valor(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metrica(ABC):
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def _encabezado(self) -> List[str]:
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+
+    @abstractmethod
+    def exponer(self) -> List[str]:
+        """Líneas del formato de texto de Prometheus (HELP, TYPE y muestras)."""
+
+
+class Counter(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Etiquetas, float] = {}
+
+    def inc(self, *valores: str, cantidad: float = 1.0) -> None:
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0.0) + cantidad
+
+    def exponer(self) -> List[str]:
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return self._encabezado() + [
+            f"{self.nombre}{_formatear_etiquetas(self.etiquetas, e)} {_formatear_valor(v)}" for e, v in valores
+        ]
+
+
+class Gauge(Counter):
+    tipo = "gauge"
+
+    def dec(self, *valores: str, cantidad: float = 1.0) -> None:
+        self.inc(*valores, cantidad=-cantidad)
+
+
+class GaugeFunc(_Metrica):
+    """Gauge calculado al exponer (p.ej. estado del pool o del stream)."""
+    tipo = "gauge"
+
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        funcion: Callable[[], Dict[Etiquetas, float]],
+        etiquetas: Sequence[str] = ()
+    ):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.funcion = funcion
+
+    def exponer(self) -> List[str]:
+        return self._encabezado() + [
+            f"{self.nombre}{_formatear_etiquetas(self.etiquetas, e)} {_formatear_valor(v)}"
+            for e, v in sorted(self.funcion().items())
+        ]
+
+
+class CounterFunc(GaugeFunc):
+    """Contador que ya lleva otro componente (p.ej. hits del cache), leído al exponer."""
+    tipo = "counter"
+
+
+class Histogram(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_HTTP):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+        # etiquetas -> (conteo por bucket, [suma])
+        self._series: Dict[Etiquetas, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, valor: float, *valores: str) -> None:
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = ([0] * (len(self.buckets) + 1), [0.0])
+            serie[0][indice] += 1
+            serie[1][0] += valor
+
+    def exponer(self) -> List[str]:
+        with self._lock:
+            series = sorted((e, list(c), s[0]) for e, (c, s) in self._series.items())
+
+        lineas = self._encabezado()
+        for etiquetas, conteos, suma in series:
+            acumulado = 0
+            for limite, conteo in zip((*self.buckets, float("inf")), conteos):
+                acumulado += conteo
+                le = f'le="{_formatear_valor(limite)}"'
+                lineas.append(f"{self.nombre}_bucket{_formatear_etiquetas(self.etiquetas, etiquetas, le)} {acumulado}")
+            base = _formatear_etiquetas(self.etiquetas, etiquetas)
+            lineas.append(f"{self.nombre}_sum{base} {_formatear_valor(suma)}")
+            lineas.append(f"{self.nombre}_count{base} {acumulado}")
+        return lineas
+
+
+class Registry:
+    """Registro propio (no global de una librería): solo lo que registra la app."""
+
+    def __init__(self):
+        self._metricas: List[_Metrica] = []
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        self._metricas.append(metrica)
+        return metrica
+
+    def exponer(self) -> str:
+        lineas: List[str] = []
+        for metrica in self._metricas:
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.registrar(Counter(
+    "http_requests_total", "Requests HTTP atendidas",
+    ("method", "route", "status", "role")
+))
+HTTP_LATENCY = registry.registrar(Histogram(
+    "http_request_duration_seconds", "Latencia de requests HTTP por plantilla de ruta",
+    ("method", "route", "status", "role"), BUCKETS_HTTP
+))
+HTTP_IN_FLIGHT = registry.registrar(Gauge(
+    "http_requests_in_flight", "Requests HTTP en curso"
+))
+TRANSITIONS = registry.registrar(Counter(
+    "transaction_transitions_total", "Cambios de estado de transacciones confirmados (from_status NONE = creación)",
+    ("from_status", "to_status")
+))
+AUTH_FAILURES = registry.registrar(Counter(
+    "auth_failures_total", "Solicitudes rechazadas por autenticación o rol",
+    ("api", "reason")
+))
+DB_QUERY_LATENCY = registry.registrar(Histogram(
+    "db_query_duration_seconds", "Duración de las sentencias SQL por tipo",
+    ("operation",), BUCKETS_DB
+))
+
+
+# Rol del request en curso: lo completan las dependencias de auth y lo lee el middleware
+_rol_actual: ContextVar[Optional[dict]] = ContextVar("metrics_rol", default=None)
+
+
+def iniciar_request() -> dict:
+    contexto = {"role": "none"}
+    _rol_actual.set(contexto)
+    return contexto
+
+
+def etiquetar_rol(role: str) -> None:
+    """Llamar desde la autenticación para etiquetar el request con el rol."""
+    contexto = _rol_actual.get()
+    if contexto is not None:
+        contexto["role"] = role
+
+
+def registrar_fallo_auth(api: str, motivo: str) -> None:
+    AUTH_FAILURES.inc(api, motivo)
+
+
+def registrar_transiciones(eventos: Iterable[dict]) -> None:
+    for evento in eventos:
+        origen, destino = evento["from_status"], evento["to_status"]
+        if origen != destino:
+            TRANSITIONS.inc(origen.value if origen else "NONE", destino.value)
+
+
+class MetricsMiddleware:
+    """
+    Mide cada request HTTP: latencia y conteo por método, plantilla de ruta
+    (la del endpoint que la atendió, "unmatched" si ninguna), status y rol,
+    y requests en curso.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        contexto = iniciar_request()
+        respuesta = {"status": 500}
+
+        async def send_midiendo(message):
+            if message["type"] == "http.response.start":
+                respuesta["status"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_midiendo)
+        finally:
+            duracion = time.perf_counter() - inicio
+            HTTP_IN_FLIGHT.dec()
+            ruta = getattr(scope.get("route"), "path_format", None) or "unmatched"
+            etiquetas = (scope["method"], ruta, str(respuesta["status"]), contexto["role"])
+            HTTP_REQUESTS.inc(*etiquetas)
+            HTTP_LATENCY.observe(duracion, *etiquetas)
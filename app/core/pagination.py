@@ -0,0 +1,36 @@
+"""
+Paginación por cursor (keyset) sobre (created_at, transaction_id).
+El cursor es opaco para el cliente: base64 del último par visto.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, transaction_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), transaction_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        created_at, transaction_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return datetime.fromisoformat(created_at), str(transaction_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        )
+
+
+def siguiente_cursor(transacciones: Sequence, limit: int) -> Optional[str]:
+    """Cursor de la página siguiente, o None si esta es la última."""
+    if not transacciones or len(transacciones) < limit:
+        return None
+    ultima = transacciones[-1]
+    return encode_cursor(ultima.created_at, ultima.transaction_id)
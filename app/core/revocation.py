@@ -0,0 +1,69 @@
+"""
+Lista de revocación en memoria (por worker) para tokens JWT.
+
+- Tokens: por jti, hasta que el token expire (luego se purga).
+- Usuarios: por user_id, bloquea todos sus tokens hasta restaurarlo.
+
+Cada worker de uvicorn tiene su propia lista: logout y la deshabilitación
+de un usuario se aplican de inmediato solo en el worker que atendió el
+request. Los usuarios deshabilitados se persisten (usuarios.is_active) y
+services/revocation_sync los recarga en cada worker al iniciar y cada
+REVOCATION_SYNC_SECONDS; los jtis de logout no se comparten.
+
+Las consultas son lookups O(1) en dict/set, pensados para correr en cada request.
+"""
+import threading
+import time
+from typing import Optional
+
+
+class RevocationList:
+
+    def __init__(self):
+        self._tokens: dict[str, float] = {}   # jti -> exp (epoch)
+        self._usuarios: set[str] = set()
+        self._lock = threading.Lock()
+        self._proxima_purga = 0.0
+
+    def revocar_token(self, jti: Optional[str], exp: Optional[float]) -> None:
+        if not jti:
+            return
+        with self._lock:
+            self._tokens[jti] = float(exp) if exp else time.time() + 86400
+
+    def revocar_usuario(self, user_id: str) -> None:
+        with self._lock:
+            self._usuarios.add(user_id)
+
+    def restaurar_usuario(self, user_id: str) -> None:
+        with self._lock:
+            self._usuarios.discard(user_id)
+
+    def reemplazar_usuarios(self, user_ids) -> None:
+        """Reemplaza los usuarios revocados por los deshabilitados en la BD."""
+        with self._lock:
+            self._usuarios = set(user_ids)
+
+    def esta_revocado(self, payload: dict) -> bool:
+        self._purgar()
+        jti = payload.get("jti")
+        if jti and jti in self._tokens:
+            return True
+        user_id = payload.get("user_id")
+        return bool(user_id) and user_id in self._usuarios
+
+    def _purgar(self) -> None:
+        """Elimina jtis de tokens ya expirados (como máximo una vez por minuto)."""
+        ahora = time.time()
+        if ahora < self._proxima_purga:
+            return
+        with self._lock:
+            self._proxima_purga = ahora + 60
+            for jti in [j for j, exp in self._tokens.items() if exp < ahora]:
+                del self._tokens[jti]
+
+    def stats(self) -> dict:
+        return {"tokens": len(self._tokens), "usuarios": len(self._usuarios)}
+
+
+revocation_list = RevocationList()
@@ -2,17 +2,30 @@ from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from core.config import setting
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import uuid
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=setting.BCRYPT_ROUNDS)
 
+# bcrypt es CPU-bound: se ejecuta en procesos aparte para no ocupar
+# el event loop ni el threadpool de los endpoints de transacciones
+_hash_executor: ProcessPoolExecutor | None = None
 
-def crear_token(sub: str, role: str):
+
+def crear_token(sub: str, role: str, user_id: str | None = None, nombre: str | None = None):
     expire = datetime.utcnow() + timedelta(minutes=setting.ACCESS_TOKEN_EXPIRE_MINUTES)
     data = {
         "sub": sub,
         "exp": expire,
-        "role": role
+        "role": role,
+        "jti": uuid.uuid4().hex  # permite revocar este token puntualmente
     }
+    # Claims firmados para resolver al usuario sin consultar la BD (AUTH_STATELESS_JWT)
+    if user_id:
+        data["user_id"] = user_id
+    if nombre:
+        data["nombre"] = nombre
     token = jwt.encode(data, setting.SECRET_KEY, algorithm=setting.ALGORITHM)
     return token
 
@@ -29,4 +42,37 @@ def hash_password(password:str):
     return pwd_context.hash(password)
 
 def verify_password(password:str, hashed:str):
-    return pwd_context.verify(password, hashed)
\ No newline at end of file
+    return pwd_context.verify(password, hashed)
+
+
+def _verify_and_update(password:str, hashed:str):
+    return pwd_context.verify_and_update(password, hashed)
+
+
+def _get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(max_workers=setting.PASSWORD_HASH_WORKERS)
+    return _hash_executor
+
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+async def hash_password_async(password:str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), hash_password, password)
+
+
+async def verify_password_async(password:str, hashed:str) -> tuple[bool, str | None]:
+    """
+    Verifica la contraseña en el pool de procesos.
+    Retorna (válida, nuevo_hash); nuevo_hash viene cuando el hash guardado
+    usa un costo distinto a BCRYPT_ROUNDS y debe reemplazarse.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), _verify_and_update, password, hashed)
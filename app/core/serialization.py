@@ -0,0 +1,41 @@
+"""
+Serialización rápida de transacciones.
+
+Los listados devuelven filas ORM que ya vienen validadas de la BD, así que
+se convierten directamente a dict (sin construir un TransactionResponse por
+fila) y se codifican con orjson. La salida JSON es idéntica a la del
+response_model TransactionResponse.
+"""
+from typing import Iterable, Mapping, Optional
+from fastapi.responses import ORJSONResponse
+from models.transaction import Transaction
+
+
+def serializar_transaccion(transaction: Transaction) -> dict:
+    """Dict JSON-ready de una transacción (mismo formato que TransactionResponse)."""
+    return {
+        "transaction_id": transaction.transaction_id,
+        "reference": transaction.reference,
+        "amount": str(transaction.amount),
+        "currency": transaction.currency,
+        "status": transaction.status.value,
+        "created_by": transaction.created_by,
+        "approved_by": transaction.approved_by,
+        "created_at": transaction.created_at,
+        "updated_at": transaction.updated_at,
+    }
+
+
+def respuesta_transaccion(
+    transaction: Transaction,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> ORJSONResponse:
+    return ORJSONResponse(serializar_transaccion(transaction), status_code=status_code, headers=headers)
+
+
+def respuesta_transacciones(
+    transactions: Iterable[Transaction],
+    headers: Optional[Mapping[str, str]] = None
+) -> ORJSONResponse:
+    return ORJSONResponse([serializar_transaccion(t) for t in transactions], headers=headers)
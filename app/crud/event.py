@@ -0,0 +1,113 @@
+from sqlalchemy import Row, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.event import TransactionEvent
+from models.transaction import Transaction
+from typing import Iterable, List, Optional
+
+
+async def registrar_eventos(db: AsyncSession, eventos: List[dict]) -> List[int]:
+    """
+    Inserta eventos con un solo INSERT multi-fila. No hace commit: se
+    confirman junto con el cambio de la transacción que registran.
+    
+    Args:
+        db: Sesión de base de datos
+        eventos: Filas de transaction_events (sin event_id)
+    
+    Returns:
+        List[int]: event_id asignados, en el mismo orden que eventos
+    """
+    if not eventos:
+        return []
+    
+    result = await db.execute(
+        insert(TransactionEvent).returning(TransactionEvent.event_id, sort_by_parameter_order=True),
+        eventos
+    )
+    return list(result.scalars().all())
+
+
+async def obtener_historial(db: AsyncSession, transaction_id: str) -> List[TransactionEvent]:
+    """
+    Obtiene los eventos de una transacción en orden de registro.
+    
+    Args:
+        db: Sesión de base de datos
+        transaction_id: UUID de la transacción
+    
+    Returns:
+        List[TransactionEvent]: Eventos de la transacción
+    """
+    result = await db.execute(
+        select(TransactionEvent)
+        .where(TransactionEvent.transaction_id == transaction_id)
+        .order_by(TransactionEvent.event_id)
+    )
+    return list(result.scalars().all())
+
+
+def _consulta_con_creador():
+    # created_by de la transacción: define qué suscriptores pueden ver el evento
+    return (
+        select(TransactionEvent, Transaction.created_by)
+        .join(Transaction, Transaction.transaction_id == TransactionEvent.transaction_id)
+        .order_by(TransactionEvent.event_id)
+    )
+
+
+async def obtener_eventos_desde(
+    db: AsyncSession,
+    event_id: int,
+    created_by: Optional[str] = None,
+    limite: int = 1000
+) -> List[Row]:
+    """
+    Eventos posteriores a event_id (para retomar un stream con Last-Event-ID).
+    
+    Args:
+        db: Sesión de base de datos
+        event_id: Último evento recibido por el cliente
+        created_by: Solo eventos de transacciones de este creador (None = todas)
+        limite: Máximo de eventos
+    
+    Returns:
+        List[Row]: (TransactionEvent, created_by) en orden de event_id
+    """
+    query = _consulta_con_creador().where(TransactionEvent.event_id > event_id)
+    if created_by is not None:
+        query = query.where(Transaction.created_by == created_by)
+    result = await db.execute(query.limit(limite))
+    return list(result.all())
+
+
+async def obtener_eventos_nuevos(
+    db: AsyncSession,
+    event_id: int,
+    huecos: Iterable[int] = (),
+    limite: int = 1000
+) -> List[Row]:
+    """
+    Eventos posteriores a event_id más los IDs pendientes en huecos (IDs
+    menores que aún no se habían confirmado en el sondeo anterior).
+    
+    Args:
+        db: Sesión de base de datos
+        event_id: Mayor event_id ya sondeado
+        huecos: event_id faltantes a volver a buscar
+        limite: Máximo de eventos
+    
+    Returns:
+        List[Row]: (TransactionEvent, created_by) en orden de event_id
+    """
+    condicion = TransactionEvent.event_id > event_id
+    huecos = list(huecos)
+    if huecos:
+        condicion = or_(condicion, TransactionEvent.event_id.in_(huecos))
+    result = await db.execute(_consulta_con_creador().where(condicion).limit(limite))
+    return list(result.all())
+
+
+async def obtener_ultimo_event_id(db: AsyncSession) -> int:
+    """Mayor event_id registrado (0 si no hay eventos)."""
+    result = await db.execute(select(func.coalesce(func.max(TransactionEvent.event_id), 0)))
+    return result.scalar_one()
@@ -0,0 +1,205 @@
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.idempotency import IdempotencyKey
+from typing import Optional
+from datetime import datetime, timedelta
+
+
+async def reservar_clave(
+    db: AsyncSession,
+    scope: str,
+    key: str,
+    request_hash: str,
+    expires_at: datetime,
+    lock_expires_at: datetime
+) -> bool:
+    """
+    Registra la clave como "en curso". La PK (scope, key) garantiza que
+    solo una solicitud concurrente la obtenga. Hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        scope: Identidad del cliente
+        key: Valor del header Idempotency-Key
+        request_hash: Hash de método, ruta y cuerpo
+        expires_at: Fin de vigencia de la clave
+        lock_expires_at: Fin del lease de la solicitud en curso
+    
+    Returns:
+        bool: True si se registró, False si ya existía
+    """
+    db.add(IdempotencyKey(
+        scope=scope, key=key, request_hash=request_hash,
+        expires_at=expires_at, lock_expires_at=lock_expires_at
+    ))
+    try:
+        await db.commit()
+        return True
+    except IntegrityError:
+        await db.rollback()
+        return False
+
+
+async def obtener_clave(db: AsyncSession, scope: str, key: str) -> Optional[IdempotencyKey]:
+    """
+    Obtiene una clave (fresca de la BD, sin identity map).
+    
+    Args:
+        db: Sesión de base de datos
+        scope: Identidad del cliente
+        key: Valor del header Idempotency-Key
+    
+    Returns:
+        Optional[IdempotencyKey]: Clave o None si no existe
+    """
+    result = await db.execute(
+        select(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+def _lease_vencido(ahora: datetime, lock_seconds: float):
+    # Claves anteriores a la columna lock_expires_at: lease desde created_at
+    return or_(
+        IdempotencyKey.lock_expires_at <= ahora,
+        and_(
+            IdempotencyKey.lock_expires_at.is_(None),
+            IdempotencyKey.created_at <= ahora - timedelta(seconds=lock_seconds)
+        )
+    )
+
+
+async def renovar_lease(db: AsyncSession, scope: str, key: str, lock_expires_at: datetime) -> None:
+    """
+    Extiende el lease de una clave en curso (heartbeat del worker que la
+    ejecuta). Hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        scope: Identidad del cliente
+        key: Valor del header Idempotency-Key
+        lock_expires_at: Nuevo fin del lease
+    """
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+        .values(lock_expires_at=lock_expires_at)
+    )
+    await db.commit()
+
+
+async def tomar_clave(
+    db: AsyncSession,
+    scope: str,
+    key: str,
+    ahora: datetime,
+    lock_expires_at: datetime,
+    lock_seconds: float
+) -> bool:
+    """
+    Toma una clave en curso cuyo lease venció (el worker que la tenía
+    murió). El UPDATE condicionado garantiza que solo una solicitud la
+    tome. Hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        scope: Identidad del cliente
+        key: Valor del header Idempotency-Key
+        ahora: Hora de referencia
+        lock_expires_at: Fin del lease para quien la toma
+        lock_seconds: Duración del lease (para claves sin lock_expires_at)
+    
+    Returns:
+        bool: True si se tomó, False si sigue vigente, terminó o la tomó otra
+    """
+    result = await db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+            _lease_vencido(ahora, lock_seconds)
+        )
+        .values(lock_expires_at=lock_expires_at)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def eliminar_expirada(db: AsyncSession, scope: str, key: str, ahora: datetime) -> None:
+    """
+    Elimina la clave solo si su vigencia terminó (no toca una registrada de
+    nuevo por otra solicitud). Hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        scope: Identidad del cliente
+        key: Valor del header Idempotency-Key
+        ahora: Hora de referencia
+    """
+    await db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key, IdempotencyKey.expires_at <= ahora)
+    )
+    await db.commit()
+
+
+async def guardar_respuesta(
+    db: AsyncSession,
+    scope: str,
+    key: str,
+    status_code: int,
+    headers: str,
+    body: bytes
+) -> None:
+    """
+    Guarda la respuesta de la primera solicitud. Hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        scope: Identidad del cliente
+        key: Valor del header Idempotency-Key
+        status_code: Código HTTP de la respuesta
+        headers: Headers de la respuesta (JSON)
+        body: Cuerpo de la respuesta
+    """
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        .values(status_code=status_code, response_headers=headers, response_body=body, lock_expires_at=None)
+    )
+    await db.commit()
+
+
+async def eliminar_clave(db: AsyncSession, scope: str, key: str) -> None:
+    """
+    Elimina la clave (la solicitud falló y puede reintentarse). Hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        scope: Identidad del cliente
+        key: Valor del header Idempotency-Key
+    """
+    await db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+    )
+    await db.commit()
+
+
+async def purgar_expiradas(db: AsyncSession, ahora: datetime) -> int:
+    """
+    Elimina las claves vencidas. Hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        ahora: Hora de referencia
+    
+    Returns:
+        int: Cantidad de claves eliminadas
+    """
+    result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= ahora))
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,60 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.summary import TransactionSummary
+from models.transaction import TransactionStatus
+from typing import Dict, List, Tuple
+from decimal import Decimal
+
+# (status, currency) -> (delta de conteo, delta de monto)
+Deltas = Dict[Tuple[TransactionStatus, str], Tuple[int, Decimal]]
+
+
+async def aplicar_deltas(db: AsyncSession, deltas: Deltas) -> None:
+    """
+    Suma los deltas al resumen con un único INSERT ... ON CONFLICT DO UPDATE
+    (PostgreSQL y SQLite). Las filas van ordenadas por clave para que dos
+    transacciones concurrentes bloqueen las filas en el mismo orden.
+    No hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        deltas: Cambios por (status, currency)
+    """
+    filas = [
+        {"status": estado, "currency": currency, "count": count, "total": total}
+        for (estado, currency), (count, total) in sorted(deltas.items(), key=lambda d: (d[0][0].value, d[0][1]))
+        if count or total
+    ]
+    if not filas:
+        return
+    
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(TransactionSummary).values(filas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TransactionSummary.status, TransactionSummary.currency],
+        set_={
+            "count": TransactionSummary.count + stmt.excluded.count,
+            "total": TransactionSummary.total + stmt.excluded.total,
+        }
+    )
+    await db.execute(stmt)
+
+
+async def obtener_resumen(db: AsyncSession) -> List[TransactionSummary]:
+    """
+    Obtiene el resumen completo (una fila por status y moneda con datos).
+    
+    Args:
+        db: Sesión de base de datos
+    
+    Returns:
+        List[TransactionSummary]: Filas del resumen ordenadas por status y moneda
+    """
+    result = await db.execute(
+        select(TransactionSummary)
+        .where(TransactionSummary.count != 0)
+        .order_by(TransactionSummary.status, TransactionSummary.currency)
+    )
+    return list(result.scalars().all())
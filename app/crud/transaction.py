@@ -1,13 +1,20 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, or_, select, insert, update, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.transaction import Transaction, TransactionStatus
-from schemas.transaction import TransactionCreate
-from typing import Optional, List
+from schemas.transaction import TransactionCreate, TransactionFilters
+import crud.summary as crud_summary
+import services.transaction_cache as transaction_cache
+from typing import Dict, Optional, List, Tuple
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 import uuid
 
 
-def crear_transaccion(db: Session, transaccion: TransactionCreate, created_by: str) -> Transaction:
+async def crear_transaccion(db: AsyncSession, transaccion: TransactionCreate, created_by: str) -> Transaction:
     """
     Crea una nueva transacción en estado DRAFT.
+    Hace flush (el INSERT se envía y una referencia duplicada falla aquí)
+    pero no commit: quien llama confirma junto con el resumen.
     
     Args:
         db: Sesión de base de datos
@@ -20,18 +27,79 @@ def crear_transaccion(db: Session, transaccion: TransactionCreate, created_by: s
     db_transaction = Transaction(
         transaction_id=str(uuid.uuid4()),
         reference=transaccion.reference,
-        amount=transaccion.amount,
+        # Misma escala que Numeric(18, 2), para responder sin releer la fila
+        amount=transaccion.amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
         currency=transaccion.currency.upper(),
         status=TransactionStatus.DRAFT,
         created_by=created_by
     )
     db.add(db_transaction)
-    db.commit()
-    db.refresh(db_transaction)
+    await db.flush()
     return db_transaction
 
 
-def obtener_transaccion_por_id(db: Session, transaction_id: str) -> Optional[Transaction]:
+async def crear_transacciones(
+    db: AsyncSession,
+    transacciones: List[TransactionCreate],
+    created_by: str
+) -> List[Transaction]:
+    """
+    Crea varias transacciones en estado DRAFT con un solo INSERT multi-fila.
+    Los IDs y timestamps se generan aquí para no necesitar RETURNING ni refresh.
+    No hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        transacciones: Datos de las transacciones
+        created_by: ID del operador que crea las transacciones
+    
+    Returns:
+        List[Transaction]: Transacciones creadas (en el mismo orden)
+    """
+    ahora = datetime.utcnow()
+    filas = [
+        {
+            "transaction_id": str(uuid.uuid4()),
+            "reference": t.reference,
+            # Misma escala que Numeric(18, 2), para responder sin releer la fila
+            "amount": t.amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+            "currency": t.currency.upper(),
+            "status": TransactionStatus.DRAFT,
+            "created_by": created_by,
+            "approved_by": None,
+            "created_at": ahora,
+            "updated_at": ahora,
+        }
+        for t in transacciones
+    ]
+    
+    if filas:
+        await db.execute(insert(Transaction).values(filas))
+    
+    return [Transaction(**fila) for fila in filas]
+
+
+async def obtener_references_existentes(db: AsyncSession, references: List[str]) -> set:
+    """
+    Obtiene cuáles de las referencias dadas ya existen.
+    
+    Args:
+        db: Sesión de base de datos
+        references: Referencias a verificar
+    
+    Returns:
+        set: Referencias que ya existen en la BD
+    """
+    if not references:
+        return set()
+    
+    result = await db.execute(
+        select(Transaction.reference).where(Transaction.reference.in_(references))
+    )
+    return set(result.scalars().all())
+
+
+async def obtener_transaccion_por_id(db: AsyncSession, transaction_id: str) -> Optional[Transaction]:
     """
     Obtiene una transacción por su ID.
     
@@ -42,71 +110,593 @@ def obtener_transaccion_por_id(db: Session, transaction_id: str) -> Optional[Tra
     Returns:
         Optional[Transaction]: Transacción encontrada o None
     """
-    return db.query(Transaction).filter(Transaction.transaction_id == transaction_id).first()
+    result = await db.execute(
+        select(Transaction).where(Transaction.transaction_id == transaction_id)
+    )
+    return result.scalars().first()
 
 
-def obtener_todas_transacciones(
-    db: Session,
+async def obtener_version_transaccion(db: AsyncSession, transaction_id: str) -> Optional[datetime]:
+    """
+    Obtiene solo el updated_at de una transacción (versión para ETag), sin
+    cargar la fila completa.
+    
+    Args:
+        db: Sesión de base de datos
+        transaction_id: UUID de la transacción
+    
+    Returns:
+        Optional[datetime]: updated_at, o None si no existe
+    """
+    result = await db.execute(
+        select(Transaction.updated_at).where(Transaction.transaction_id == transaction_id)
+    )
+    return result.scalar_one_or_none()
+
+
+def _aplicar_filtros(query, filtros: Optional[TransactionFilters]):
+    """
+    Agrega a la consulta los filtros enviados. Cada filtro de igualdad tiene
+    un índice compuesto (columna, created_at, transaction_id) que además
+    sirve el orden de paginación; los rangos usan índices propios.
+    """
+    if not filtros:
+        return query
+    
+    if filtros.status:
+        query = query.where(Transaction.status == filtros.status)
+    if filtros.currency:
+        query = query.where(Transaction.currency == filtros.currency)
+    if filtros.created_by:
+        query = query.where(Transaction.created_by == filtros.created_by)
+    if filtros.approved_by:
+        query = query.where(Transaction.approved_by == filtros.approved_by)
+    if filtros.min_amount is not None:
+        query = query.where(Transaction.amount >= filtros.min_amount)
+    if filtros.max_amount is not None:
+        query = query.where(Transaction.amount <= filtros.max_amount)
+    if filtros.created_from:
+        query = query.where(Transaction.created_at >= filtros.created_from)
+    if filtros.created_to:
+        query = query.where(Transaction.created_at < filtros.created_to)
+    if filtros.updated_from:
+        query = query.where(Transaction.updated_at >= filtros.updated_from)
+    if filtros.updated_to:
+        query = query.where(Transaction.updated_at < filtros.updated_to)
+    
+    return query
+
+
+def _paginar(query, skip: int, limit: int, cursor: Optional[Tuple[datetime, str]]):
+    """
+    Orden estable por (created_at, transaction_id). Con cursor se continúa
+    después del último par visto (keyset), sin recorrer las páginas previas.
+    """
+    if cursor:
+        query = query.where(tuple_(Transaction.created_at, Transaction.transaction_id) > cursor)
+    
+    query = query.order_by(Transaction.created_at, Transaction.transaction_id)
+    
+    if skip:
+        query = query.offset(skip)
+    
+    return query.limit(limit)
+
+
+async def obtener_todas_transacciones(
+    db: AsyncSession,
     skip: int = 0,
     limit: int = 100,
-    status: Optional[TransactionStatus] = None
+    status: Optional[TransactionStatus] = None,
+    cursor: Optional[Tuple[datetime, str]] = None,
+    filtros: Optional[TransactionFilters] = None
 ) -> List[Transaction]:
     """
     Obtiene todas las transacciones con paginación opcional.
     
     Args:
         db: Sesión de base de datos
-        skip: Número de registros a saltar
+        skip: Número de registros a saltar (preferir cursor)
         limit: Número máximo de registros a retornar
         status: Filtrar por estado específico
+        cursor: (created_at, transaction_id) del último registro de la página anterior
+        filtros: Filtros de búsqueda (estado, moneda, usuarios, montos, fechas)
     
     Returns:
         List[Transaction]: Lista de transacciones
     """
-    query = db.query(Transaction)
+    query = _aplicar_filtros(select(Transaction), filtros)
     
     if status:
-        query = query.filter(Transaction.status == status)
+        query = query.where(Transaction.status == status)
+    
+    result = await db.execute(_paginar(query, skip, limit, cursor))
+    return list(result.scalars().all())
+
+
+async def obtener_transacciones_por_creador(
+    db: AsyncSession,
+    created_by: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Tuple[datetime, str]] = None,
+    filtros: Optional[TransactionFilters] = None
+) -> List[Transaction]:
+    """
+    Obtiene las transacciones creadas por un operador.
+    
+    Args:
+        db: Sesión de base de datos
+        created_by: ID del operador (prevalece sobre filtros.created_by)
+        skip: Número de registros a saltar (preferir cursor)
+        limit: Número máximo de registros a retornar
+        cursor: (created_at, transaction_id) del último registro de la página anterior
+        filtros: Filtros de búsqueda adicionales
+    
+    Returns:
+        List[Transaction]: Lista de transacciones del operador
+    """
+    if filtros and filtros.created_by:
+        filtros = filtros.model_copy(update={"created_by": None})
+    
+    query = _aplicar_filtros(select(Transaction), filtros).where(Transaction.created_by == created_by)
+    result = await db.execute(_paginar(query, skip, limit, cursor))
+    return list(result.scalars().all())
+
+
+def consulta_exportacion(
+    created_by: Optional[str] = None,
+    filtros: Optional[TransactionFilters] = None
+):
+    """
+    Construye la consulta de exportación: columnas (no entidades ORM, para no
+    poblar el identity map) ordenadas por (created_at, transaction_id).
+    
+    Args:
+        created_by: Restringir a un operador (prevalece sobre filtros.created_by)
+        filtros: Filtros de búsqueda (los mismos del listado)
+    
+    Returns:
+        Select: Consulta lista para ejecutarse con AsyncSession.stream
+    """
+    if created_by and filtros and filtros.created_by:
+        filtros = filtros.model_copy(update={"created_by": None})
     
-    return query.offset(skip).limit(limit).all()
+    query = _aplicar_filtros(select(*Transaction.__table__.c), filtros)
+    
+    if created_by:
+        query = query.where(Transaction.created_by == created_by)
+    
+    return query.order_by(Transaction.created_at, Transaction.transaction_id)
+
 
+def _reserva_libre(actor: Optional[str], ahora: datetime):
+    """Condición: sin reserva vigente, o reservada por el propio actor."""
+    condiciones = [Transaction.claim_expires_at.is_(None), Transaction.claim_expires_at <= ahora]
+    if actor:
+        condiciones.append(Transaction.claimed_by == actor)
+    return or_(*condiciones)
 
-def actualizar_estado_transaccion(
-    db: Session,
+
+def _condiciones_transicion(estado_actual: TransactionStatus, actor: Optional[str]) -> list:
+    """
+    Condiciones del UPDATE de una transición. Las transacciones pendientes
+    pueden estar reservadas (/approvals/claim): solo el aprobador que tiene
+    la reserva puede aprobarlas o rechazarlas mientras esté vigente.
+    """
+    condiciones = [Transaction.status == estado_actual]
+    if estado_actual == TransactionStatus.PENDING_APPROVAL:
+        condiciones.append(_reserva_libre(actor, datetime.utcnow()))
+    return condiciones
+
+
+def _valores_transicion(
+    estado_actual: TransactionStatus,
+    nuevo_estado: TransactionStatus,
+    approved_by: Optional[str]
+) -> dict:
+    values = {"status": nuevo_estado}
+    
+    if approved_by:
+        values["approved_by"] = approved_by
+    
+    if estado_actual == TransactionStatus.PENDING_APPROVAL:
+        # Al salir de la cola la reserva deja de tener sentido
+        values["claimed_by"] = None
+        values["claim_expires_at"] = None
+    
+    return values
+
+
+async def transicionar_estado(
+    db: AsyncSession,
     transaction_id: str,
+    estado_actual: TransactionStatus,
     nuevo_estado: TransactionStatus,
-    approved_by: Optional[str] = None
+    approved_by: Optional[str] = None,
+    actor: Optional[str] = None
 ) -> Optional[Transaction]:
     """
-    Actualiza el estado de una transacción.
+    Cambia el estado solo si la transacción sigue en estado_actual.
+    Un único UPDATE ... WHERE status = estado_actual RETURNING *:
+    dos requests concurrentes no pueden aplicar la misma transición.
+    No hace commit.
     
     Args:
         db: Sesión de base de datos
         transaction_id: UUID de la transacción
+        estado_actual: Estado requerido para aplicar la transición
         nuevo_estado: Nuevo estado de la transacción
         approved_by: ID del aprobador (opcional)
+        actor: ID de quien aplica la transición (para respetar reservas)
     
     Returns:
-        Optional[Transaction]: Transacción actualizada o None
+        Optional[Transaction]: Transacción actualizada, o None si no existe,
+        no estaba en estado_actual o está reservada por otro aprobador
+    """
+    stmt = (
+        update(Transaction)
+        .where(
+            Transaction.transaction_id == transaction_id,
+            *_condiciones_transicion(estado_actual, actor)
+        )
+        .values(**_valores_transicion(estado_actual, nuevo_estado, approved_by))
+        .returning(Transaction)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+
+async def obtener_estado_transaccion(db: AsyncSession, transaction_id: str) -> Optional[Row]:
     """
-    db_transaction = obtener_transaccion_por_id(db, transaction_id)
+    Obtiene solo el estado, la reserva y la solicitud de ejecución de una transacción.
     
-    if not db_transaction:
-        return None
+    Args:
+        db: Sesión de base de datos
+        transaction_id: UUID de la transacción
     
-    db_transaction.status = nuevo_estado
+    Returns:
+        Optional[Row]: (status, claimed_by, claim_expires_at, execution_requested_at)
+        o None si no existe
+    """
+    result = await db.execute(
+        select(
+            Transaction.status,
+            Transaction.claimed_by,
+            Transaction.claim_expires_at,
+            Transaction.execution_requested_at
+        )
+        .where(Transaction.transaction_id == transaction_id)
+    )
+    return result.first()
+
+
+async def transicionar_estado_lote(
+    db: AsyncSession,
+    transaction_ids: List[str],
+    estado_actual: TransactionStatus,
+    nuevo_estado: TransactionStatus,
+    approved_by: Optional[str] = None,
+    actor: Optional[str] = None
+) -> List[Row]:
+    """
+    Aplica la misma transición a varias transacciones con un único
+    UPDATE ... WHERE transaction_id IN (...) AND status = estado_actual.
+    No hace commit.
     
-    if approved_by:
-        db_transaction.approved_by = approved_by
+    Args:
+        db: Sesión de base de datos
+        transaction_ids: UUIDs de las transacciones
+        estado_actual: Estado requerido para aplicar la transición
+        nuevo_estado: Nuevo estado de las transacciones
+        approved_by: ID del aprobador (opcional)
+        actor: ID de quien aplica la transición (para respetar reservas)
     
-    db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
+    Returns:
+        List[Row]: (transaction_id, currency, amount, created_by) de las transacciones actualizadas
+    """
+    stmt = (
+        update(Transaction)
+        .where(
+            Transaction.transaction_id.in_(transaction_ids),
+            *_condiciones_transicion(estado_actual, actor)
+        )
+        .values(**_valores_transicion(estado_actual, nuevo_estado, approved_by))
+        .returning(Transaction.transaction_id, Transaction.currency, Transaction.amount, Transaction.created_by)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    return list(result.all())
 
 
-def eliminar_transaccion(db: Session, transaction_id: str) -> bool:
+async def obtener_estados_transacciones(db: AsyncSession, transaction_ids: List[str]) -> Dict[str, Row]:
     """
-    Elimina una transacción (solo para testing/admin).
+    Obtiene el estado, la reserva y la solicitud de ejecución de varias
+    transacciones en una consulta.
+    
+    Args:
+        db: Sesión de base de datos
+        transaction_ids: UUIDs de las transacciones
+    
+    Returns:
+        Dict[str, Row]: (status, claimed_by, claim_expires_at, execution_requested_at) por ID
+        (las inexistentes no aparecen)
+    """
+    if not transaction_ids:
+        return {}
+    
+    result = await db.execute(
+        select(
+            Transaction.transaction_id,
+            Transaction.status,
+            Transaction.claimed_by,
+            Transaction.claim_expires_at,
+            Transaction.execution_requested_at
+        )
+        .where(Transaction.transaction_id.in_(transaction_ids))
+    )
+    return {fila.transaction_id: fila for fila in result}
+
+
+def _cola_aprobacion() -> Tuple[list, list]:
+    """(condiciones, orden) de la cola de aprobación: PENDING_APPROVAL por orden de creación."""
+    return (
+        [Transaction.status == TransactionStatus.PENDING_APPROVAL],
+        [Transaction.created_at, Transaction.transaction_id]
+    )
+
+
+def _cola_ejecucion() -> Tuple[list, list]:
+    """(condiciones, orden) de la cola de ejecución: APPROVED solicitadas, por orden de llegada."""
+    return (
+        [
+            Transaction.status == TransactionStatus.APPROVED,
+            Transaction.execution_requested_at.is_not(None)
+        ],
+        [Transaction.execution_requested_at, Transaction.transaction_id]
+    )
+
+
+def _candidatas(condiciones: list, orden: list, cantidad: int):
+    """
+    IDs de las siguientes `cantidad` transacciones de una cola sin reserva
+    vigente. FOR UPDATE SKIP LOCKED: reservas concurrentes saltan las filas
+    que otro está tomando en vez de esperarlas. (SQLite ignora la cláusula;
+    allí las escrituras ya son serializadas.)
+    """
+    return (
+        select(Transaction.transaction_id)
+        .where(*condiciones, _reserva_libre(None, datetime.utcnow()))
+        .order_by(*orden)
+        .limit(cantidad)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def _reservar(db: AsyncSession, condiciones: list, orden: list, cantidad: int, titular: str, expira: datetime) -> List[Transaction]:
+    """
+    Reserva hasta `cantidad` transacciones que cumplan las condiciones y no
+    tengan reserva vigente, así reservas concurrentes nunca reciben la misma
+    transacción (ver _candidatas).
+    """
+    candidatas = _candidatas(condiciones, orden, cantidad)
+    stmt = (
+        update(Transaction)
+        .where(Transaction.transaction_id.in_(candidatas.scalar_subquery()))
+        # La reserva no modifica la transacción: updated_at se conserva
+        .values(claimed_by=titular, claim_expires_at=expira, updated_at=Transaction.updated_at)
+        .returning(Transaction)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def reservar_pendientes(
+    db: AsyncSession,
+    aprobador: str,
+    cantidad: int,
+    expira: datetime
+) -> List[Transaction]:
+    """
+    Reserva para un aprobador las siguientes `cantidad` transacciones
+    PENDING_APPROVAL sin reserva vigente, en orden de creación.
+    No hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        aprobador: ID del aprobador
+        cantidad: Máximo de transacciones a reservar
+        expira: Fin de la reserva
+    
+    Returns:
+        List[Transaction]: Transacciones reservadas, en orden de creación
+    """
+    reservadas = await _reservar(db, *_cola_aprobacion(), cantidad, aprobador, expira)
+    return sorted(reservadas, key=lambda t: (t.created_at, t.transaction_id))
+
+
+async def solicitar_ejecucion(db: AsyncSession, transaction_id: str) -> Optional[Transaction]:
+    """
+    Encola la ejecución de una transacción APPROVED que no esté ya en cola.
+    No hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        transaction_id: UUID de la transacción
+    
+    Returns:
+        Optional[Transaction]: Transacción encolada, o None si no existe,
+        no está APPROVED o ya estaba en cola
+    """
+    stmt = (
+        update(Transaction)
+        .where(
+            Transaction.transaction_id == transaction_id,
+            Transaction.status == TransactionStatus.APPROVED,
+            Transaction.execution_requested_at.is_(None)
+        )
+        .values(
+            execution_requested_at=datetime.utcnow(),
+            execution_attempts=0,
+            execution_error=None,
+            updated_at=Transaction.updated_at
+        )
+        .returning(Transaction)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+
+async def solicitar_ejecucion_lote(db: AsyncSession, transaction_ids: List[str]) -> List[Row]:
+    """
+    Encola la ejecución de varias transacciones APPROVED con un solo UPDATE.
+    No hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        transaction_ids: UUIDs de las transacciones
+    
+    Returns:
+        List[Row]: (transaction_id, created_by) de las encoladas (las que ya estaban en cola no aparecen)
+    """
+    stmt = (
+        update(Transaction)
+        .where(
+            Transaction.transaction_id.in_(transaction_ids),
+            Transaction.status == TransactionStatus.APPROVED,
+            Transaction.execution_requested_at.is_(None)
+        )
+        .values(
+            execution_requested_at=datetime.utcnow(),
+            execution_attempts=0,
+            execution_error=None,
+            updated_at=Transaction.updated_at
+        )
+        .returning(Transaction.transaction_id, Transaction.created_by)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    return list(result.all())
+
+
+async def reservar_para_ejecucion(
+    db: AsyncSession,
+    worker_id: str,
+    cantidad: int,
+    expira: datetime
+) -> List[Transaction]:
+    """
+    Reserva para un worker las siguientes transacciones APPROVED en cola de
+    ejecución, en orden de llegada. Una transacción con reintento pendiente
+    tiene claim_expires_at en el futuro y no se toma hasta entonces.
+    No hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        worker_id: ID del worker de ejecución
+        cantidad: Máximo de transacciones a reservar
+        expira: Fin de la reserva
+    
+    Returns:
+        List[Transaction]: Transacciones reservadas
+    """
+    return await _reservar(
+        db, *_cola_ejecucion(),
+        cantidad, worker_id, expira
+    )
+
+
+async def completar_ejecuciones(db: AsyncSession, transaction_ids: List[str], worker_id: str) -> List[Row]:
+    """
+    Marca como EXECUTED las transacciones liquidadas por el worker, solo si
+    siguen APPROVED y reservadas por él (si su reserva venció y otro worker
+    la tomó, la completa ese otro). No hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        transaction_ids: UUIDs de las transacciones liquidadas
+        worker_id: ID del worker de ejecución
+    
+    Returns:
+        List[Row]: (transaction_id, currency, amount, created_by) de las transacciones actualizadas
+    """
+    if not transaction_ids:
+        return []
+    
+    stmt = (
+        update(Transaction)
+        .where(
+            Transaction.transaction_id.in_(transaction_ids),
+            Transaction.status == TransactionStatus.APPROVED,
+            Transaction.claimed_by == worker_id
+        )
+        .values(
+            status=TransactionStatus.EXECUTED,
+            claimed_by=None,
+            claim_expires_at=None,
+            execution_requested_at=None,
+            execution_error=None,
+            execution_attempts=Transaction.execution_attempts + 1
+        )
+        .returning(Transaction.transaction_id, Transaction.currency, Transaction.amount, Transaction.created_by)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    return list(result.all())
+
+
+async def registrar_fallo_ejecucion(
+    db: AsyncSession,
+    transaction_id: str,
+    worker_id: str,
+    error: str,
+    reintentar_en: Optional[datetime]
+) -> bool:
+    """
+    Registra un intento fallido. Con reintentar_en la transacción vuelve a
+    la cola a partir de esa hora; sin él sale de la cola (queda APPROVED
+    con el error, y se puede volver a solicitar su ejecución).
+    No hace commit.
+    
+    Args:
+        db: Sesión de base de datos
+        transaction_id: UUID de la transacción
+        worker_id: ID del worker de ejecución
+        error: Descripción del fallo
+        reintentar_en: Hora del siguiente intento, o None para abandonar
+    
+    Returns:
+        bool: True si se registró (el worker aún tenía la reserva)
+    """
+    values = {
+        "claimed_by": None,
+        "claim_expires_at": reintentar_en,
+        "execution_attempts": Transaction.execution_attempts + 1,
+        "execution_error": error[:500],
+        "updated_at": Transaction.updated_at,
+    }
+    if reintentar_en is None:
+        values["execution_requested_at"] = None
+    
+    result = await db.execute(
+        update(Transaction)
+        .where(
+            Transaction.transaction_id == transaction_id,
+            Transaction.claimed_by == worker_id
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+async def eliminar_transaccion(db: AsyncSession, transaction_id: str) -> bool:
+    """
+    Elimina una transacción (solo para testing/admin) y la quita del cache
+    de lecturas de este worker; en los demás vence por TRANSACTION_CACHE_TTL_SECONDS.
     
     Args:
         db: Sesión de base de datos
@@ -115,11 +705,15 @@ def eliminar_transaccion(db: Session, transaction_id: str) -> bool:
     Returns:
         bool: True si se eliminó, False si no existe
     """
-    db_transaction = obtener_transaccion_por_id(db, transaction_id)
+    db_transaction = await obtener_transaccion_por_id(db, transaction_id)
     
     if not db_transaction:
         return False
     
-    db.delete(db_transaction)
-    db.commit()
+    await crud_summary.aplicar_deltas(
+        db, {(db_transaction.status, db_transaction.currency): (-1, -db_transaction.amount)}
+    )
+    await db.delete(db_transaction)
+    await db.commit()
+    transaction_cache.invalidar([transaction_id])
     return True
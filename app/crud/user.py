@@ -1,9 +1,13 @@
-from sqlalchemy.orm import Session 
+from typing import List
+from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.user import  Usuario
 from schemas.user import *
-from core.security import hash_password
-from sqlalchemy import or_
+from core.security import hash_password_async
 from services.user_id_service import UserIdService
+from services.user_cache import invalidar_usuario
+from core.revocation import revocation_list
 
 
 
@@ -11,31 +15,68 @@ from services.user_id_service import UserIdService
 
 ### Usuarios CRUD
 
-def obtener_usuario_por_email(db: Session, email: str) -> Usuario | None:
-    return db.query(Usuario).filter(Usuario.email == email).first()
+async def obtener_usuario_por_email(db: AsyncSession, email: str) -> Usuario | None:
+    result = await db.execute(select(Usuario).where(Usuario.email == email))
+    return result.scalars().first()
 
-def obtener_usuario_por_id(db: Session, usuario_id: str) -> Usuario | None:
-    return db.query(Usuario).filter(Usuario.user_id == usuario_id).first()
+async def obtener_usuario_por_id(db: AsyncSession, usuario_id: str) -> Usuario | None:
+    result = await db.execute(select(Usuario).where(Usuario.user_id == usuario_id))
+    return result.scalars().first()
 
-def crear_usuario(db:Session, usuario: UsuarioCreate) -> Usuario:
-    existe = db.query(Usuario).filter(
-        or_(Usuario.email == usuario.email, Usuario.nombre == usuario.nombre)
-    ).first()
+async def crear_usuario(db: AsyncSession, usuario: UsuarioCreate) -> Usuario:
+    result = await db.execute(
+        select(Usuario).where(
+            or_(Usuario.email == usuario.email, Usuario.nombre == usuario.nombre)
+        )
+    )
+    existe = result.scalars().first()
     if existe:
         raise ValueError("Ya existe un usuario con este Email o Nombre")
     
-    # Generar user_id automático basado en el rol
-    user_id_service = UserIdService(db)
-    nuevo_user_id = user_id_service.generar_siguiente_user_id(usuario.role)
+    # bcrypt antes de asignar el user_id: el lock del contador dura hasta el commit
+    hashed_password = await hash_password_async(usuario.password)
+    
+    # Generar user_id automático basado en el rol, en la misma transacción
+    nuevo_user_id = await UserIdService.generar_siguiente_user_id(usuario.role, db)
     
     db_usuario = Usuario(
         user_id=nuevo_user_id,
         nombre = usuario.nombre,
         email = usuario.email,
-        hashed_password = hash_password(usuario.password),
+        hashed_password = hashed_password,
         role = usuario.role
     )   
     db.add(db_usuario)
-    db.commit()
-    db.refresh(db_usuario)
-    return db_usuario
\ No newline at end of file
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Registro concurrente con el mismo email: el rollback devuelve el user_id
+        await db.rollback()
+        raise ValueError("Ya existe un usuario con este Email o Nombre")
+    await db.refresh(db_usuario)
+    invalidar_usuario(db_usuario.email)
+    return db_usuario
+
+async def cambiar_estado_usuario(db: AsyncSession, user_id: str, activo: bool) -> Usuario | None:
+    """
+    Habilita o deshabilita un usuario. Al deshabilitarlo sus tokens quedan
+    revocados de inmediato en este worker; los demás lo toman en la
+    siguiente sincronización (REVOCATION_SYNC_SECONDS).
+    """
+    db_usuario = await obtener_usuario_por_id(db, user_id)
+    if db_usuario is None:
+        return None
+
+    db_usuario.is_active = activo
+    await db.commit()
+    await db.refresh(db_usuario)
+    invalidar_usuario(db_usuario.email)
+    if activo:
+        revocation_list.restaurar_usuario(db_usuario.user_id)
+    else:
+        revocation_list.revocar_usuario(db_usuario.user_id)
+    return db_usuario
+
+async def obtener_user_ids_deshabilitados(db: AsyncSession) -> List[str]:
+    result = await db.execute(select(Usuario.user_id).where(Usuario.is_active.is_(False)))
+    return list(result.scalars().all())
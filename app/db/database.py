@@ -1,8 +1,68 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import setting
+from db.pool_metrics import InstrumentedAsyncQueuePool
+from db.query_metrics import instrumentar_consultas
 
-engine = create_engine(setting.DATABASE_URL)
+
+def _async_url(url: str):
+    """
+    Convierte DATABASE_URL al driver async equivalente.
+    postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://
+    """
+    db_url = make_url(url)
+    backend = db_url.get_backend_name()
+
+    if backend in ("postgresql", "postgres"):
+        db_url = db_url.set(drivername="postgresql+asyncpg")
+        # asyncpg no entiende sslmode (formato libpq de Render), usa ssl
+        if "sslmode" in db_url.query:
+            sslmode = db_url.query["sslmode"]
+            db_url = db_url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    elif backend == "sqlite":
+        db_url = db_url.set(drivername="sqlite+aiosqlite")
+
+    return db_url
+
+
+def _pool_options(url: str, async_pool: bool = False) -> dict:
+    """
+    Parámetros del pool desde Setting. SQLite usa el pool por defecto
+    de su dialecto (sin tamaño configurable).
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+
+    options = {
+        "pool_size": setting.DB_POOL_SIZE,
+        "max_overflow": setting.DB_MAX_OVERFLOW,
+        "pool_timeout": setting.DB_POOL_TIMEOUT,
+        "pool_recycle": setting.DB_POOL_RECYCLE,
+        "pool_pre_ping": setting.DB_POOL_PRE_PING,
+    }
+    if async_pool:
+        options["poolclass"] = InstrumentedAsyncQueuePool
+    return options
+
+
+# Engine síncrono: solo para scripts (init_db, test_connection)
+engine = create_engine(setting.DATABASE_URL, **_pool_options(setting.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Engine async: usado por la API (no bloquea el event loop)
+async_engine = create_async_engine(
+    _async_url(setting.DATABASE_URL),
+    **_pool_options(setting.DATABASE_URL, async_pool=True)
+)
+instrumentar_consultas(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
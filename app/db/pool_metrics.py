@@ -0,0 +1,85 @@
+"""
+Métricas del pool de conexiones.
+Expone conexiones en uso, libres, overflow y tiempos de espera por checkout.
+"""
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolMetrics:
+    """Acumuladores de espera por conexión (compartidos por el proceso)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def registrar_espera(self, segundos: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += segundos
+            if segundos > self.wait_max:
+                self.wait_max = segundos
+
+    def registrar_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            promedio = self.wait_total / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(promedio * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool que mide cuánto espera cada checkout
+    (incluye la apertura de conexiones nuevas).
+    """
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.registrar_timeout()
+            raise
+        pool_metrics.registrar_espera(time.perf_counter() - inicio)
+        return connection
+
+
+def pool_status(pool: Pool) -> dict:
+    """
+    Estado actual del pool. Los pools sin tamaño fijo (NullPool/StaticPool
+    de SQLite) no reportan size/overflow.
+    """
+    estado = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        estado.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout_s": pool.timeout(),
+        })
+
+    estado["wait"] = pool_metrics.snapshot()
+    return estado
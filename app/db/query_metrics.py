@@ -0,0 +1,138 @@
+"""
+Instrumentación de las sentencias SQL con eventos del engine.
+
+Cada sentencia se mide una vez (incluye la espera de red del driver) y:
+- se registra en db_query_duration_seconds por tipo de operación;
+- se suma al conteo del request en curso (contar_consultas), que con
+  DB_QUERY_DEBUG_HEADERS se devuelve en X-DB-Query-Count / X-DB-Query-Time-Ms;
+- si supera DB_SLOW_QUERY_MS se registra en el log con los parámetros
+  redactados (solo su tipo: nunca montos, IDs ni correos).
+
+assert_max_queries fija un máximo de consultas para un bloque de código,
+p.ej. un request en proceso (ver benchmarks/query_budget.py).
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from core.config import setting
+from core.metrics import DB_QUERY_LATENCY
+
+logger = logging.getLogger(__name__)
+
+OPERACIONES = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+
+
+class ConteoConsultas:
+    """Consultas y tiempo en BD de un request o bloque. Se suma también a los conteos externos."""
+
+    def __init__(self, padre: Optional["ConteoConsultas"] = None, guardar_sentencias: bool = False):
+        self.padre = padre
+        self.consultas = 0
+        self.segundos = 0.0
+        self.sentencias: Optional[List[str]] = [] if guardar_sentencias else None
+
+    def registrar(self, statement: str, segundos: float) -> None:
+        conteo = self
+        while conteo is not None:
+            conteo.consultas += 1
+            conteo.segundos += segundos
+            if conteo.sentencias is not None:
+                conteo.sentencias.append(statement)
+            conteo = conteo.padre
+
+
+_conteo_actual: ContextVar[Optional[ConteoConsultas]] = ContextVar("conteo_consultas", default=None)
+
+
+@contextmanager
+def contar_consultas(guardar_sentencias: bool = False) -> Iterator[ConteoConsultas]:
+    """Cuenta las sentencias ejecutadas dentro del bloque (en esta tarea y las que cree)."""
+    conteo = ConteoConsultas(_conteo_actual.get(), guardar_sentencias)
+    token = _conteo_actual.set(conteo)
+    try:
+        yield conteo
+    finally:
+        _conteo_actual.reset(token)
+
+
+@contextmanager
+def assert_max_queries(maximo: int) -> Iterator[ConteoConsultas]:
+    """Falla con AssertionError (listando las sentencias) si el bloque ejecuta más de `maximo` consultas."""
+    with contar_consultas(guardar_sentencias=True) as conteo:
+        yield conteo
+    if conteo.consultas > maximo:
+        detalle = "\n".join(f"  {i}. {' '.join(s.split())}" for i, s in enumerate(conteo.sentencias, 1))
+        raise AssertionError(f"Se esperaban como máximo {maximo} consultas y se ejecutaron {conteo.consultas}:\n{detalle}")
+
+
+def operacion(statement: str) -> str:
+    """Tipo de sentencia (SELECT, INSERT, UPDATE, DELETE u OTHER)."""
+    palabra = statement.lstrip()[:6].upper()
+    return palabra if palabra in OPERACIONES else "OTHER"
+
+
+def redactar(parameters, executemany: bool) -> str:
+    """Parámetros reemplazados por su tipo; en executemany solo la cantidad de filas."""
+    if executemany:
+        return f"<{len(parameters)} filas>"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: <{type(v).__name__}>" for k, v in parameters.items()) + "}"
+    return "(" + ", ".join(f"<{type(v).__name__}>" for v in parameters or ()) + ")"
+
+
+def instrumentar_consultas(engine: Engine) -> None:
+    """Registra los eventos en el engine (para el async, su sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        # En el contexto de ejecución: si la sentencia falla no queda nada pendiente
+        context._metrics_inicio = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        segundos = time.perf_counter() - context._metrics_inicio
+        DB_QUERY_LATENCY.observe(segundos, operacion(statement))
+
+        conteo = _conteo_actual.get()
+        if conteo is not None:
+            conteo.registrar(statement, segundos)
+
+        if setting.DB_SLOW_QUERY_MS > 0 and segundos * 1000 >= setting.DB_SLOW_QUERY_MS:
+            logger.warning(
+                "Consulta lenta (%.1f ms): %s | parámetros: %s",
+                segundos * 1000, " ".join(statement.split()), redactar(parameters, executemany)
+            )
+
+
+class QueryCountMiddleware:
+    """
+    Modo debug (DB_QUERY_DEBUG_HEADERS): agrega a cada respuesta la cantidad
+    de consultas y el tiempo en BD del request. Cuenta lo ejecutado hasta que
+    se envían los headers (con FastAPI, todo el endpoint y sus dependencias).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with contar_consultas() as conteo:
+            async def send_con_conteo(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (QUERY_COUNT_HEADER.lower().encode(), str(conteo.consultas).encode()),
+                        (QUERY_TIME_HEADER.lower().encode(), f"{conteo.segundos * 1000:.2f}".encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_con_conteo)
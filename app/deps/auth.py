@@ -1,6 +1,7 @@
-from fastapi import Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from typing import Optional
 from models.transaction import UserRole
+from core.metrics import etiquetar_rol, registrar_fallo_auth
 
 
 async def get_user_role(
@@ -19,6 +20,7 @@ async def get_user_role(
         HTTPException: Si el header no está presente o el rol es inválido
     """
     if not x_user_role:
+        registrar_fallo_auth("v1", "missing_role")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Header X-User-Role es requerido"
@@ -27,12 +29,15 @@ async def get_user_role(
     # Validar que el rol sea válido
     try:
         role = UserRole(x_user_role.upper())
-        return role.value
     except ValueError:
+        registrar_fallo_auth("v1", "invalid_role")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Rol inválido. Valores permitidos: {', '.join([r.value for r in UserRole])}"
         )
+    
+    etiquetar_rol(role.value)
+    return role.value
 
 
 async def get_user_id(
@@ -51,6 +56,7 @@ async def get_user_id(
         HTTPException: Si el header no está presente
     """
     if not x_user_id:
+        registrar_fallo_auth("v1", "missing_user_id")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Header X-User-Id es requerido"
@@ -59,12 +65,27 @@ async def get_user_id(
     return x_user_id
 
 
-async def require_operador(role: str = Header(..., alias="X-User-Role")) -> str:
+async def get_optional_user_id(
+    x_user_id: Optional[str] = Header(None, description="ID del usuario (opcional)")
+) -> Optional[str]:
+    """
+    Extrae el ID del usuario desde el header X-User-Id, si viene.
+    
+    Args:
+        x_user_id: Header con el ID del usuario
+    
+    Returns:
+        Optional[str]: ID del usuario o None
+    """
+    return x_user_id or None
+
+
+async def require_operador(role: str = Depends(get_user_role)) -> str:
     """
     Valida que el usuario tenga rol OPERADOR.
     
     Args:
-        role: Rol del usuario desde header
+        role: Rol del usuario validado desde el header X-User-Role
     
     Returns:
         str: Rol validado
@@ -72,20 +93,21 @@ async def require_operador(role: str = Header(..., alias="X-User-Role")) -> str:
     Raises:
         HTTPException: Si el usuario no es OPERADOR
     """
-    if role.upper() != UserRole.OPERADOR.value:
+    if role != UserRole.OPERADOR.value:
+        registrar_fallo_auth("v1", "forbidden_role")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Se requiere rol OPERADOR para esta acción"
         )
-    return role.upper()
+    return role
 
 
-async def require_aprobador(role: str = Header(..., alias="X-User-Role")) -> str:
+async def require_aprobador(role: str = Depends(get_user_role)) -> str:
     """
     Valida que el usuario tenga rol APROBADOR.
     
     Args:
-        role: Rol del usuario desde header
+        role: Rol del usuario validado desde el header X-User-Role
     
     Returns:
         str: Rol validado
@@ -93,9 +115,10 @@ async def require_aprobador(role: str = Header(..., alias="X-User-Role")) -> str
     Raises:
         HTTPException: Si el usuario no es APROBADOR
     """
-    if role.upper() != UserRole.APROBADOR.value:
+    if role != UserRole.APROBADOR.value:
+        registrar_fallo_auth("v1", "forbidden_role")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Se requiere rol APROBADOR para esta acción"
         )
-    return role.upper()
+    return role
@@ -1,33 +1,38 @@
 """
 Dependencias de autenticación para API v2 con JWT real.
-Valida token y obtiene usuario + rol desde la base de datos.
+Valida token y obtiene usuario + rol desde la base de datos, o directamente
+desde los claims firmados del token si AUTH_STATELESS_JWT está activo.
 """
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 from core.security import verificar_token
 from core.config import setting
 from deps.deps import get_db
-from crud.user import obtener_usuario_por_email
+from core.revocation import revocation_list
+from services.user_cache import UsuarioActual, obtener_usuario_actual
 from models.transaction import UserRole
+from core.metrics import etiquetar_rol, registrar_fallo_auth
 
 oauth2_scheme_v2 = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
 async def get_current_user_v2(
     token: str = Depends(oauth2_scheme_v2),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Obtiene el usuario actual desde el token JWT.
-    Valida contra la base de datos.
+    Con AUTH_STATELESS_JWT y un token que trae user_id/nombre/role, se
+    resuelve sin tocar la BD; si no, valida contra la base de datos
+    (con cache por email). En ambos casos se consulta la lista de revocación.
     
     Returns:
-        Usuario: Objeto usuario de la BD
+        UsuarioActual: Usuario autenticado
     
     Raises:
-        HTTPException: Si el token es inválido o el usuario no existe
+        HTTPException: Si el token es inválido, fue revocado o el usuario no existe
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,17 +42,43 @@ async def get_current_user_v2(
     
     try:
         payload = verificar_token(token)
+        if payload is None:
+            registrar_fallo_auth("v2", "invalid_token")
+            raise credentials_exception
         email: str = payload.get("sub")
         if email is None:
+            registrar_fallo_auth("v2", "invalid_token")
             raise credentials_exception
     except JWTError:
+        registrar_fallo_auth("v2", "invalid_token")
+        raise credentials_exception
+    
+    if revocation_list.esta_revocado(payload):
+        registrar_fallo_auth("v2", "revoked")
         raise credentials_exception
     
-    # Obtener usuario de la BD
-    user = obtener_usuario_por_email(db, email)
-    if user is None:
+    # Fast path: claims firmados, sin consulta a la BD
+    if setting.AUTH_STATELESS_JWT and payload.get("user_id") and payload.get("nombre"):
+        try:
+            role = UserRole(payload.get("role"))
+        except ValueError:
+            registrar_fallo_auth("v2", "invalid_token")
+            raise credentials_exception
+        etiquetar_rol(role.value)
+        return UsuarioActual(
+            user_id=payload["user_id"],
+            nombre=payload["nombre"],
+            email=email,
+            role=role
+        )
+    
+    # Obtener usuario de la BD (o del cache)
+    user = await obtener_usuario_actual(db, email)
+    if user is None or revocation_list.esta_revocado({"user_id": user.user_id}):
+        registrar_fallo_auth("v2", "unknown_user" if user is None else "revoked")
         raise credentials_exception
     
+    etiquetar_rol(user.role.value)
     return user
 
 
@@ -85,6 +116,7 @@ async def require_operador_v2(
         HTTPException: Si el usuario no es OPERADOR
     """
     if not current_user.role or current_user.role != UserRole.OPERADOR:
+        registrar_fallo_auth("v2", "forbidden_role")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Se requiere rol OPERADOR para esta acción"
@@ -105,6 +137,7 @@ async def require_aprobador_v2(
         HTTPException: Si el usuario no es APROBADOR
     """
     if not current_user.role or current_user.role != UserRole.APROBADOR:
+        registrar_fallo_auth("v2", "forbidden_role")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Se requiere rol APROBADOR para esta acción"
@@ -1,25 +1,26 @@
+import secrets
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from jose import JWTError
-from sqlalchemy.orm import Session
-from db.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import AsyncSessionLocal
 from core.security import verificar_token
-from crud import user as crud_user
+from core.config import setting
+from core.revocation import revocation_list
+from services.user_cache import obtener_usuario_actual
+from core.metrics import etiquetar_rol, registrar_fallo_auth
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 ## DB connection
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 ## Validacion usuarios
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     cred_exc = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -28,13 +29,36 @@ def get_current_user(
     )
     try:
         payload = verificar_token(token)
+        if payload is None:
+            registrar_fallo_auth("v1", "invalid_token")
+            raise cred_exc
         email: str | None = payload.get("sub")
         if email is None:
+            registrar_fallo_auth("v1", "invalid_token")
             raise cred_exc
     except JWTError:
+        registrar_fallo_auth("v1", "invalid_token")
+        raise cred_exc
+    
+    if revocation_list.esta_revocado(payload):
+        registrar_fallo_auth("v1", "revoked")
         raise cred_exc
     
-    user = crud_user.obtener_usuario_por_email(db, email)
-    if user is None: 
+    user = await obtener_usuario_actual(db, email)
+    if user is None or revocation_list.esta_revocado({"user_id": user.user_id}): 
+        registrar_fallo_auth("v1", "unknown_user" if user is None else "revoked")
         raise cred_exc
+    etiquetar_rol(user.role.value)
     return user
+
+## Administración
+async def require_admin(x_admin_key: str | None = Header(default=None)):
+    """Valida el header X-Admin-Key contra ADMIN_API_KEY (sin configurar, nadie es admin)."""
+    if not setting.ADMIN_API_KEY or not x_admin_key or not secrets.compare_digest(x_admin_key, setting.ADMIN_API_KEY):
+        registrar_fallo_auth("v1", "invalid_admin_key")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Se requiere X-Admin-Key válido")
+
+async def require_metrics(x_admin_key: str | None = Header(default=None)):
+    """GET /metrics: requiere X-Admin-Key salvo con METRICS_PUBLIC."""
+    if not setting.METRICS_PUBLIC:
+        await require_admin(x_admin_key)
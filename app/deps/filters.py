@@ -0,0 +1,57 @@
+from fastapi import HTTPException, Query, status
+from decimal import Decimal
+from datetime import datetime
+from typing import Optional
+from models.transaction import TransactionStatus
+from schemas.transaction import TransactionFilters
+
+
+async def get_transaction_filters(
+    status_filter: Optional[TransactionStatus] = Query(None, alias="status", description="Estado de la transacción"),
+    currency: Optional[str] = Query(None, min_length=3, max_length=3, description="Moneda (ISO 4217)"),
+    created_by: Optional[str] = Query(None, description="ID del operador creador"),
+    approved_by: Optional[str] = Query(None, description="ID del aprobador"),
+    min_amount: Optional[Decimal] = Query(None, ge=0, description="Monto mínimo (inclusive)"),
+    max_amount: Optional[Decimal] = Query(None, ge=0, description="Monto máximo (inclusive)"),
+    created_from: Optional[datetime] = Query(None, description="Creadas desde (inclusive)"),
+    created_to: Optional[datetime] = Query(None, description="Creadas hasta (exclusivo)"),
+    updated_from: Optional[datetime] = Query(None, description="Actualizadas desde (inclusive)"),
+    updated_to: Optional[datetime] = Query(None, description="Actualizadas hasta (exclusivo)")
+) -> TransactionFilters:
+    """
+    Extrae los filtros de búsqueda desde los query params.
+    
+    Returns:
+        TransactionFilters: Filtros a aplicar (los no enviados quedan en None)
+    
+    Raises:
+        HTTPException: Si un rango tiene el inicio mayor que el fin
+    """
+    if min_amount is not None and max_amount is not None and min_amount > max_amount:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_amount no puede ser mayor que max_amount"
+        )
+    
+    for desde, hasta, campo in (
+        (created_from, created_to, "created"),
+        (updated_from, updated_to, "updated"),
+    ):
+        if desde and hasta and desde > hasta:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{campo}_from no puede ser posterior a {campo}_to"
+            )
+    
+    return TransactionFilters(
+        status=status_filter,
+        currency=currency,
+        created_by=created_by,
+        approved_by=approved_by,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        created_from=created_from,
+        created_to=created_to,
+        updated_from=updated_from,
+        updated_to=updated_to
+    )
@@ -1,13 +1,61 @@
 """
 Script para inicializar/reiniciar la base de datos.
 Crea todas las tablas definidas en los modelos.
+
+    python init_db.py            # borra y recrea todas las tablas
+    python init_db.py --migrate  # actualiza una BD existente sin borrar datos
 """
+import argparse
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
 from db.database import engine, Base
 from models.user import Usuario
 from models.transaction import Transaction
+from models.counter import Counter
+from models.summary import TransactionSummary
+from models.idempotency import IdempotencyKey
+from models.event import TransactionEvent
+from rebuild_summary import sembrar_si_vacio
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    migrar()
+
+
+def migrar():
+    """
+    Agrega a las tablas existentes las columnas e índices que los modelos
+    tienen y la BD no (create_all solo crea tablas nuevas), y carga el
+    resumen por estado y moneda si está vacío. Idempotente: se puede correr
+    en cada despliegue. Las columnas NOT NULL nuevas necesitan
+    server_default para completar las filas existentes.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existentes = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existentes:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    raise RuntimeError(f"{table.name}.{column.name} es NOT NULL sin server_default: no se puede agregar")
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                print(f"Columna agregada: {table.name}.{column.name}")
+
+            indices = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indices:
+                    index.create(conn)
+                    print(f"Índice creado: {index.name}")
+
+    # Resumen incremental: en una BD con transacciones previas arranca vacío
+    with engine.begin() as conn:
+        if sembrar_si_vacio(conn):
+            print("Resumen de transacciones cargado desde transactions")
 
 
 def drop_all_tables():
@@ -18,4 +66,11 @@ def reset_db():
     init_db()
 
 if __name__ == "__main__":
-    reset_db()
+    parser = argparse.ArgumentParser(description="Inicializar o migrar la base de datos")
+    parser.add_argument("--migrate", action="store_true", help="Crear lo que falte sin borrar datos")
+    args = parser.parse_args()
+
+    if args.migrate:
+        init_db()
+    else:
+        reset_db()
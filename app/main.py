@@ -1,7 +1,31 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from api.v1.api import api_router as api_router_v1
 from api.v2.api import api_router as api_router_v2
+from api.metrics import api_router as metrics_router
+from core.config import setting
+from core.idempotency import IdempotencyMiddleware
+from core.metrics import MetricsMiddleware
+from db.query_metrics import QueryCountMiddleware, QUERY_COUNT_HEADER, QUERY_TIME_HEADER
+from core.security import shutdown_hash_executor
+from services.execution_worker import execution_worker
+from services.event_hub import event_hub
+from services.revocation_sync import revocation_sync
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if setting.EXECUTION_WORKER_ENABLED:
+        await execution_worker.iniciar()
+    await event_hub.iniciar()
+    await revocation_sync.iniciar()
+    yield
+    await revocation_sync.detener()
+    await event_hub.detener()
+    await execution_worker.detener()
+    shutdown_hash_executor()
 
 
 app = FastAPI(
@@ -18,9 +42,14 @@ app = FastAPI(
     - Reference autogenerado consecutivo
     - Validación de usuarios con roles en BD
     """,
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Reintentos con Idempotency-Key reciben la respuesta guardada
+app.add_middleware(IdempotencyMiddleware)
+
 # Configuración de CORS para permitir peticiones desde el frontend
 app.add_middleware(
     CORSMiddleware,
@@ -36,9 +65,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],              # Permite GET, POST, PUT, DELETE, etc.
     allow_headers=["*"],              # Permite todos los headers (incluye X-User-Role, X-User-Id)
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", "ETag", QUERY_COUNT_HEADER, QUERY_TIME_HEADER],  # Legibles desde el navegador
 )
 
+# Modo debug: consultas SQL y tiempo en BD de cada request en headers
+if setting.DB_QUERY_DEBUG_HEADERS:
+    app.add_middleware(QueryCountMiddleware)
+
+# Último en agregarse = el más externo: mide también CORS e idempotencia
+app.add_middleware(MetricsMiddleware)
+
 # Registrar ambas versiones
 app.include_router(api_router_v1, prefix="/api/v1")
 app.include_router(api_router_v2, prefix="/api/v2")
+app.include_router(metrics_router)
 
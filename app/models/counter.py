@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, BigInteger
+from db.database import Base
+
+
+class Counter(Base):
+    """
+    Contador atómico por nombre (referencias TRX, user_ids por rol).
+    value guarda el último número asignado.
+    """
+    __tablename__ = "counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Counter {self.name}={self.value}>"
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Enum as SQLAlchemyEnum, Index
+from db.database import Base
+from models.transaction import TransactionStatus
+from datetime import datetime
+import enum
+
+
+class TransactionEventType(str, enum.Enum):
+    CREATED = "CREATED"
+    SUBMITTED = "SUBMITTED"
+    APPROVED = "APPROVED"
+    REJECTED = "REJECTED"
+    EXECUTION_REQUESTED = "EXECUTION_REQUESTED"
+    EXECUTED = "EXECUTED"
+    EXECUTION_FAILED = "EXECUTION_FAILED"
+
+
+class TransactionEvent(Base):
+    """
+    Bitácora de auditoría (solo inserciones): una fila por creación,
+    transición o evento de ejecución de una transacción.
+    """
+    __tablename__ = "transaction_events"
+
+    # BIGINT autoincremental; en SQLite solo INTEGER PRIMARY KEY es autoincremental
+    event_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    transaction_id = Column(String, nullable=False)
+    event_type = Column(SQLAlchemyEnum(TransactionEventType), nullable=False)
+    from_status = Column(SQLAlchemyEnum(TransactionStatus), nullable=True)
+    to_status = Column(SQLAlchemyEnum(TransactionStatus), nullable=False)
+    actor = Column(String, nullable=True)
+    detail = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Historial de una transacción en orden
+        Index("ix_transaction_events_transaction_id_event_id", "transaction_id", "event_id"),
+    )
+
+    def __repr__(self):
+        return f"<TransactionEvent {self.transaction_id} {self.event_type.value} by {self.actor}>"
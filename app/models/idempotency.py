@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Integer, LargeBinary, Text, DateTime, Index
+from db.database import Base
+from datetime import datetime
+
+
+class IdempotencyKey(Base):
+    """
+    Respuesta guardada de un POST con header Idempotency-Key.
+    status_code NULL = la primera solicitud sigue en curso; su worker renueva
+    lock_expires_at mientras corre y solo vencido otro puede tomar la clave.
+    """
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String, primary_key=True)          # identidad del cliente
+    key = Column(String(255), primary_key=True)       # valor del header
+    request_hash = Column(String(64), nullable=False) # método + ruta + cuerpo
+    status_code = Column(Integer, nullable=True)
+    response_headers = Column(Text, nullable=True)    # JSON [[nombre, valor], ...]
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    lock_expires_at = Column(DateTime, nullable=True)  # lease de la solicitud en curso
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.scope}/{self.key} status={self.status_code}>"
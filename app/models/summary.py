@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, BigInteger, Numeric, Enum as SQLAlchemyEnum
+from db.database import Base
+from models.transaction import TransactionStatus
+
+
+class TransactionSummary(Base):
+    """
+    Conteo y monto total de transacciones por (status, currency).
+    Se actualiza en la misma transacción de BD que cada creación/transición,
+    así el resumen se lee sin recorrer la tabla de transacciones.
+    """
+    __tablename__ = "transaction_summary"
+
+    status = Column(SQLAlchemyEnum(TransactionStatus), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    total = Column(Numeric(precision=24, scale=2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TransactionSummary {self.status.value}/{self.currency} count={self.count} total={self.total}>"
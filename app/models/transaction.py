@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Numeric, Enum as SQLAlchemyEnum, DateTime
+from sqlalchemy import Column, String, Integer, Numeric, Enum as SQLAlchemyEnum, DateTime, Index
 from db.database import Base
 from datetime import datetime
 import enum
@@ -32,8 +32,31 @@ class Transaction(Base):
     )
     created_by = Column(String, nullable=False)
     approved_by = Column(String, nullable=True)
+    # Reserva (lease): de un aprobador sobre una PENDING_APPROVAL o de un
+    # worker de ejecución sobre una APPROVED en cola
+    claimed_by = Column(String, nullable=True)
+    claim_expires_at = Column(DateTime, nullable=True)
+    # Cola de ejecución: NULL = no solicitada (o abandonada tras agotar reintentos)
+    execution_requested_at = Column(DateTime, nullable=True)
+    execution_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    execution_error = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    __table_args__ = (
+        # Paginación por cursor: ORDER BY created_at, transaction_id
+        Index("ix_transactions_created_at_id", "created_at", "transaction_id"),
+        Index("ix_transactions_created_by_created_at_id", "created_by", "created_at", "transaction_id"),
+        # Filtros de búsqueda: igualdad + orden de paginación en un mismo índice
+        Index("ix_transactions_status_created_at_id", "status", "created_at", "transaction_id"),
+        Index("ix_transactions_currency_created_at_id", "currency", "created_at", "transaction_id"),
+        Index("ix_transactions_approved_by_created_at_id", "approved_by", "created_at", "transaction_id"),
+        # Filtros por rango
+        Index("ix_transactions_amount", "amount"),
+        Index("ix_transactions_updated_at", "updated_at"),
+        # Cola de ejecución: APPROVED con ejecución solicitada, en orden de llegada
+        Index("ix_transactions_status_execution_requested_at", "status", "execution_requested_at"),
+    )
+    
     def __repr__(self):
         return f"<Transaction {self.transaction_id} - {self.reference} - {self.status}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, Boolean, Enum as SQLAlchemyEnum, true
 from db.database import Base
 from models.transaction import UserRole
 
@@ -10,4 +10,6 @@ class Usuario(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     role = Column(SQLAlchemyEnum(UserRole), nullable=False)  # OPERADOR o APROBADOR
+    # False = deshabilitado: no puede iniciar sesión y sus tokens quedan revocados
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
 
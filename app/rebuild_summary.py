@@ -0,0 +1,110 @@
+"""
+Script para recalcular desde cero el resumen de transacciones (transaction_summary).
+
+Agrupa la tabla transactions por (status, currency), compara con el resumen
+incremental actual y muestra las diferencias. Con --check solo verifica
+(exit 1 si hay diferencias); sin él reemplaza el resumen por el recalculado.
+init_db.py --migrate carga el resumen automáticamente si está vacío.
+
+Uso (desde la carpeta app/):
+    python rebuild_summary.py           # recalcular y reemplazar
+    python rebuild_summary.py --check   # solo verificar
+"""
+import argparse
+import sys
+from decimal import Decimal
+from sqlalchemy import delete, func, insert, select, text
+from db.database import engine, Base
+from models.transaction import Transaction
+from models.summary import TransactionSummary
+
+
+def recalcular(connection) -> dict:
+    result = connection.execute(
+        select(
+            Transaction.status,
+            Transaction.currency,
+            func.count(),
+            func.coalesce(func.sum(Transaction.amount), 0)
+        ).group_by(Transaction.status, Transaction.currency)
+    )
+    return {(estado, currency): (count, Decimal(total)) for estado, currency, count, total in result}
+
+
+def leer_resumen(connection) -> dict:
+    result = connection.execute(
+        select(
+            TransactionSummary.status,
+            TransactionSummary.currency,
+            TransactionSummary.count,
+            TransactionSummary.total
+        ).where(TransactionSummary.count != 0)
+    )
+    return {(estado, currency): (count, Decimal(total)) for estado, currency, count, total in result}
+
+
+def bloquear_escrituras(connection) -> None:
+    if connection.dialect.name == "postgresql":
+        # Bloquea escrituras mientras se recalcula (las lecturas siguen)
+        connection.execute(text(f"LOCK TABLE {Transaction.__tablename__} IN SHARE MODE"))
+
+
+def reemplazar_resumen(connection, esperado: dict) -> None:
+    connection.execute(delete(TransactionSummary))
+    if esperado:
+        connection.execute(insert(TransactionSummary), [
+            {"status": estado, "currency": currency, "count": count, "total": total}
+            for (estado, currency), (count, total) in esperado.items()
+        ])
+
+
+def sembrar_si_vacio(connection) -> bool:
+    """
+    Carga el resumen recalculado si la tabla está vacía (BD con transacciones
+    anteriores al resumen). Retorna True si lo cargó.
+    """
+    bloquear_escrituras(connection)
+    if connection.execute(select(TransactionSummary.status).limit(1)).first() is not None:
+        return False
+    esperado = recalcular(connection)
+    if not esperado:
+        return False
+    reemplazar_resumen(connection, esperado)
+    return True
+
+
+def rebuild_summary(check: bool = False) -> bool:
+    """Retorna True si el resumen actual coincidía con el recalculado."""
+    Base.metadata.create_all(bind=engine, tables=[TransactionSummary.__table__])
+
+    with engine.begin() as connection:
+        bloquear_escrituras(connection)
+        esperado = recalcular(connection)
+        actual = leer_resumen(connection)
+
+        diferencias = sorted(
+            (clave for clave in esperado.keys() | actual.keys() if esperado.get(clave) != actual.get(clave)),
+            key=lambda clave: (clave[0].value, clave[1])
+        )
+        for estado, currency in diferencias:
+            print(
+                f"{estado.value}/{currency}: resumen={actual.get((estado, currency))} "
+                f"recalculado={esperado.get((estado, currency))}"
+            )
+        print(f"{len(esperado)} grupos, {len(diferencias)} diferencias")
+
+        if not check:
+            reemplazar_resumen(connection, esperado)
+            print("Resumen reconstruido")
+
+    return not diferencias
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcula el resumen de transacciones")
+    parser.add_argument("--check", action="store_true", help="Solo verificar, sin reemplazar")
+    args = parser.parse_args()
+
+    coincide = rebuild_summary(check=args.check)
+    if args.check and not coincide:
+        sys.exit(1)
@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field, validator
 from decimal import Decimal
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+from core.config import setting
 from models.transaction import TransactionStatus, UserRole
+from models.event import TransactionEventType
 
 
 # ========== Request Schemas ==========
@@ -46,6 +48,49 @@ class TransactionCreateV2(BaseModel):
             }
         }
 
+class TransactionBatchCreate(BaseModel):
+    """Schema para crear transacciones en lote (v1 - con reference manual)"""
+    items: List[TransactionCreate] = Field(..., min_length=1, max_length=setting.BATCH_MAX_ITEMS)
+    atomic: bool = Field(True, description="True: todo o nada. False: se crean las válidas y se reportan las fallidas")
+
+
+class TransactionBatchCreateV2(BaseModel):
+    """Schema para crear transacciones en lote (v2 - reference autogenerado)"""
+    items: List[TransactionCreateV2] = Field(..., min_length=1, max_length=setting.BATCH_MAX_ITEMS)
+    atomic: bool = Field(True, description="True: todo o nada. False: se crean las válidas y se reportan las fallidas")
+
+class TransactionBatchTransition(BaseModel):
+    """Schema para aplicar una transición de estado a varias transacciones"""
+    transaction_ids: List[str] = Field(..., min_length=1, max_length=setting.BATCH_MAX_ITEMS)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "transaction_ids": [
+                    "123e4567-e89b-12d3-a456-426614174000",
+                    "123e4567-e89b-12d3-a456-426614174001"
+                ]
+            }
+        }
+
+class TransactionFilters(BaseModel):
+    """Filtros de listado/exportación (query params). Todos opcionales y combinables."""
+    status: Optional[TransactionStatus] = None
+    currency: Optional[str] = Field(None, min_length=3, max_length=3)
+    created_by: Optional[str] = None
+    approved_by: Optional[str] = None
+    min_amount: Optional[Decimal] = Field(None, description="Monto mínimo (inclusive)")
+    max_amount: Optional[Decimal] = Field(None, description="Monto máximo (inclusive)")
+    created_from: Optional[datetime] = Field(None, description="Creadas desde (inclusive)")
+    created_to: Optional[datetime] = Field(None, description="Creadas hasta (exclusivo)")
+    updated_from: Optional[datetime] = Field(None, description="Actualizadas desde (inclusive)")
+    updated_to: Optional[datetime] = Field(None, description="Actualizadas hasta (exclusivo)")
+    
+    @validator('currency')
+    def currency_must_be_uppercase(cls, v):
+        """Valida que la moneda esté en mayúsculas"""
+        return v.upper() if v else v
+
 # ========== Response Schemas ==========
 
 class TransactionResponse(BaseModel):
@@ -91,6 +136,106 @@ class TransactionStatusUpdate(BaseModel):
         }
 
 
+class BatchItemResult(BaseModel):
+    """Resultado de un elemento dentro de un lote"""
+    index: int
+    success: bool
+    transaction: Optional[TransactionResponse] = None
+    error: Optional[str] = None
+
+
+class BatchCreateResponse(BaseModel):
+    """Schema de respuesta de creación en lote"""
+    atomic: bool
+    total: int
+    created: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+class BatchTransitionResult(BaseModel):
+    """Resultado de la transición de una transacción dentro de un lote"""
+    transaction_id: str
+    success: bool
+    result: str  # ok | not_found | wrong_state | claimed
+    status: Optional[TransactionStatus] = None
+    error: Optional[str] = None
+
+
+class BatchTransitionResponse(BaseModel):
+    """Schema de respuesta de transiciones en lote"""
+    target_status: TransactionStatus
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchTransitionResult]
+
+
+class ClaimResponse(BaseModel):
+    """Schema de respuesta de la reserva de transacciones pendientes"""
+    claimed_by: str
+    claim_expires_at: datetime
+    claimed: int
+    transactions: List[TransactionResponse]
+
+
+class SummaryItem(BaseModel):
+    """Conteo y monto total de un par (status, currency)"""
+    status: TransactionStatus
+    currency: str
+    count: int
+    total: Decimal
+    
+    class Config:
+        from_attributes = True
+
+
+class TransactionSummaryResponse(BaseModel):
+    """Schema de respuesta del resumen de transacciones"""
+    total_count: int
+    by_status: Dict[TransactionStatus, int]
+    items: List[SummaryItem]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total_count": 3,
+                "by_status": {"DRAFT": 1, "APPROVED": 2},
+                "items": [
+                    {"status": "APPROVED", "currency": "MXN", "count": 2, "total": "7500.00"},
+                    {"status": "DRAFT", "currency": "USD", "count": 1, "total": "100.00"}
+                ]
+            }
+        }
+
+
+class TransactionEventResponse(BaseModel):
+    """Schema de un evento de la bitácora de una transacción"""
+    event_id: int
+    transaction_id: str
+    event_type: TransactionEventType
+    from_status: Optional[TransactionStatus] = None
+    to_status: TransactionStatus
+    actor: Optional[str] = None
+    detail: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+        json_schema_extra = {
+            "example": {
+                "event_id": 42,
+                "transaction_id": "123e4567-e89b-12d3-a456-426614174000",
+                "event_type": "APPROVED",
+                "from_status": "PENDING_APPROVAL",
+                "to_status": "APPROVED",
+                "actor": "ap-456",
+                "detail": None,
+                "created_at": "2026-01-02T11:00:00"
+            }
+        }
+
+
 # ========== Message Response ==========
 
 class MessageResponse(BaseModel):
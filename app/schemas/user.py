@@ -14,5 +14,6 @@ class UsuarioResponse(UsuarioBase):
     id: int
     user_id: str  # op-001, ap-001, etc.
     role: UserRole
+    is_active: bool = True
     class Config:
         from_attributes = True    
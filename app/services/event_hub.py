@@ -0,0 +1,292 @@
+"""
+Hub de eventos para el stream SSE (GET /api/v2/transactions/stream).
+
+Los eventos de transacciones se publican al confirmarse el commit que los
+registra (EventService) y se reparten a los suscriptores de este proceso.
+Cada suscriptor tiene una cola acotada y solo recibe lo que su rol puede
+ver (OPERADOR sus transacciones, APROBADOR todas); cada evento se serializa
+una sola vez sin importar cuántos suscriptores lo reciban. Un suscriptor
+que no consume a tiempo se desconecta y retoma con Last-Event-ID.
+
+Un búfer circular con los últimos eventos permite retomar sin ir a la BD;
+si el ID ya salió del búfer se completa desde transaction_events. Con
+varios workers de uvicorn, un sondeo periódico de transaction_events (una
+consulta por proceso, no por suscriptor) trae los eventos de los demás.
+Otros componentes (p.ej. el cache de transacciones) se registran como
+oyentes para enterarse de cada evento nuevo, local o de otro proceso.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Set
+import orjson
+from core.config import setting
+from db.database import AsyncSessionLocal
+import crud.event as crud_event
+
+logger = logging.getLogger(__name__)
+
+
+class EventoSSE(NamedTuple):
+    event_id: int
+    created_by: str
+    frame: bytes
+
+
+class Suscripcion:
+
+    def __init__(self, created_by: Optional[str], tamano_cola: int):
+        self.created_by = created_by  # None = todas las transacciones
+        # None en la cola = fin del stream (desbordada o cierre del servidor)
+        self.cola: "asyncio.Queue[Optional[EventoSSE]]" = asyncio.Queue(maxsize=tamano_cola)
+
+    def cerrar(self) -> None:
+        while not self.cola.empty():
+            self.cola.get_nowait()
+        self.cola.put_nowait(None)
+
+
+def frame_sse(evento: dict) -> bytes:
+    """Mensaje SSE de un evento: id, tipo y el evento como JSON en data."""
+    data = orjson.dumps({
+        "event_id": evento["event_id"],
+        "transaction_id": evento["transaction_id"],
+        "event_type": evento["event_type"],
+        "from_status": evento["from_status"],
+        "to_status": evento["to_status"],
+        "actor": evento["actor"],
+        "detail": evento["detail"],
+        "created_by": evento["created_by"],
+        "created_at": evento["created_at"],
+    })
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+        evento["event_id"], evento["event_type"].value.encode(), data
+    )
+
+
+def _evento_de_fila(fila) -> dict:
+    evento, created_by = fila
+    return {
+        "event_id": evento.event_id,
+        "transaction_id": evento.transaction_id,
+        "event_type": evento.event_type,
+        "from_status": evento.from_status,
+        "to_status": evento.to_status,
+        "actor": evento.actor,
+        "detail": evento.detail,
+        "created_by": created_by,
+        "created_at": evento.created_at,
+    }
+
+
+class EventHub:
+
+    def __init__(
+        self,
+        max_suscriptores: int = setting.SSE_MAX_SUBSCRIBERS,
+        tamano_buffer: int = setting.SSE_BUFFER_SIZE,
+        tamano_cola: int = setting.SSE_QUEUE_SIZE,
+        intervalo_sondeo: float = setting.SSE_POLL_INTERVAL_SECONDS,
+        espera_huecos: float = setting.SSE_GAP_WAIT_SECONDS
+    ):
+        self.max_suscriptores = max_suscriptores
+        self.tamano_cola = max(1, tamano_cola)
+        self.intervalo_sondeo = intervalo_sondeo
+        self.espera_huecos = espera_huecos
+
+        self._buffer: Deque[EventoSSE] = deque(maxlen=max(1, tamano_buffer))
+        self._ids: Set[int] = set()  # event_id en el búfer (evita duplicados)
+        self._por_creador: Dict[str, Set[Suscripcion]] = {}
+        self._todas: Set[Suscripcion] = set()
+        self._oyentes: List[Callable[[List[dict]], None]] = []
+
+        self._tarea: Optional[asyncio.Task] = None
+        self._ultimo_sondeado: Optional[int] = None
+        self._huecos: Dict[int, float] = {}  # event_id faltante -> límite de espera
+
+        self.publicados = 0
+        self.entregados = 0
+        self.desbordados = 0
+        self.sondeados = 0
+
+    @property
+    def suscriptores(self) -> int:
+        return len(self._todas) + sum(len(s) for s in self._por_creador.values())
+
+    def suscribir(self, created_by: Optional[str] = None) -> Optional[Suscripcion]:
+        """Retorna la suscripción, o None si se alcanzó SSE_MAX_SUBSCRIBERS."""
+        if self.suscriptores >= self.max_suscriptores:
+            return None
+        suscripcion = Suscripcion(created_by, self.tamano_cola)
+        if created_by is None:
+            self._todas.add(suscripcion)
+        else:
+            self._por_creador.setdefault(created_by, set()).add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        if suscripcion.created_by is None:
+            self._todas.discard(suscripcion)
+            return
+        grupo = self._por_creador.get(suscripcion.created_by)
+        if grupo is not None:
+            grupo.discard(suscripcion)
+            if not grupo:
+                del self._por_creador[suscripcion.created_by]
+
+    def agregar_oyente(self, oyente: Callable[[List[dict]], None]) -> None:
+        """Registra una función (no bloqueante) que recibe cada lote de eventos nuevos."""
+        self._oyentes.append(oyente)
+
+    def publicar(self, eventos: Iterable[dict]) -> None:
+        """
+        Reparte eventos ya confirmados (con event_id y created_by). No bloquea:
+        se llama desde el after_commit de la sesión.
+        """
+        nuevos = [e for e in eventos if e["event_id"] not in self._ids]  # el sondeo repite los locales
+        if not nuevos:
+            return
+
+        for oyente in self._oyentes:
+            try:
+                oyente(nuevos)
+            except Exception:
+                logger.exception("Error en un oyente del event hub")
+
+        for evento in nuevos:
+            if len(self._buffer) == self._buffer.maxlen:
+                self._ids.discard(self._buffer[0].event_id)
+            sse = EventoSSE(evento["event_id"], evento["created_by"], frame_sse(evento))
+            self._buffer.append(sse)
+            self._ids.add(sse.event_id)
+            self.publicados += 1
+
+            for suscripcion in (*self._todas, *self._por_creador.get(sse.created_by, ())):
+                try:
+                    suscripcion.cola.put_nowait(sse)
+                    self.entregados += 1
+                except asyncio.QueueFull:
+                    # Cliente lento: se corta y retoma con Last-Event-ID
+                    self.desbordados += 1
+                    self.cancelar(suscripcion)
+                    suscripcion.cerrar()
+
+    async def pendientes_desde(self, event_id: int, created_by: Optional[str]) -> List[EventoSSE]:
+        """
+        Eventos posteriores a event_id visibles para el suscriptor: del búfer
+        si lo cubre, si no desde la BD (hasta SSE_REPLAY_MAX).
+        """
+        if self._buffer and self._buffer[0].event_id <= event_id:
+            return [
+                e for e in self._buffer
+                if e.event_id > event_id and (created_by is None or e.created_by == created_by)
+            ]
+
+        async with AsyncSessionLocal() as db:
+            filas = await crud_event.obtener_eventos_desde(db, event_id, created_by, setting.SSE_REPLAY_MAX)
+        eventos = [_evento_de_fila(fila) for fila in filas]
+        return [EventoSSE(e["event_id"], e["created_by"], frame_sse(e)) for e in eventos]
+
+    async def stream(self, suscripcion: Suscripcion, pendientes: List[EventoSSE]) -> AsyncIterator[bytes]:
+        """
+        Cuerpo del stream: los pendientes (reanudación) y luego los eventos
+        en vivo, con un comentario keep-alive cada SSE_HEARTBEAT_SECONDS.
+        """
+        try:
+            yield b"retry: 3000\n\n"
+            enviados = set()
+            for evento in pendientes:
+                enviados.add(evento.event_id)
+                yield evento.frame
+
+            while True:
+                try:
+                    evento = await asyncio.wait_for(suscripcion.cola.get(), timeout=setting.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if evento is None:
+                    return
+                if evento.event_id not in enviados:
+                    yield evento.frame
+        finally:
+            self.cancelar(suscripcion)
+
+    async def iniciar(self) -> None:
+        if self._tarea is None and self.intervalo_sondeo > 0:
+            self._tarea = asyncio.create_task(self._ciclo_sondeo(), name="event-hub-poller")
+
+    async def detener(self) -> None:
+        """Detiene el sondeo y cierra los streams abiertos."""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+        for suscripcion in [*self._todas, *(s for g in self._por_creador.values() for s in g)]:
+            self.cancelar(suscripcion)
+            suscripcion.cerrar()
+
+    async def _ciclo_sondeo(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_sondeo)
+            try:
+                await self.sondear()
+            except Exception:
+                logger.exception("Error al sondear transaction_events")
+
+    async def sondear(self) -> None:
+        """
+        Publica los eventos registrados por otros procesos. Los event_id que
+        faltan por debajo del último visto (commits aún en curso) se vuelven
+        a buscar durante SSE_GAP_WAIT_SECONDS.
+        """
+        if not self.suscriptores and not self._oyentes:
+            # Sin nadie a quién entregar: se retoma desde el último al volver
+            self._ultimo_sondeado = None
+            self._huecos.clear()
+            return
+
+        async with AsyncSessionLocal() as db:
+            if self._ultimo_sondeado is None:
+                self._ultimo_sondeado = await crud_event.obtener_ultimo_event_id(db)
+                return
+            filas = await crud_event.obtener_eventos_nuevos(
+                db, self._ultimo_sondeado, self._huecos.keys(), setting.SSE_REPLAY_MAX
+            )
+
+        ahora = time.monotonic()
+        eventos = [_evento_de_fila(fila) for fila in filas]
+        encontrados = {e["event_id"] for e in eventos}
+        for event_id in encontrados:
+            self._huecos.pop(event_id, None)
+        self._huecos = {i: limite for i, limite in self._huecos.items() if limite > ahora}
+
+        nuevo_ultimo = max(encontrados, default=self._ultimo_sondeado)
+        for event_id in range(max(self._ultimo_sondeado + 1, nuevo_ultimo - setting.SSE_REPLAY_MAX), nuevo_ultimo):
+            if event_id not in encontrados and event_id not in self._ids and len(self._huecos) < setting.SSE_REPLAY_MAX:
+                self._huecos[event_id] = ahora + self.espera_huecos
+        self._ultimo_sondeado = nuevo_ultimo
+
+        self.sondeados += len(eventos)
+        self.publicar(eventos)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.suscriptores,
+            "max_subscribers": self.max_suscriptores,
+            "buffered": len(self._buffer),
+            "published": self.publicados,
+            "delivered": self.entregados,
+            "overflowed": self.desbordados,
+            "polled": self.sondeados,
+            "polling": self._tarea is not None,
+            "pending_gaps": len(self._huecos),
+        }
+
+
+event_hub = EventHub()
@@ -0,0 +1,109 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.event import TransactionEventType
+from models.transaction import TransactionStatus
+from services.event_hub import event_hub
+from core.metrics import registrar_transiciones
+import crud.event as crud_event
+from typing import Iterable, List, Optional
+from datetime import datetime
+
+# Clave en session.info de los eventos a publicar cuando se confirme el commit
+PENDIENTES = "eventos_pendientes"
+
+
+class EventService:
+    """
+    Registra la bitácora de auditoría. Como SummaryService, se llama antes
+    del commit del servicio: el evento y el cambio se confirman juntos, con
+    un único INSERT multi-fila extra por operación (también en lotes).
+    Tras el commit, los eventos se publican al stream SSE (event_hub).
+    """
+    
+    # Evento que registra cada transición, según el estado destino
+    EVENTO_POR_ESTADO = {
+        TransactionStatus.PENDING_APPROVAL: TransactionEventType.SUBMITTED,
+        TransactionStatus.APPROVED: TransactionEventType.APPROVED,
+        TransactionStatus.REJECTED: TransactionEventType.REJECTED,
+        TransactionStatus.EXECUTED: TransactionEventType.EXECUTED,
+    }
+    
+    @staticmethod
+    async def _registrar(
+        db: AsyncSession,
+        transacciones: Iterable,
+        event_type: TransactionEventType,
+        from_status: Optional[TransactionStatus],
+        to_status: TransactionStatus,
+        actor: Optional[str],
+        detail: Optional[str] = None
+    ) -> None:
+        transacciones = list(transacciones)
+        ahora = datetime.utcnow()
+        filas = [
+            {
+                "transaction_id": t.transaction_id,
+                "event_type": event_type,
+                "from_status": from_status,
+                "to_status": to_status,
+                "actor": actor,
+                "detail": detail,
+                "created_at": ahora,
+            }
+            for t in transacciones
+        ]
+        ids = await crud_event.registrar_eventos(db, filas)
+        
+        pendientes: List[dict] = db.info.setdefault(PENDIENTES, [])
+        for fila, event_id, t in zip(filas, ids, transacciones):
+            pendientes.append({**fila, "event_id": event_id, "created_by": t.created_by})
+    
+    @staticmethod
+    async def registrar_creacion(db: AsyncSession, transacciones: Iterable, actor: Optional[str]) -> None:
+        """Registra la creación (→ DRAFT) de las transacciones. No hace commit."""
+        await EventService._registrar(
+            db, transacciones, TransactionEventType.CREATED, None, TransactionStatus.DRAFT, actor
+        )
+    
+    @staticmethod
+    async def registrar_transicion(
+        db: AsyncSession,
+        transacciones: Iterable,
+        estado_origen: TransactionStatus,
+        estado_destino: TransactionStatus,
+        actor: Optional[str]
+    ) -> None:
+        """
+        Registra una transición de estado de las transacciones (con
+        transaction_id y created_by). No hace commit.
+        """
+        await EventService._registrar(
+            db, transacciones, EventService.EVENTO_POR_ESTADO[estado_destino],
+            estado_origen, estado_destino, actor
+        )
+    
+    @staticmethod
+    async def registrar_evento(
+        db: AsyncSession,
+        transacciones: Iterable,
+        event_type: TransactionEventType,
+        estado: TransactionStatus,
+        actor: Optional[str],
+        detail: Optional[str] = None
+    ) -> None:
+        """Registra un evento sin cambio de estado (p.ej. de ejecución). No hace commit."""
+        await EventService._registrar(db, transacciones, event_type, estado, estado, actor, detail)
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_tras_commit(session: Session) -> None:
+    pendientes = session.info.pop(PENDIENTES, None)
+    if pendientes:
+        registrar_transiciones(pendientes)
+        event_hub.publicar(pendientes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_tras_rollback(session: Session) -> None:
+    session.info.pop(PENDIENTES, None)
@@ -0,0 +1,199 @@
+"""
+Worker de ejecución en segundo plano.
+
+/execute solo encola la transacción (execution_requested_at). Este worker,
+iniciado en el lifespan de la app, reserva lotes de transacciones APPROVED
+en cola (FOR UPDATE SKIP LOCKED, así varios procesos no se pisan), las
+liquida contra el gateway con concurrencia acotada y timeout, y registra
+el resultado: EXECUTED, reintento con backoff exponencial o abandono tras
+EXECUTION_MAX_ATTEMPTS.
+"""
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from math import ceil
+from typing import Optional
+from core.config import setting
+from db.database import AsyncSessionLocal
+from models.transaction import Transaction, TransactionStatus
+from services.gateway import GatewayError, PaymentGateway, crear_gateway
+from services.summary_service import SummaryService
+from services.event_service import EventService
+from models.event import TransactionEventType
+import crud.transaction as crud_transaction
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionWorker:
+
+    def __init__(
+        self,
+        gateway: Optional[PaymentGateway] = None,
+        batch_size: int = setting.EXECUTION_BATCH_SIZE,
+        concurrency: int = setting.EXECUTION_CONCURRENCY,
+        timeout: float = setting.EXECUTION_TIMEOUT_SECONDS,
+        max_attempts: int = setting.EXECUTION_MAX_ATTEMPTS,
+        backoff: float = setting.EXECUTION_RETRY_BACKOFF_SECONDS,
+        poll_interval: float = setting.EXECUTION_POLL_INTERVAL_SECONDS
+    ):
+        self._gateway = gateway
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self.worker_id = f"executor:{socket.gethostname()}:{os.getpid()}"
+
+        self._tarea: Optional[asyncio.Task] = None
+        self._despertar: Optional[asyncio.Event] = None
+        self._detenido = False
+
+        self.ejecutadas = 0
+        self.reintentos = 0
+        self.abandonadas = 0
+        self.timeouts = 0
+        self.en_curso = 0
+
+    @property
+    def gateway(self) -> PaymentGateway:
+        if self._gateway is None:
+            self._gateway = crear_gateway()
+        return self._gateway
+
+    async def iniciar(self) -> None:
+        if self._tarea is None:
+            self._detenido = False
+            self._despertar = asyncio.Event()
+            self._tarea = asyncio.create_task(self._ciclo(), name="execution-worker")
+
+    async def detener(self) -> None:
+        """Termina el lote en curso y detiene el ciclo."""
+        if self._tarea is None:
+            return
+        self._detenido = True
+        self._despertar.set()
+        await self._tarea
+        self._tarea = None
+
+    def notificar(self) -> None:
+        """Despierta el ciclo (hay transacciones recién encoladas)."""
+        if self._despertar is not None:
+            self._despertar.set()
+
+    async def _ciclo(self) -> None:
+        while not self._detenido:
+            try:
+                procesadas = await self.drenar()
+            except Exception:
+                logger.exception("Error en el worker de ejecución")
+                procesadas = 0
+
+            if procesadas >= self.batch_size:
+                continue  # probablemente hay más en cola
+
+            try:
+                await asyncio.wait_for(self._despertar.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._despertar.clear()
+
+    async def drenar(self) -> int:
+        """
+        Procesa un lote de la cola. Retorna cuántas transacciones se tomaron.
+        """
+        # La reserva cubre el peor caso del lote: todas con timeout
+        rondas = ceil(self.batch_size / self.concurrency)
+        expira = datetime.utcnow() + timedelta(seconds=self.timeout * rondas + self.timeout)
+
+        async with AsyncSessionLocal() as db:
+            lote = await crud_transaction.reservar_para_ejecucion(db, self.worker_id, self.batch_size, expira)
+            await db.commit()
+
+        if not lote:
+            return 0
+
+        semaforo = asyncio.Semaphore(self.concurrency)
+
+        async def liquidar(transaction: Transaction) -> Optional[Exception]:
+            async with semaforo:
+                self.en_curso += 1
+                try:
+                    await asyncio.wait_for(self.gateway.ejecutar(transaction), timeout=self.timeout)
+                    return None
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    return GatewayError(f"Timeout del gateway ({self.timeout}s)")
+                except Exception as exc:
+                    return exc
+                finally:
+                    self.en_curso -= 1
+
+        errores = await asyncio.gather(*(liquidar(t) for t in lote))
+
+        async with AsyncSessionLocal() as db:
+            ok = [t.transaction_id for t, error in zip(lote, errores) if error is None]
+            filas = await crud_transaction.completar_ejecuciones(db, ok, self.worker_id)
+            await SummaryService.registrar_transicion(
+                db, filas, TransactionStatus.APPROVED, TransactionStatus.EXECUTED
+            )
+            await EventService.registrar_transicion(
+                db, filas, TransactionStatus.APPROVED, TransactionStatus.EXECUTED, self.worker_id
+            )
+
+            for transaction, error in zip(lote, errores):
+                if error is not None:
+                    await self._registrar_fallo(db, transaction, error)
+
+            await db.commit()
+
+        self.ejecutadas += len(filas)
+        return len(lote)
+
+    async def _registrar_fallo(self, db, transaction: Transaction, error: Exception) -> None:
+        intento = transaction.execution_attempts + 1
+        reintentable = getattr(error, "reintentable", True)
+
+        if reintentable and intento < self.max_attempts:
+            espera = self.backoff * (2 ** (intento - 1))
+            reintentar_en = datetime.utcnow() + timedelta(seconds=espera)
+            self.reintentos += 1
+        else:
+            reintentar_en = None
+            self.abandonadas += 1
+            logger.warning(
+                "Ejecución abandonada tras %s intentos: %s (%s)",
+                intento, transaction.transaction_id, error
+            )
+
+        descripcion = str(error) or type(error).__name__
+        registrado = await crud_transaction.registrar_fallo_ejecucion(
+            db, transaction.transaction_id, self.worker_id, descripcion, reintentar_en
+        )
+        if registrado:
+            await EventService.registrar_evento(
+                db, [transaction], TransactionEventType.EXECUTION_FAILED,
+                TransactionStatus.APPROVED, self.worker_id,
+                detail=f"Intento {intento}: {descripcion}"[:500]
+            )
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "running": self._tarea is not None,
+            "in_flight": self.en_curso,
+            "executed": self.ejecutadas,
+            "retries": self.reintentos,
+            "abandoned": self.abandonadas,
+            "timeouts": self.timeouts,
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "timeout_s": self.timeout,
+            "max_attempts": self.max_attempts,
+        }
+
+
+execution_worker = ExecutionWorker()
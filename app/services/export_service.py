@@ -0,0 +1,59 @@
+"""
+Exportación de transacciones en streaming (NDJSON / CSV).
+
+Las filas se leen con un cursor del lado del servidor (yield_per) y se
+emiten por bloques, así la memoria se mantiene constante sin importar el
+tamaño de la tabla.
+"""
+import csv
+import io
+from typing import AsyncIterator
+import orjson
+from sqlalchemy import Select
+from core.serialization import serializar_transaccion
+from db.database import AsyncSessionLocal
+
+
+class ExportService:
+    FORMATOS = {
+        "ndjson": ("application/x-ndjson", "transactions.ndjson"),
+        "csv": ("text/csv", "transactions.csv"),
+    }
+    COLUMNAS = [
+        "transaction_id", "reference", "amount", "currency", "status",
+        "created_by", "approved_by", "created_at", "updated_at"
+    ]
+    YIELD_PER = 1000
+
+    @staticmethod
+    async def _filas(query: Select) -> AsyncIterator[list]:
+        # Sesión propia: la de get_db se cierra antes de enviar el cuerpo
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query.execution_options(yield_per=ExportService.YIELD_PER))
+            async for bloque in result.partitions():
+                yield bloque
+
+    @staticmethod
+    async def generar_ndjson(query: Select) -> AsyncIterator[bytes]:
+        async for bloque in ExportService._filas(query):
+            yield b"".join(orjson.dumps(serializar_transaccion(fila)) + b"\n" for fila in bloque)
+
+    @staticmethod
+    async def generar_csv(query: Select) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(ExportService.COLUMNAS)
+
+        async for bloque in ExportService._filas(query):
+            for fila in bloque:
+                datos = serializar_transaccion(fila)
+                datos["created_at"] = datos["created_at"].isoformat()
+                datos["updated_at"] = datos["updated_at"].isoformat()
+                writer.writerow([datos[c] for c in ExportService.COLUMNAS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        # Solo encabezado si no hubo filas
+        if buffer.tell():
+            yield buffer.getvalue()
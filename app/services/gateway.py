@@ -0,0 +1,88 @@
+"""
+Adaptadores de liquidación (gateway) usados por el worker de ejecución.
+
+Un adaptador implementa PaymentGateway.ejecutar. Debe ser idempotente por
+transaction_id: si un worker muere después de liquidar pero antes de
+registrar el resultado, la transacción se reintenta con el mismo ID.
+"""
+import asyncio
+import importlib
+import random
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from core.config import setting
+from models.transaction import Transaction
+
+
+class GatewayError(Exception):
+    """Fallo del gateway. reintentable=False abandona la ejecución sin reintentar."""
+
+    def __init__(self, mensaje: str, reintentable: bool = True):
+        super().__init__(mensaje)
+        self.reintentable = reintentable
+
+
+class PaymentGateway(ABC):
+
+    @abstractmethod
+    async def ejecutar(self, transaction: Transaction) -> str:
+        """
+        Liquida la transacción en el sistema externo.
+
+        Returns:
+            str: Identificador de confirmación del gateway
+
+        Raises:
+            GatewayError: Si la liquidación falla
+        """
+
+
+class MockGateway(PaymentGateway):
+    """
+    Gateway local (sin integración real) con latencia y tasa de fallos
+    configurables, para desarrollo, pruebas y benchmarks.
+    """
+
+    def __init__(self, latencia: float = 0.05, tasa_fallo: float = 0.0, seed: Optional[int] = None):
+        self.latencia = latencia
+        self.tasa_fallo = tasa_fallo
+        self._rng = random.Random(seed)
+        # transaction_id -> confirmación (idempotencia)
+        self.confirmadas: Dict[str, str] = {}
+
+    async def ejecutar(self, transaction: Transaction) -> str:
+        await asyncio.sleep(self.latencia)
+
+        if transaction.transaction_id in self.confirmadas:
+            return self.confirmadas[transaction.transaction_id]
+
+        if self._rng.random() < self.tasa_fallo:
+            raise GatewayError("Fallo simulado del gateway")
+
+        confirmacion = f"MOCK-{uuid.uuid4().hex[:12]}"
+        self.confirmadas[transaction.transaction_id] = confirmacion
+        return confirmacion
+
+
+def crear_gateway(nombre: str = None) -> PaymentGateway:
+    """
+    Crea el gateway configurado: "mock" o "modulo:Clase" (se instancia sin
+    argumentos).
+    """
+    nombre = nombre or setting.EXECUTION_GATEWAY
+
+    if nombre == "mock":
+        return MockGateway(
+            latencia=setting.MOCK_GATEWAY_LATENCY_SECONDS,
+            tasa_fallo=setting.MOCK_GATEWAY_FAILURE_RATE
+        )
+
+    modulo, _, clase = nombre.partition(":")
+    if not clase:
+        raise ValueError(f"EXECUTION_GATEWAY inválido: '{nombre}'. Usar 'mock' o 'modulo:Clase'")
+
+    gateway = getattr(importlib.import_module(modulo), clase)()
+    if not isinstance(gateway, PaymentGateway):
+        raise TypeError(f"{nombre} no implementa PaymentGateway")
+    return gateway
@@ -1,55 +1,77 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from core.config import setting
 from models.transaction import Transaction
+from services.sequence_service import SequenceAllocator
 import re
 
 
 class ReferenceService:
     PREFIX = "TRX"
-    DIGITS = 3  # Número de dígitos (001, 002, etc.)
-    
+    DIGITS = 3  # Dígitos mínimos (001, 002, ... 999, 1000, ...)
+    COUNTER = "reference:TRX"
+
+    allocator = SequenceAllocator(block_size=setting.REFERENCE_BLOCK_SIZE)
+
     @staticmethod
-    def generar_siguiente_reference(db: Session) -> str:
-        # Obtener la última transacción
-        ultima_transaccion = (
-            db.query(Transaction)
-            .filter(Transaction.reference.like(f"{ReferenceService.PREFIX}-%"))
-            .order_by(Transaction.created_at.desc())
-            .first()
+    async def _ultimo_numero_existente(db: AsyncSession) -> int:
+        """
+        Máximo número TRX ya usado. Solo se ejecuta una vez, al crear
+        el contador sobre una BD con transacciones previas.
+        """
+        result = await db.execute(
+            select(Transaction.reference)
+            .where(Transaction.reference.like(f"{ReferenceService.PREFIX}-%"))
         )
-        
-        if not ultima_transaccion:
-            # Primera transacción
-            siguiente_numero = 1
-        else:
-            # Extraer el número de la última referencia
-            ultimo_reference = ultima_transaccion.reference
-            match = re.search(r'TRX-(\d+)', ultimo_reference)
-            
-            if match:
-                ultimo_numero = int(match.group(1))
-                siguiente_numero = ultimo_numero + 1
-            else:
-                # Si no coincide con el patrón, contar todas
-                siguiente_numero = db.query(Transaction).count() + 1
-        
+        pattern = re.compile(rf"^{ReferenceService.PREFIX}-(\d+)$")
+        numeros = [int(m.group(1)) for (ref,) in result if (m := pattern.match(ref))]
+        return max(numeros, default=0)
+
+    @staticmethod
+    def formatear(numero: int) -> str:
         # Formatear con ceros a la izquierda
-        reference = f"{ReferenceService.PREFIX}-{str(siguiente_numero).zfill(ReferenceService.DIGITS)}"
-        
-        return reference
-    
+        return f"{ReferenceService.PREFIX}-{str(numero).zfill(ReferenceService.DIGITS)}"
+
+    @staticmethod
+    async def generar_siguiente_reference(db: Optional[AsyncSession] = None) -> str:
+        """Con db, la reserva se deshace si el request hace rollback (ver SequenceAllocator.reservar)."""
+        numero = await ReferenceService.allocator.siguiente(
+            ReferenceService.COUNTER, ReferenceService._ultimo_numero_existente, db
+        )
+        return ReferenceService.formatear(numero)
+
     @staticmethod
-    def obtener_ultima_reference(db: Session) -> str:
-        ultima_transaccion = (
-            db.query(Transaction)
-            .filter(Transaction.reference.like(f"{ReferenceService.PREFIX}-%"))
-            .order_by(Transaction.created_at.desc())
-            .first()
+    async def generar_references(cantidad: int, db: Optional[AsyncSession] = None) -> List[str]:
+        numeros = await ReferenceService.allocator.reservar(
+            ReferenceService.COUNTER, cantidad, ReferenceService._ultimo_numero_existente, db
         )
-        
-        return ultima_transaccion.reference if ultima_transaccion else None
-    
+        return [ReferenceService.formatear(n) for n in numeros]
+
+    @staticmethod
+    async def obtener_ultima_reference() -> Optional[str]:
+        ultimo = await ReferenceService.allocator.valor_actual(
+            ReferenceService.COUNTER, ReferenceService._ultimo_numero_existente
+        )
+        return ReferenceService.formatear(ultimo) if ultimo else None
+
+    @staticmethod
+    async def preview_references() -> Tuple[Optional[str], str]:
+        """
+        Última referencia asignada y la próxima, sin reservarla.
+        Lee el contador (una consulta); si este worker tiene un bloque
+        vigente, la próxima es la del bloque local.
+        """
+        ultimo = await ReferenceService.allocator.valor_actual(
+            ReferenceService.COUNTER, ReferenceService._ultimo_numero_existente
+        )
+        local = ReferenceService.allocator.siguiente_local(ReferenceService.COUNTER)
+        proximo = local if local is not None else ultimo + 1
+
+        ultima_ref = ReferenceService.formatear(ultimo) if ultimo else None
+        return ultima_ref, ReferenceService.formatear(proximo)
+
     @staticmethod
     def validar_reference_format(reference: str) -> bool:
-        pattern = f"^{ReferenceService.PREFIX}-\\d{{{ReferenceService.DIGITS}}}$"
+        pattern = f"^{ReferenceService.PREFIX}-\\d{{{ReferenceService.DIGITS},}}$"
         return bool(re.match(pattern, reference))
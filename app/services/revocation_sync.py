@@ -0,0 +1,57 @@
+"""
+Sincronización de la lista de revocación de cada worker con la BD.
+
+Deshabilitar un usuario lo revoca de inmediato solo en el worker que
+atendió el request (core/revocation.py es memoria del proceso). Este
+ciclo, iniciado en el lifespan de la app, carga los usuarios
+deshabilitados al arrancar y los recarga cada REVOCATION_SYNC_SECONDS,
+así en los demás workers sus tokens dejan de valer como máximo tras ese
+intervalo (también con AUTH_STATELESS_JWT, que no consulta la BD).
+"""
+import asyncio
+import logging
+from typing import Optional
+from core.config import setting
+from core.revocation import RevocationList, revocation_list
+from crud.user import obtener_user_ids_deshabilitados
+from db.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationSync:
+
+    def __init__(self, revocaciones: RevocationList, intervalo: float):
+        self.revocaciones = revocaciones
+        self.intervalo = intervalo
+        self._tarea: Optional[asyncio.Task] = None
+
+    async def sincronizar(self) -> None:
+        async with AsyncSessionLocal() as db:
+            user_ids = await obtener_user_ids_deshabilitados(db)
+        self.revocaciones.reemplazar_usuarios(user_ids)
+
+    async def iniciar(self) -> None:
+        await self.sincronizar()
+        if self._tarea is None and self.intervalo > 0:
+            self._tarea = asyncio.create_task(self._ciclo(), name="revocation-sync")
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    async def _ciclo(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.sincronizar()
+            except Exception:
+                logger.exception("No se pudo sincronizar la lista de revocación")
+
+
+revocation_sync = RevocationSync(revocation_list, setting.REVOCATION_SYNC_SECONDS)
@@ -0,0 +1,141 @@
+"""
+Asignador de secuencias basado en la tabla counters.
+
+Cada reserva es un único UPDATE ... SET value = value + n RETURNING value,
+atómico entre procesos. Con block_size > 1 el proceso reserva bloques
+(hi/lo) y entrega números desde memoria hasta agotarlos.
+"""
+import asyncio
+import weakref
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import AsyncSessionLocal
+from models.counter import Counter
+
+# Calcula el valor inicial del contador cuando la fila aún no existe
+# (p.ej. el máximo número ya usado en datos existentes).
+SeedFn = Callable[[AsyncSession], Awaitable[int]]
+
+
+async def _seed_cero(db: AsyncSession) -> int:
+    return 0
+
+
+class SequenceAllocator:
+
+    def __init__(self, block_size: int = 1):
+        self.block_size = max(1, block_size)
+        # name -> [siguiente, hi] del bloque reservado en este proceso
+        self._bloques: Dict[str, List[int]] = {}
+        # Locks por event loop: un asyncio.Lock queda atado al loop que lo usó
+        # primero, y el asignador se comparte entre asyncio.run sucesivos
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _lock(self, name: str) -> asyncio.Lock:
+        locks = self._locks.setdefault(asyncio.get_running_loop(), {})
+        if name not in locks:
+            locks[name] = asyncio.Lock()
+        return locks[name]
+
+    @staticmethod
+    async def _update(db: AsyncSession, name: str, n: int) -> Optional[int]:
+        result = await db.execute(
+            update(Counter)
+            .where(Counter.name == name)
+            .values(value=Counter.value + n)
+            .returning(Counter.value)
+        )
+        return result.scalar_one_or_none()
+
+    async def _incrementar(self, name: str, n: int, seed: SeedFn, db: Optional[AsyncSession] = None) -> int:
+        """
+        Reserva n números en la BD y retorna el último (hi).
+        Sin db usa su propia sesión: el lock de la fila dura solo este UPDATE,
+        no la transacción del request que pidió el número. Con db el UPDATE
+        queda en la transacción del request (no hace commit).
+        """
+        if db is not None:
+            hi = await self._update(db, name, n)
+            while hi is None:
+                inicial = await seed(db)
+                try:
+                    # Savepoint: si otro request creó la fila, solo se deshace el INSERT
+                    async with db.begin_nested():
+                        db.add(Counter(name=name, value=inicial + n))
+                    return inicial + n
+                except IntegrityError:
+                    hi = await self._update(db, name, n)
+            return hi
+
+        async with AsyncSessionLocal() as db:
+            while True:
+                hi = await self._update(db, name, n)
+                if hi is not None:
+                    await db.commit()
+                    return hi
+
+                # Primera vez: crear la fila partiendo de los datos existentes
+                inicial = await seed(db)
+                db.add(Counter(name=name, value=inicial + n))
+                try:
+                    await db.commit()
+                    return inicial + n
+                except IntegrityError:
+                    # Otro proceso la creó primero: reintentar el UPDATE
+                    await db.rollback()
+
+    async def siguiente(self, name: str, seed: SeedFn = _seed_cero, db: Optional[AsyncSession] = None) -> int:
+        """Retorna el siguiente número de la secuencia."""
+        return (await self.reservar(name, 1, seed, db))[0]
+
+    async def reservar(
+        self, name: str, n: int, seed: SeedFn = _seed_cero, db: Optional[AsyncSession] = None
+    ) -> List[int]:
+        """
+        Retorna n números consecutivos de la secuencia (consecutivos dentro
+        del bloque; entre bloques puede haber saltos).
+
+        db: sesión del request. Con block_size 1 la reserva se hace en su
+        transacción: si el request hace rollback los números se devuelven
+        (sin huecos), a cambio de retener el lock de la fila hasta el commit.
+        Con bloques se ignora: un bloque en memoria no se puede devolver.
+        """
+        async with self._lock(name):
+            numeros: List[int] = []
+            bloque = self._bloques.get(name)
+
+            # Consumir lo que quede del bloque local
+            if bloque:
+                tomar = min(n, bloque[1] - bloque[0] + 1)
+                numeros.extend(range(bloque[0], bloque[0] + tomar))
+                bloque[0] += tomar
+
+            faltan = n - len(numeros)
+            if faltan > 0:
+                # Reservar lo que falta + un bloque nuevo en un solo UPDATE
+                pedir = faltan + self.block_size - 1 if self.block_size > 1 else faltan
+                hi = await self._incrementar(name, pedir, seed, db if self.block_size == 1 else None)
+                lo = hi - pedir + 1
+                numeros.extend(range(lo, lo + faltan))
+                self._bloques[name] = [lo + faltan, hi]
+
+            return numeros
+
+    async def valor_actual(self, name: str, seed: SeedFn = _seed_cero) -> int:
+        """Último número reservado en la BD (por cualquier proceso)."""
+        async with AsyncSessionLocal() as db:
+            valor = await db.scalar(select(Counter.value).where(Counter.name == name))
+            if valor is not None:
+                return valor
+            return await seed(db)
+
+    def siguiente_local(self, name: str) -> Optional[int]:
+        """Siguiente número del bloque local, o None si no hay bloque vigente."""
+        bloque = self._bloques.get(name)
+        if bloque and bloque[0] <= bloque[1]:
+            return bloque[0]
+        return None
@@ -0,0 +1,60 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.transaction import TransactionStatus
+from schemas.transaction import SummaryItem, TransactionSummaryResponse
+import crud.summary as crud_summary
+from crud.summary import Deltas
+from typing import Iterable
+from decimal import Decimal
+
+
+class SummaryService:
+    """
+    Mantiene el resumen por (status, currency) de forma incremental.
+    TransactionService registra los deltas antes de su commit, de modo que
+    el resumen y las transacciones cambian en la misma transacción de BD.
+    """
+    
+    @staticmethod
+    def _sumar(deltas: Deltas, estado: TransactionStatus, currency: str, count: int, total: Decimal) -> None:
+        anterior_count, anterior_total = deltas.get((estado, currency), (0, Decimal("0")))
+        deltas[(estado, currency)] = (anterior_count + count, anterior_total + total)
+    
+    @staticmethod
+    async def registrar_creacion(db: AsyncSession, transacciones: Iterable) -> None:
+        """Suma las transacciones nuevas (DRAFT) al resumen. No hace commit."""
+        deltas: Deltas = {}
+        for t in transacciones:
+            SummaryService._sumar(deltas, TransactionStatus.DRAFT, t.currency, 1, t.amount)
+        await crud_summary.aplicar_deltas(db, deltas)
+    
+    @staticmethod
+    async def registrar_transicion(
+        db: AsyncSession,
+        transacciones: Iterable,
+        estado_origen: TransactionStatus,
+        estado_destino: TransactionStatus
+    ) -> None:
+        """
+        Mueve las transacciones (con currency y amount) de un estado a otro
+        en el resumen. No hace commit.
+        """
+        deltas: Deltas = {}
+        for t in transacciones:
+            SummaryService._sumar(deltas, estado_origen, t.currency, -1, -t.amount)
+            SummaryService._sumar(deltas, estado_destino, t.currency, 1, t.amount)
+        await crud_summary.aplicar_deltas(db, deltas)
+    
+    @staticmethod
+    async def obtener_resumen(db: AsyncSession) -> TransactionSummaryResponse:
+        """Lee el resumen: una consulta sobre la tabla de resumen, sin importar cuántas transacciones haya."""
+        filas = await crud_summary.obtener_resumen(db)
+        
+        by_status = {}
+        for fila in filas:
+            by_status[fila.status] = by_status.get(fila.status, 0) + fila.count
+        
+        return TransactionSummaryResponse(
+            total_count=sum(by_status.values()),
+            by_status=by_status,
+            items=[SummaryItem.model_validate(fila) for fila in filas]
+        )
@@ -0,0 +1,123 @@
+"""
+Cache read-through de las consultas individuales de transacciones.
+
+Guarda el cuerpo JSON ya serializado junto con su ETag, así un hit no
+consulta la BD ni serializa. El backend es intercambiable (CacheBackend):
+"memory" (LRU en memoria) o "kv" (almacén clave-valor de bytes, sustituto
+local de un KV compartido).
+
+Cada evento confirmado de una transacción invalida su entrada: los del
+propio proceso al hacer commit (EventService → event_hub) y los de otros
+procesos a través del sondeo del event_hub. Para que una lectura que cargó
+la fila antes del commit de una transición no guarde la versión vieja
+después de invalidada, cada invalidación deja una marca con su hora y una
+lectura solo se guarda si no hubo invalidación desde que empezó.
+"""
+import time
+from typing import Iterable, List, NamedTuple, Optional
+import orjson
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.cache import CacheBackend, LocalKVCache, TTLCache
+from core.config import setting
+from core.etag import ETAG_HEADER, etag_transaccion
+from core.serialization import serializar_transaccion
+from services.event_hub import event_hub
+import crud.transaction as crud_transaction
+
+# Ventana en la que una invalidación bloquea guardar lecturas iniciadas antes
+MARCA_TTL_SECONDS = 30.0
+
+
+class TransaccionCacheada(NamedTuple):
+    etag: str
+    body: bytes
+
+
+def crear_backend(nombre: str = None) -> CacheBackend:
+    nombre = nombre or setting.TRANSACTION_CACHE_BACKEND
+    if nombre == "memory":
+        return TTLCache(max_size=setting.TRANSACTION_CACHE_MAX_SIZE, ttl=setting.TRANSACTION_CACHE_TTL_SECONDS)
+    if nombre == "kv":
+        return LocalKVCache(max_size=setting.TRANSACTION_CACHE_MAX_SIZE, ttl=setting.TRANSACTION_CACHE_TTL_SECONDS)
+    raise ValueError(f"TRANSACTION_CACHE_BACKEND inválido: '{nombre}'. Usar 'memory' o 'kv'")
+
+
+transaction_cache = crear_backend()
+
+# transaction_id -> hora (monotonic) de su última invalidación
+_invalidadas = TTLCache(max_size=max(setting.TRANSACTION_CACHE_MAX_SIZE, 10000), ttl=MARCA_TTL_SECONDS)
+
+
+def _codificar(entrada: TransaccionCacheada) -> bytes:
+    # Bytes para cualquier backend (un KV externo no guarda objetos)
+    return entrada.etag.encode() + b"\n" + entrada.body
+
+
+def _decodificar(crudo: bytes) -> TransaccionCacheada:
+    etag, body = crudo.split(b"\n", 1)
+    return TransaccionCacheada(etag.decode(), body)
+
+
+async def obtener_transaccion_cacheada(db: AsyncSession, transaction_id: str) -> Optional[TransaccionCacheada]:
+    """
+    Cuerpo JSON y ETag de la transacción, del cache o de la BD (y lo guarda).
+    None si no existe.
+    """
+    crudo = transaction_cache.get(transaction_id)
+    if crudo is not None:
+        return _decodificar(crudo)
+
+    inicio = time.monotonic()
+    transaction = await crud_transaction.obtener_transaccion_por_id(db, transaction_id)
+    if transaction is None:
+        return None
+
+    entrada = TransaccionCacheada(
+        etag_transaccion(transaction.transaction_id, transaction.updated_at),
+        orjson.dumps(serializar_transaccion(transaction))
+    )
+    invalidada = _invalidadas.get(transaction_id)
+    if invalidada is None or invalidada < inicio:
+        transaction_cache.set(transaction_id, _codificar(entrada))
+    return entrada
+
+
+async def obtener_etag(db: AsyncSession, transaction_id: str) -> Optional[str]:
+    """
+    ETag actual de la transacción sin serializarla: del cache, o leyendo
+    solo updated_at. None si no existe.
+    """
+    crudo = transaction_cache.get(transaction_id)
+    if crudo is not None:
+        return _decodificar(crudo).etag
+
+    version = await crud_transaction.obtener_version_transaccion(db, transaction_id)
+    return etag_transaccion(transaction_id, version) if version is not None else None
+
+
+def respuesta_cacheada(entrada: TransaccionCacheada) -> Response:
+    return Response(content=entrada.body, media_type="application/json", headers={ETAG_HEADER: entrada.etag})
+
+
+def invalidar(transaction_ids: Iterable[str]) -> None:
+    ahora = time.monotonic()
+    for transaction_id in transaction_ids:
+        _invalidadas.set(transaction_id, ahora)
+        transaction_cache.delete(transaction_id)
+
+
+def _invalidar_eventos(eventos: List[dict]) -> None:
+    invalidar({e["transaction_id"] for e in eventos})
+
+
+def stats() -> dict:
+    return {
+        "backend": type(transaction_cache).__name__,
+        **transaction_cache.stats(),
+        "invalidations_tracked": _invalidadas.stats()["size"],
+    }
+
+
+if transaction_cache.enabled:
+    event_hub.agregar_oyente(_invalidar_eventos)
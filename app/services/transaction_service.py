@@ -1,10 +1,27 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from models.transaction import Transaction, TransactionStatus, UserRole
-from schemas.transaction import TransactionCreate
+from schemas.transaction import (
+    TransactionCreate,
+    TransactionCreateV2,
+    TransactionResponse,
+    BatchItemResult,
+    BatchCreateResponse,
+    BatchTransitionResult,
+    BatchTransitionResponse,
+    ClaimResponse
+)
+from services.summary_service import SummaryService
+from services.event_service import EventService
+from models.event import TransactionEvent, TransactionEventType
+from services.execution_worker import execution_worker
+from services.reference_service import ReferenceService
 import crud.transaction as crud_transaction
-from typing import Optional
+import crud.event as crud_event
+from core.config import setting
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
 
 
 class TransactionService:
@@ -22,9 +39,27 @@ class TransactionService:
         TransactionStatus.EXECUTED: []   # Estado final
     }
     
+    # Estado de origen requerido para llegar a cada estado (derivado de la matriz)
+    ESTADO_ORIGEN = {
+        destino: origen
+        for origen, destinos in VALID_TRANSITIONS.items()
+        for destino in destinos
+    }
+    
     @staticmethod
-    def crear_transaccion(
-        db: Session,
+    def _error_de_validacion(transaccion: TransactionCreate) -> Optional[str]:
+        """Validaciones de negocio de una transacción nueva. Retorna el mensaje de error o None."""
+        if transaccion.amount <= 0:
+            return "El monto debe ser mayor a cero"
+        
+        if len(transaccion.currency) != 3:
+            return "La moneda debe tener exactamente 3 caracteres"
+        
+        return None
+    
+    @staticmethod
+    async def crear_transaccion(
+        db: AsyncSession,
         transaccion: TransactionCreate,
         user_id: str,
         user_role: str
@@ -40,66 +75,268 @@ class TransactionService:
             )
         
         # Validaciones de negocio
-        if transaccion.amount <= 0:
+        error = TransactionService._error_de_validacion(transaccion)
+        if error:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="El monto debe ser mayor a cero"
+                detail=error
             )
         
-        if len(transaccion.currency) != 3:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="La moneda debe tener exactamente 3 caracteres"
-            )
-        
-        # Intentar crear la transacción
+        # Intentar crear la transacción (y sumarla al resumen en el mismo commit)
         try:
-            return crud_transaction.crear_transaccion(db, transaccion, user_id)
+            transaction = await crud_transaction.crear_transaccion(db, transaccion, user_id)
+            await SummaryService.registrar_creacion(db, [transaction])
+            await EventService.registrar_creacion(db, [transaction], user_id)
+            await db.commit()
+            return transaction
         except IntegrityError:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Ya existe una transacción con la referencia '{transaccion.reference}'"
             )
     
     @staticmethod
-    def enviar_a_aprobacion(
-        db: Session,
-        transaction_id: str,
-        user_role: str
-    ) -> Transaction:
+    async def crear_transacciones_lote(
+        db: AsyncSession,
+        transacciones: List[TransactionCreate],
+        user_id: str,
+        user_role: str,
+        atomic: bool = True
+    ) -> BatchCreateResponse:
         """
-        Regla 2: Solo el OPERADOR puede enviar la transacción a aprobación.
-        El estado cambia de DRAFT a PENDING_APPROVAL.
+        Regla 1 aplicada a un lote: solo un OPERADOR puede crear.
+        Valida todos los elementos (incluye referencias repetidas en el lote
+        o ya existentes, en una sola consulta) y luego inserta con un único
+        INSERT multi-fila.
+        - atomic=True: si algún elemento falla no se crea ninguno.
+        - atomic=False: se crean los válidos y se reportan los fallidos.
         """
+        TransactionService._exigir_operador_lote(user_role)
+        
+        errores = TransactionService._errores_de_lote(transacciones)
+        vistas = set()
+        for i, transaccion in enumerate(transacciones):
+            if i not in errores and transaccion.reference in vistas:
+                errores[i] = f"Referencia '{transaccion.reference}' repetida dentro del lote"
+            vistas.add(transaccion.reference)
+        
+        await TransactionService._marcar_references_existentes(db, transacciones, errores)
+        if atomic and errores:
+            return TransactionService._lote_rechazado(len(transacciones), errores)
+        
+        return await TransactionService._insertar_lote(db, transacciones, errores, user_id, atomic)
+    
+    @staticmethod
+    async def crear_transacciones_lote_v2(
+        db: AsyncSession,
+        items: List[TransactionCreateV2],
+        user_id: str,
+        user_role: str,
+        atomic: bool = True
+    ) -> BatchCreateResponse:
+        """
+        Como crear_transacciones_lote, con referencias TRX autogeneradas.
+        Las referencias se reservan después de validar y en la transacción
+        del lote: un lote rechazado no consume números de la secuencia.
+        """
+        TransactionService._exigir_operador_lote(user_role)
+        
+        errores = TransactionService._errores_de_lote(items)
+        if atomic and errores:
+            return TransactionService._lote_rechazado(len(items), errores)
+        
+        validos = [i for i in range(len(items)) if i not in errores]
+        references = iter(await ReferenceService.generar_references(len(validos), db=db))
+        # Los elementos con error quedan como vienen: no se insertan
+        transacciones = [
+            item if i in errores else TransactionCreate(
+                reference=next(references),
+                amount=item.amount,
+                currency=item.currency
+            )
+            for i, item in enumerate(items)
+        ]
+        
+        # Una referencia TRX cargada a mano por v1 puede chocar con la secuencia
+        await TransactionService._marcar_references_existentes(db, transacciones, errores)
+        if atomic and errores:
+            await db.rollback()  # devuelve los números reservados
+            return TransactionService._lote_rechazado(len(items), errores)
+        
+        return await TransactionService._insertar_lote(db, transacciones, errores, user_id, atomic)
+    
+    @staticmethod
+    def _exigir_operador_lote(user_role: str) -> None:
         if user_role != UserRole.OPERADOR.value:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Solo usuarios con rol OPERADOR pueden enviar a aprobación"
+                detail="Solo usuarios con rol OPERADOR pueden crear transacciones"
+            )
+    
+    @staticmethod
+    def _errores_de_lote(items) -> Dict[int, str]:
+        """Validaciones de negocio por elemento (índice -> mensaje)."""
+        errores: Dict[int, str] = {}
+        for i, item in enumerate(items):
+            error = TransactionService._error_de_validacion(item)
+            if error:
+                errores[i] = error
+        return errores
+    
+    @staticmethod
+    async def _marcar_references_existentes(
+        db: AsyncSession,
+        transacciones: List[TransactionCreate],
+        errores: Dict[int, str]
+    ) -> None:
+        """Agrega a errores las referencias que ya existen (una sola consulta)."""
+        existentes = await crud_transaction.obtener_references_existentes(
+            db, [t.reference for i, t in enumerate(transacciones) if i not in errores]
+        )
+        for i, transaccion in enumerate(transacciones):
+            if i not in errores and transaccion.reference in existentes:
+                errores[i] = f"Ya existe una transacción con la referencia '{transaccion.reference}'"
+    
+    @staticmethod
+    def _lote_rechazado(total: int, errores: Dict[int, str]) -> BatchCreateResponse:
+        """Respuesta de un lote atómico con errores: no se crea ninguno."""
+        return BatchCreateResponse(
+            atomic=True,
+            total=total,
+            created=0,
+            failed=total,
+            results=[
+                BatchItemResult(
+                    index=i,
+                    success=False,
+                    error=errores.get(i, "No creada: el lote es atómico y contiene elementos inválidos")
+                )
+                for i in range(total)
+            ]
+        )
+    
+    @staticmethod
+    async def _insertar_lote(
+        db: AsyncSession,
+        transacciones: List[TransactionCreate],
+        errores: Dict[int, str],
+        user_id: str,
+        atomic: bool
+    ) -> BatchCreateResponse:
+        """Inserta los elementos sin error con un único INSERT multi-fila y hace commit."""
+        validas = [i for i in range(len(transacciones)) if i not in errores]
+        try:
+            creadas = await crud_transaction.crear_transacciones(
+                db, [transacciones[i] for i in validas], user_id
+            )
+            await SummaryService.registrar_creacion(db, creadas)
+            await EventService.registrar_creacion(db, creadas, user_id)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Conflicto de referencias al insertar el lote. Reintente la operación"
             )
         
-        transaction = crud_transaction.obtener_transaccion_por_id(db, transaction_id)
+        resultados = {i: BatchItemResult(index=i, success=False, error=error) for i, error in errores.items()}
+        for i, transaction in zip(validas, creadas):
+            resultados[i] = BatchItemResult(
+                index=i,
+                success=True,
+                transaction=TransactionResponse.model_validate(transaction)
+            )
+        
+        return BatchCreateResponse(
+            atomic=atomic,
+            total=len(transacciones),
+            created=len(creadas),
+            failed=len(errores),
+            results=[resultados[i] for i in range(len(transacciones))]
+        )
+    
+    @staticmethod
+    def codigo_http_lote(resultado: BatchCreateResponse) -> int:
+        """201 si se creó todo, 409 si un lote atómico fue rechazado, 207 si fue parcial."""
+        if resultado.failed == 0:
+            return status.HTTP_201_CREATED
+        if resultado.atomic:
+            return status.HTTP_409_CONFLICT
+        return status.HTTP_207_MULTI_STATUS
+    
+    @staticmethod
+    async def _transicionar(
+        db: AsyncSession,
+        transaction_id: str,
+        nuevo_estado: TransactionStatus,
+        accion: str,
+        approved_by: Optional[str] = None,
+        actor: Optional[str] = None
+    ) -> Transaction:
+        """
+        Aplica la transición con un UPDATE condicional al estado de origen
+        definido en VALID_TRANSITIONS (y a la reserva, si la hay). Solo si no
+        se actualizó ninguna fila se consulta el estado para distinguir 404
+        de 409.
+        """
+        estado_requerido = TransactionService.ESTADO_ORIGEN[nuevo_estado]
+        
+        transaction = await crud_transaction.transicionar_estado(
+            db, transaction_id, estado_requerido, nuevo_estado, approved_by=approved_by, actor=actor
+        )
         
         if not transaction:
+            actual = await crud_transaction.obtener_estado_transaccion(db, transaction_id)
+            
+            if actual is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Transacción no encontrada"
+                )
+            
+            if actual.status == estado_requerido and actual.claim_expires_at:
+                # Estado correcto: la bloquea la reserva de otro aprobador
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Transacción reservada por {actual.claimed_by} hasta {actual.claim_expires_at.isoformat()}"
+                )
+            
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Transacción no encontrada"
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Solo se pueden {accion} transacciones en estado {estado_requerido.value}. Estado actual: {actual.status}"
             )
         
-        # Validar transición de estado
-        if transaction.status != TransactionStatus.DRAFT:
+        await SummaryService.registrar_transicion(db, [transaction], estado_requerido, nuevo_estado)
+        await EventService.registrar_transicion(db, [transaction], estado_requerido, nuevo_estado, actor)
+        await db.commit()
+        return transaction
+    
+    @staticmethod
+    async def enviar_a_aprobacion(
+        db: AsyncSession,
+        transaction_id: str,
+        user_role: str,
+        user_id: Optional[str] = None
+    ) -> Transaction:
+        """
+        Regla 2: Solo el OPERADOR puede enviar la transacción a aprobación.
+        El estado cambia de DRAFT a PENDING_APPROVAL.
+        """
+        if user_role != UserRole.OPERADOR.value:
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Solo se pueden enviar a aprobación transacciones en estado DRAFT. Estado actual: {transaction.status}"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Solo usuarios con rol OPERADOR pueden enviar a aprobación"
             )
         
-        return crud_transaction.actualizar_estado_transaccion(
-            db, transaction_id, TransactionStatus.PENDING_APPROVAL
+        return await TransactionService._transicionar(
+            db, transaction_id, TransactionStatus.PENDING_APPROVAL, "enviar a aprobación",
+            actor=user_id
         )
     
     @staticmethod
-    def aprobar_transaccion(
-        db: Session,
+    async def aprobar_transaccion(
+        db: AsyncSession,
         transaction_id: str,
         user_id: str,
         user_role: str
@@ -114,34 +351,21 @@ class TransactionService:
                 detail="Solo usuarios con rol APROBADOR pueden aprobar transacciones"
             )
         
-        transaction = crud_transaction.obtener_transaccion_por_id(db, transaction_id)
-        
-        if not transaction:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Transacción no encontrada"
-            )
-        
-        # Validar transición de estado
-        if transaction.status != TransactionStatus.PENDING_APPROVAL:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Solo se pueden aprobar transacciones en estado PENDING_APPROVAL. Estado actual: {transaction.status}"
-            )
-        
-        return crud_transaction.actualizar_estado_transaccion(
-            db, transaction_id, TransactionStatus.APPROVED, approved_by=user_id
+        return await TransactionService._transicionar(
+            db, transaction_id, TransactionStatus.APPROVED, "aprobar", approved_by=user_id, actor=user_id
         )
     
     @staticmethod
-    def rechazar_transaccion(
-        db: Session,
+    async def rechazar_transaccion(
+        db: AsyncSession,
         transaction_id: str,
-        user_role: str
+        user_role: str,
+        user_id: Optional[str] = None
     ) -> Transaction:
         """
         Regla 4: Solo un APROBADOR puede rechazar.
-        El estado pasa a REJECTED.
+        El estado pasa a REJECTED. Sin user_id no se puede rechazar una
+        transacción reservada por otro aprobador.
         """
         if user_role != UserRole.APROBADOR.value:
             raise HTTPException(
@@ -149,56 +373,246 @@ class TransactionService:
                 detail="Solo usuarios con rol APROBADOR pueden rechazar transacciones"
             )
         
-        transaction = crud_transaction.obtener_transaccion_por_id(db, transaction_id)
+        return await TransactionService._transicionar(
+            db, transaction_id, TransactionStatus.REJECTED, "rechazar", actor=user_id
+        )
+    
+    @staticmethod
+    async def ejecutar_transaccion(
+        db: AsyncSession,
+        transaction_id: str,
+        user_id: Optional[str] = None
+    ) -> Transaction:
+        """
+        Regla 5: Solo transacciones en estado APPROVED pueden ejecutarse.
+        La ejecución se encola y la hace el worker en segundo plano contra el
+        gateway configurado; la transacción sigue APPROVED hasta liquidarse.
+        Solicitar de nuevo una ejecución ya encolada no tiene efecto.
+        """
+        transaction = await crud_transaction.solicitar_ejecucion(db, transaction_id)
         
         if not transaction:
+            actual = await crud_transaction.obtener_estado_transaccion(db, transaction_id)
+            
+            if actual is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Transacción no encontrada"
+                )
+            
+            if actual.status != TransactionStatus.APPROVED:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Solo se pueden ejecutar transacciones en estado APPROVED. Estado actual: {actual.status}"
+                )
+            
+            # Ya estaba en cola
+            return await crud_transaction.obtener_transaccion_por_id(db, transaction_id)
+        
+        await EventService.registrar_evento(
+            db, [transaction], TransactionEventType.EXECUTION_REQUESTED, TransactionStatus.APPROVED, user_id
+        )
+        await db.commit()
+        execution_worker.notificar()
+        return transaction
+    
+    @staticmethod
+    async def _transicionar_lote(
+        db: AsyncSession,
+        transaction_ids: List[str],
+        nuevo_estado: TransactionStatus,
+        approved_by: Optional[str] = None,
+        actor: Optional[str] = None
+    ) -> BatchTransitionResponse:
+        """
+        Aplica una transición a un lote con un solo UPDATE condicional.
+        Solo para los IDs no actualizados se consulta el estado (una consulta)
+        para reportar not_found, wrong_state o claimed por cada uno.
+        """
+        estado_requerido = TransactionService.ESTADO_ORIGEN[nuevo_estado]
+        ids = list(dict.fromkeys(transaction_ids))  # sin duplicados, mismo orden
+        
+        filas = await crud_transaction.transicionar_estado_lote(
+            db, ids, estado_requerido, nuevo_estado, approved_by=approved_by, actor=actor
+        )
+        await SummaryService.registrar_transicion(db, filas, estado_requerido, nuevo_estado)
+        await EventService.registrar_transicion(db, filas, estado_requerido, nuevo_estado, actor)
+        await db.commit()
+        actualizadas = {fila.transaction_id for fila in filas}
+        
+        estados = await crud_transaction.obtener_estados_transacciones(
+            db, [i for i in ids if i not in actualizadas]
+        )
+        
+        resultados = []
+        for transaction_id in ids:
+            if transaction_id in actualizadas:
+                resultados.append(BatchTransitionResult(
+                    transaction_id=transaction_id, success=True, result="ok", status=nuevo_estado
+                ))
+            elif transaction_id not in estados:
+                resultados.append(BatchTransitionResult(
+                    transaction_id=transaction_id, success=False, result="not_found",
+                    error="Transacción no encontrada"
+                ))
+            elif estados[transaction_id].status == estado_requerido and estados[transaction_id].claim_expires_at:
+                actual = estados[transaction_id]
+                resultados.append(BatchTransitionResult(
+                    transaction_id=transaction_id, success=False, result="claimed",
+                    status=actual.status,
+                    error=f"Reservada por {actual.claimed_by} hasta {actual.claim_expires_at.isoformat()}"
+                ))
+            else:
+                actual = estados[transaction_id]
+                resultados.append(BatchTransitionResult(
+                    transaction_id=transaction_id, success=False, result="wrong_state",
+                    status=actual.status,
+                    error=f"Se requiere estado {estado_requerido.value}. Estado actual: {actual.status.value}"
+                ))
+        
+        return BatchTransitionResponse(
+            target_status=nuevo_estado,
+            total=len(ids),
+            succeeded=len(actualizadas),
+            failed=len(ids) - len(actualizadas),
+            results=resultados
+        )
+    
+    @staticmethod
+    async def aprobar_lote(
+        db: AsyncSession,
+        transaction_ids: List[str],
+        user_id: str,
+        user_role: str
+    ) -> BatchTransitionResponse:
+        """Regla 3 aplicada a un lote: solo un APROBADOR puede aprobar."""
+        if user_role != UserRole.APROBADOR.value:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Transacción no encontrada"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Solo usuarios con rol APROBADOR pueden aprobar transacciones"
             )
         
-        # Validar que esté en estado válido para rechazo
-        if transaction.status != TransactionStatus.PENDING_APPROVAL:
+        return await TransactionService._transicionar_lote(
+            db, transaction_ids, TransactionStatus.APPROVED, approved_by=user_id, actor=user_id
+        )
+    
+    @staticmethod
+    async def rechazar_lote(
+        db: AsyncSession,
+        transaction_ids: List[str],
+        user_role: str,
+        user_id: Optional[str] = None
+    ) -> BatchTransitionResponse:
+        """Regla 4 aplicada a un lote: solo un APROBADOR puede rechazar."""
+        if user_role != UserRole.APROBADOR.value:
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Solo se pueden rechazar transacciones en estado PENDING_APPROVAL. Estado actual: {transaction.status}"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Solo usuarios con rol APROBADOR pueden rechazar transacciones"
             )
         
-        return crud_transaction.actualizar_estado_transaccion(
-            db, transaction_id, TransactionStatus.REJECTED
+        return await TransactionService._transicionar_lote(
+            db, transaction_ids, TransactionStatus.REJECTED, actor=user_id
         )
     
     @staticmethod
-    def ejecutar_transaccion(
-        db: Session,
-        transaction_id: str
-    ) -> Transaction:
+    async def ejecutar_lote(
+        db: AsyncSession,
+        transaction_ids: List[str],
+        user_id: Optional[str] = None
+    ) -> BatchTransitionResponse:
         """
-        Regla 5: Solo transacciones en estado APPROVED pueden ejecutarse.
-        La ejecución es simulada (sin integración externa).
+        Regla 5 aplicada a un lote: encola la ejecución de las transacciones
+        APPROVED con un solo UPDATE. ok = encolada (o ya estaba en cola).
         """
-        transaction = crud_transaction.obtener_transaccion_por_id(db, transaction_id)
+        ids = list(dict.fromkeys(transaction_ids))  # sin duplicados, mismo orden
         
-        if not transaction:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Transacción no encontrada"
-            )
+        filas = await crud_transaction.solicitar_ejecucion_lote(db, ids)
+        await EventService.registrar_evento(
+            db, filas, TransactionEventType.EXECUTION_REQUESTED, TransactionStatus.APPROVED, user_id
+        )
+        await db.commit()
+        encoladas = {fila.transaction_id for fila in filas}
+        if encoladas:
+            execution_worker.notificar()
+        
+        estados = await crud_transaction.obtener_estados_transacciones(
+            db, [i for i in ids if i not in encoladas]
+        )
+        
+        resultados = []
+        for transaction_id in ids:
+            actual = estados.get(transaction_id)
+            if transaction_id in encoladas or (actual and actual.status == TransactionStatus.APPROVED):
+                resultados.append(BatchTransitionResult(
+                    transaction_id=transaction_id, success=True, result="ok", status=TransactionStatus.APPROVED
+                ))
+            elif actual is None:
+                resultados.append(BatchTransitionResult(
+                    transaction_id=transaction_id, success=False, result="not_found",
+                    error="Transacción no encontrada"
+                ))
+            else:
+                resultados.append(BatchTransitionResult(
+                    transaction_id=transaction_id, success=False, result="wrong_state",
+                    status=actual.status,
+                    error=f"Se requiere estado APPROVED. Estado actual: {actual.status.value}"
+                ))
         
-        # Validar que esté aprobada
-        if transaction.status != TransactionStatus.APPROVED:
+        exitosas = sum(1 for r in resultados if r.success)
+        return BatchTransitionResponse(
+            target_status=TransactionStatus.EXECUTED,
+            total=len(ids),
+            succeeded=exitosas,
+            failed=len(ids) - exitosas,
+            results=resultados
+        )
+    
+    @staticmethod
+    async def reservar_aprobaciones(
+        db: AsyncSession,
+        cantidad: int,
+        user_id: str,
+        user_role: str
+    ) -> ClaimResponse:
+        """
+        Cola de aprobación: reserva al APROBADOR las siguientes transacciones
+        pendientes por APPROVAL_CLAIM_TTL_SECONDS. Mientras la reserva esté
+        vigente solo él puede aprobarlas o rechazarlas; al vencer vuelven a
+        la cola.
+        """
+        if user_role != UserRole.APROBADOR.value:
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Solo se pueden ejecutar transacciones en estado APPROVED. Estado actual: {transaction.status}"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Solo usuarios con rol APROBADOR pueden reservar transacciones"
             )
         
-        # Simulación de ejecución (sin integración real)
-        # Aquí iría la lógica de integración con sistemas externos
+        expira = datetime.utcnow() + timedelta(seconds=setting.APPROVAL_CLAIM_TTL_SECONDS)
+        reservadas = await crud_transaction.reservar_pendientes(db, user_id, cantidad, expira)
+        await db.commit()
         
-        return crud_transaction.actualizar_estado_transaccion(
-            db, transaction_id, TransactionStatus.EXECUTED
+        return ClaimResponse(
+            claimed_by=user_id,
+            claim_expires_at=expira,
+            claimed=len(reservadas),
+            transactions=[TransactionResponse.model_validate(t) for t in reservadas]
         )
     
+    @staticmethod
+    async def obtener_historial(
+        db: AsyncSession,
+        transaction_id: str
+    ) -> List[TransactionEvent]:
+        """
+        Bitácora de la transacción (creación, transiciones y ejecución) en orden.
+        """
+        if await crud_transaction.obtener_estado_transaccion(db, transaction_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transacción no encontrada"
+            )
+        
+        return await crud_event.obtener_historial(db, transaction_id)
+    
     @staticmethod
     def validar_transicion(estado_actual: TransactionStatus, estado_nuevo: TransactionStatus) -> bool:
         """
@@ -0,0 +1,56 @@
+"""
+Cache de usuarios autenticados por email.
+
+Evita consultar la BD en cada request con JWT solo para releer el rol.
+Se guarda una copia inmutable (sin hashed_password), no el objeto ORM,
+para no compartir instancias entre sesiones.
+"""
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.cache import TTLCache
+from core.config import setting
+from models.transaction import UserRole
+from models.user import Usuario
+
+
+@dataclass(frozen=True)
+class UsuarioActual:
+    user_id: str
+    nombre: str
+    email: str
+    role: UserRole
+    id: Optional[int] = None  # no disponible cuando se resuelve desde el token
+
+
+user_cache = TTLCache(
+    max_size=setting.USER_CACHE_MAX_SIZE,
+    ttl=setting.USER_CACHE_TTL_SECONDS
+)
+
+
+async def obtener_usuario_actual(db: AsyncSession, email: str) -> Optional[UsuarioActual]:
+    usuario = user_cache.get(email)
+    if usuario is not None:
+        return usuario
+
+    result = await db.execute(select(Usuario).where(Usuario.email == email))
+    db_usuario = result.scalars().first()
+    if db_usuario is None or not db_usuario.is_active:
+        return None
+
+    usuario = UsuarioActual(
+        id=db_usuario.id,
+        user_id=db_usuario.user_id,
+        nombre=db_usuario.nombre,
+        email=db_usuario.email,
+        role=db_usuario.role
+    )
+    user_cache.set(email, usuario)
+    return usuario
+
+
+def invalidar_usuario(email: str) -> None:
+    """Llamar cada vez que se crea o modifica un usuario."""
+    user_cache.delete(email)
@@ -1,41 +1,49 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.user import Usuario
 from models.transaction import UserRole
+from services.sequence_service import SequenceAllocator
 import re
 
 
 class UserIdService:
     DIGITS = 3
-    
-    def __init__(self, db: Session):
-        self.db = db
-    
-    def generar_siguiente_user_id(self, role: UserRole) -> str:
-        prefix = "op-" if role == UserRole.OPERADOR else "ap-"
-        
-        # Buscar el último user_id con este prefijo
-        usuarios = self.db.query(Usuario).filter(
-            Usuario.user_id.like(f"{prefix}%")
-        ).all()
-        
-        if not usuarios:
-            return f"{prefix}{'0' * (self.DIGITS - 1)}1"
-        
-        # Extraer números de todos los user_ids con este prefijo
-        numeros = []
-        pattern = re.compile(rf"{prefix}(\d+)")
-        
-        for usuario in usuarios:
-            if usuario.user_id:
-                match = pattern.match(usuario.user_id)
-                if match:
-                    numeros.append(int(match.group(1)))
-        
-        if not numeros:
-            return f"{prefix}{'0' * (self.DIGITS - 1)}1"
-        
-        # Obtener el siguiente número
-        siguiente_numero = max(numeros) + 1
-        
+
+    # Un contador por rol; sin bloques para no dejar huecos en los user_id
+    allocator = SequenceAllocator(block_size=1)
+
+    @staticmethod
+    def _prefix(role: UserRole) -> str:
+        return "op-" if role == UserRole.OPERADOR else "ap-"
+
+    @staticmethod
+    def _seed(prefix: str):
+        async def ultimo_numero_existente(db: AsyncSession) -> int:
+            """
+            Máximo número ya usado con este prefijo. Solo se ejecuta una vez,
+            al crear el contador del rol sobre una BD con usuarios previos.
+            """
+            result = await db.execute(
+                select(Usuario.user_id).where(Usuario.user_id.like(f"{prefix}%"))
+            )
+            pattern = re.compile(re.escape(prefix) + r"(\d+)")
+            numeros = [int(m.group(1)) for (user_id,) in result if user_id and (m := pattern.fullmatch(user_id))]
+            return max(numeros, default=0)
+
+        return ultimo_numero_existente
+
+    @staticmethod
+    async def generar_siguiente_user_id(role: UserRole, db: Optional[AsyncSession] = None) -> str:
+        """
+        Con db el incremento del contador queda en la transacción del
+        registro: si este hace rollback el número no se consume.
+        """
+        prefix = UserIdService._prefix(role)
+
+        siguiente_numero = await UserIdService.allocator.siguiente(
+            f"user_id:{prefix}", UserIdService._seed(prefix), db
+        )
+
         # Formatear con ceros a la izquierda
-        return f"{prefix}{str(siguiente_numero).zfill(self.DIGITS)}"
+        return f"{prefix}{str(siguiente_numero).zfill(UserIdService.DIGITS)}"
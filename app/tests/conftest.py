@@ -0,0 +1,69 @@
+"""
+Configuración de las pruebas: SQLite temporal y variables mínimas antes de
+importar la app (Setting se lee al importar core.config).
+
+Las pruebas son síncronas y corren sus corrutinas con `correr`, que además
+cierra las conexiones del engine async al terminar (cada asyncio.run usa un
+event loop nuevo y las conexiones no se pueden reutilizar entre loops).
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+_DB = os.path.join(tempfile.mkdtemp(prefix="transacciones-test-"), "test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB}"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db_limpia():
+    """Base de datos recién creada para la prueba."""
+    import init_db
+    init_db.reset_db()
+
+
+@pytest.fixture
+def correr():
+    from db.database import async_engine
+
+    def _correr(coro):
+        async def _con_cierre():
+            try:
+                return await coro
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(_con_cierre())
+
+    return _correr
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    """
+    Event hub nuevo para la prueba, con el cache de transacciones como
+    oyente: el global conserva event_id de bases anteriores (reset_db los
+    reinicia) y descartaría los nuevos como duplicados.
+    """
+    import api.v2.transactions as api_v2
+    import services.event_service as event_service
+    import services.transaction_cache as transaction_cache
+    from services.event_hub import EventHub
+
+    nuevo = EventHub(intervalo_sondeo=0)
+    nuevo.agregar_oyente(transaction_cache._invalidar_eventos)
+    monkeypatch.setattr(event_service, "event_hub", nuevo)
+    monkeypatch.setattr(api_v2, "event_hub", nuevo)
+    return nuevo
+
+
+@pytest.fixture
+def admin_key(monkeypatch):
+    """Configura ADMIN_API_KEY con la clave de tests.helpers.ADMIN."""
+    from core.config import setting
+    from tests.helpers import ADMIN
+    monkeypatch.setattr(setting, "ADMIN_API_KEY", ADMIN["X-Admin-Key"])
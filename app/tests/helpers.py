@@ -0,0 +1,32 @@
+"""Utilidades compartidas por las pruebas que usan la API en proceso."""
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+PASSWORD = "test-password"
+# Header de administración con la clave que configura el fixture admin_key
+ADMIN = {"X-Admin-Key": "admin-test"}
+
+
+@asynccontextmanager
+async def cliente() -> AsyncIterator[httpx.AsyncClient]:
+    """Cliente ASGI contra la app (sin lifespan: no arranca el worker de ejecución)."""
+    from main import app
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def headers_jwt(client: httpx.AsyncClient, role: str) -> dict:
+    """Registra un usuario con el rol y retorna el header Authorization de su token."""
+    sufijo = uuid.uuid4().hex[:8]
+    email = f"{role.lower()}-{sufijo}@example.com"
+    response = await client.post("/api/v1/auth/usuarios", json={
+        "nombre": f"Test {role} {sufijo}", "email": email, "password": PASSWORD, "role": role
+    })
+    response.raise_for_status()
+    response = await client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
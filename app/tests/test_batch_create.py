@@ -0,0 +1,48 @@
+from tests.helpers import cliente, headers_jwt
+
+OPERADOR_V1 = {"X-User-Role": "OPERADOR", "X-User-Id": "op-test"}
+
+
+def test_lote_atomico_rechazado_no_consume_referencias(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            jwt = await headers_jwt(client, "OPERADOR")
+            primera = await client.post("/api/v2/transactions", headers=jwt, json={"amount": "1.00", "currency": "MXN"})
+            assert primera.json()["reference"] == "TRX-001"
+            # Referencia TRX cargada a mano por v1: choca con la secuencia
+            response = await client.post("/api/v1/transactions", headers=OPERADOR_V1, json={
+                "reference": "TRX-003", "amount": "1.00", "currency": "USD"
+            })
+            assert response.status_code == 201
+
+            items = [{"amount": "10.00", "currency": "MXN"}, {"amount": "20.00", "currency": "MXN"}]
+            rechazado = await client.post("/api/v2/transactions/batch", headers=jwt, json={"items": items})
+
+            creada = await client.post("/api/v2/transactions", headers=jwt, json={"amount": "5.00", "currency": "MXN"})
+            return rechazado, creada
+
+    rechazado, creada = correr(flujo())
+
+    assert rechazado.status_code == 409
+    assert rechazado.json()["created"] == 0
+    assert creada.status_code == 201
+    assert creada.json()["reference"] == "TRX-002"
+
+
+def test_lote_parcial_crea_los_validos(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            jwt = await headers_jwt(client, "OPERADOR")
+            await client.post("/api/v2/transactions", headers=jwt, json={"amount": "1.00", "currency": "MXN"})
+            await client.post("/api/v1/transactions", headers=OPERADOR_V1, json={
+                "reference": "TRX-002", "amount": "1.00", "currency": "USD"
+            })
+            items = [{"amount": "10.00", "currency": "MXN"}, {"amount": "20.00", "currency": "MXN"}]
+            return await client.post("/api/v2/transactions/batch", headers=jwt, json={"items": items, "atomic": False})
+
+    response = correr(flujo())
+
+    assert response.status_code == 207
+    resultados = response.json()["results"]
+    assert [r["success"] for r in resultados] == [False, True]
+    assert resultados[1]["transaction"]["reference"] == "TRX-003"
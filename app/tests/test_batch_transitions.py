@@ -0,0 +1,60 @@
+import uuid
+
+from tests.helpers import cliente, headers_jwt
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "op-lote"}
+APROBADOR = {"X-User-Role": "APROBADOR", "X-User-Id": "ap-lote"}
+BASE = "/api/v1/transactions"
+
+
+async def _crear(client, enviar: bool = True) -> str:
+    response = await client.post(BASE, headers=OPERADOR, json={
+        "reference": f"LT-{uuid.uuid4().hex[:8]}", "amount": "10.00", "currency": "USD"
+    })
+    transaction_id = response.json()["transaction_id"]
+    if enviar:
+        await client.post(f"{BASE}/{transaction_id}/submit", headers=OPERADOR)
+    return transaction_id
+
+
+def test_aprobar_y_ejecutar_lote_reportan_cada_id(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            pendiente, borrador = await _crear(client), await _crear(client, enviar=False)
+            inexistente = str(uuid.uuid4())
+            ids = [pendiente, borrador, inexistente, pendiente]
+
+            aprobado = await client.post(f"{BASE}/approve:batch", headers=APROBADOR, json={"transaction_ids": ids})
+            ejecutado = await client.post(f"{BASE}/execute:batch", headers=APROBADOR, json={"transaction_ids": ids})
+            return pendiente, borrador, inexistente, aprobado, ejecutado
+
+    pendiente, borrador, inexistente, aprobado, ejecutado = correr(flujo())
+
+    for response, codigo in ((aprobado, 200), (ejecutado, 202)):
+        assert response.status_code == codigo
+        cuerpo = response.json()
+        # Los IDs repetidos se procesan una vez
+        assert (cuerpo["total"], cuerpo["succeeded"], cuerpo["failed"]) == (3, 1, 2)
+        resultados = {r["transaction_id"]: r["result"] for r in cuerpo["results"]}
+        assert resultados == {pendiente: "ok", borrador: "wrong_state", inexistente: "not_found"}
+
+
+def test_ejecutar_lote_exige_rol_aprobador(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            transaction_id = await _crear(client)
+            await client.post(f"{BASE}/{transaction_id}/approve", headers=APROBADOR)
+            cuerpo = {"transaction_ids": [transaction_id]}
+            jwt_operador = await headers_jwt(client, "OPERADOR")
+            return [
+                await client.post(f"{BASE}/execute:batch", json=cuerpo),
+                await client.post(f"{BASE}/execute:batch", headers=OPERADOR, json=cuerpo),
+                await client.post("/api/v2/transactions/execute:batch", json=cuerpo),
+                await client.post("/api/v2/transactions/execute:batch", headers=jwt_operador, json=cuerpo),
+                await client.get(f"{BASE}/{transaction_id}/history"),
+            ]
+
+    *rechazos, historial = correr(flujo())
+
+    assert [r.status_code for r in rechazos] == [400, 403, 401, 403]
+    assert "EXECUTION_REQUESTED" not in [e["event_type"] for e in historial.json()]
@@ -0,0 +1,24 @@
+from tests.helpers import cliente
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "op-delete"}
+
+
+def test_eliminar_invalida_el_cache_de_lecturas(db_limpia, correr):
+    from crud.transaction import eliminar_transaccion
+    from db.database import AsyncSessionLocal
+
+    async def flujo():
+        async with cliente() as client:
+            response = await client.post("/api/v1/transactions", headers=OPERADOR, json={
+                "reference": "DEL-1", "amount": "10.00", "currency": "USD"
+            })
+            url = f"/api/v1/transactions/{response.json()['transaction_id']}"
+            cacheada = await client.get(url)
+            async with AsyncSessionLocal() as db:
+                assert await eliminar_transaccion(db, response.json()["transaction_id"])
+            return cacheada, await client.get(url)
+
+    cacheada, eliminada = correr(flujo())
+
+    assert cacheada.status_code == 200
+    assert eliminada.status_code == 404
@@ -0,0 +1,74 @@
+from tests.helpers import cliente, headers_jwt
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "op-etag"}
+
+
+def test_get_condicional_v1(db_limpia, hub, correr):
+    async def flujo():
+        async with cliente() as client:
+            creada = await client.post("/api/v1/transactions", headers=OPERADOR, json={
+                "reference": "ETAG-1", "amount": "10.00", "currency": "USD"
+            })
+            url = f"/api/v1/transactions/{creada.json()['transaction_id']}"
+            primera = await client.get(url)
+            etag = primera.headers["ETag"]
+            vigente = await client.get(url, headers={"If-None-Match": etag})
+            debil = await client.get(url, headers={"If-None-Match": f'"otro", W/{etag}'})
+            await client.post(f"{url}/submit", headers=OPERADOR)
+            tras_transicion = await client.get(url, headers={"If-None-Match": etag})
+            return primera, vigente, debil, tras_transicion
+
+    primera, vigente, debil, tras_transicion = correr(flujo())
+
+    assert primera.status_code == 200
+    assert vigente.status_code == debil.status_code == 304
+    assert vigente.content == b""
+    assert vigente.headers["ETag"] == primera.headers["ETag"]
+
+    assert tras_transicion.status_code == 200
+    assert tras_transicion.json()["status"] == "PENDING_APPROVAL"
+    assert tras_transicion.headers["ETag"] != primera.headers["ETag"]
+
+
+def test_get_condicional_v2(db_limpia, hub, correr):
+    async def flujo():
+        async with cliente() as client:
+            jwt = await headers_jwt(client, "OPERADOR")
+            creada = await client.post("/api/v2/transactions", headers=jwt, json={"amount": "10.00", "currency": "USD"})
+            url = f"/api/v2/transactions/{creada.json()['transaction_id']}"
+            primera = await client.get(url, headers=jwt)
+            etag = primera.headers["ETag"]
+            vigente = await client.get(url, headers={**jwt, "If-None-Match": etag})
+            await client.post(f"{url}/submit", headers=jwt)
+            tras_transicion = await client.get(url, headers={**jwt, "If-None-Match": etag})
+            nuevo = await client.get(url, headers={**jwt, "If-None-Match": tras_transicion.headers["ETag"]})
+            return primera, vigente, tras_transicion, nuevo
+
+    primera, vigente, tras_transicion, nuevo = correr(flujo())
+
+    assert vigente.status_code == 304
+    assert vigente.headers["ETag"] == primera.headers["ETag"]
+    assert tras_transicion.status_code == 200
+    assert tras_transicion.json()["status"] == "PENDING_APPROVAL"
+    assert tras_transicion.headers["ETag"] != primera.headers["ETag"]
+    assert nuevo.status_code == 304
+
+
+def test_listado_condicional(db_limpia, hub, correr):
+    async def flujo():
+        async with cliente() as client:
+            creada = await client.post("/api/v1/transactions", headers=OPERADOR, json={
+                "reference": "ETAG-2", "amount": "10.00", "currency": "USD"
+            })
+            primera = await client.get("/api/v1/transactions", headers=OPERADOR)
+            etag = primera.headers["ETag"]
+            vigente = await client.get("/api/v1/transactions", headers={**OPERADOR, "If-None-Match": etag})
+            await client.post(f"/api/v1/transactions/{creada.json()['transaction_id']}/submit", headers=OPERADOR)
+            tras_transicion = await client.get("/api/v1/transactions", headers={**OPERADOR, "If-None-Match": etag})
+            return vigente, tras_transicion, etag
+
+    vigente, tras_transicion, etag = correr(flujo())
+
+    assert vigente.status_code == 304
+    assert tras_transicion.status_code == 200
+    assert tras_transicion.headers["ETag"] != etag
@@ -0,0 +1,97 @@
+import re
+
+import pytest
+
+from tests.helpers import cliente, headers_jwt
+
+BASE = "/api/v2/transactions"
+
+
+def _ids(cuerpo: str) -> list:
+    return [int(i) for i in re.findall(r"^id: (\d+)$", cuerpo, flags=re.MULTILINE)]
+
+
+def test_transicion_revertida_no_publica(db_limpia, hub, correr):
+    import crud.transaction as crud_transaction
+    from db.database import AsyncSessionLocal
+    from services.transaction_service import TransactionService
+
+    suscripcion = hub.suscribir()
+
+    async def flujo():
+        async with cliente() as client:
+            jwt = await headers_jwt(client, "OPERADOR")
+            creada = await client.post(BASE, headers=jwt, json={"amount": "10.00", "currency": "USD"})
+        transaction_id = creada.json()["transaction_id"]
+        creacion = suscripcion.cola.get_nowait()
+
+        async with AsyncSessionLocal() as db:
+            async def commit_fallido():
+                await db.flush()
+                raise RuntimeError("commit fallido")
+
+            db.commit = commit_fallido
+            with pytest.raises(RuntimeError):
+                await TransactionService.enviar_a_aprobacion(db, transaction_id, "OPERADOR")
+            await db.rollback()
+            revertida = suscripcion.cola.qsize()
+
+            # Un commit posterior de la misma sesión no publica lo revertido
+            del db.commit
+            await db.commit()
+
+        async with AsyncSessionLocal() as db:
+            estado = (await crud_transaction.obtener_transaccion_por_id(db, transaction_id)).status
+        return creacion, revertida, estado
+
+    creacion, revertida, estado = correr(flujo())
+
+    assert creacion.frame.startswith(b"id: 1\nevent: CREATED\n")
+    assert revertida == 0
+    assert suscripcion.cola.empty()
+    assert hub.publicados == 1
+    assert estado.value == "DRAFT"
+
+
+@pytest.mark.parametrize("desde_buffer", [True, False], ids=["buffer", "bd"])
+def test_reconexion_con_last_event_id_repite_lo_perdido(db_limpia, hub, correr, monkeypatch, desde_buffer):
+    import api.v2.transactions as api_v2
+    from services.event_hub import EventHub
+
+    async def flujo():
+        async with cliente() as client:
+            jwt = await headers_jwt(client, "OPERADOR")
+            otro = await headers_jwt(client, "OPERADOR")
+            creada = await client.post(BASE, headers=jwt, json={"amount": "10.00", "currency": "USD"})
+            transaction_id = creada.json()["transaction_id"]
+            # Desconectado tras recibir la creación (event_id 1)
+            await client.post(f"{BASE}/{transaction_id}/submit", headers=jwt)
+            await client.post(BASE, headers=otro, json={"amount": "20.00", "currency": "USD"})
+            await client.post(BASE, headers=jwt, json={"amount": "30.00", "currency": "USD"})
+
+            actual = hub
+            if not desde_buffer:
+                # Otro proceso (o búfer reiniciado): lo perdido se lee de transaction_events
+                actual = EventHub(intervalo_sondeo=0)
+                monkeypatch.setattr(api_v2, "event_hub", actual)
+            suscribir = actual.suscribir
+
+            def suscribir_y_cerrar(created_by=None):
+                # El stream termina después de los pendientes, como al cerrar el servidor
+                suscripcion = suscribir(created_by)
+                suscripcion.cerrar()
+                return suscripcion
+
+            monkeypatch.setattr(actual, "suscribir", suscribir_y_cerrar)
+            reconexion = await client.get(f"{BASE}/stream", headers={**jwt, "Last-Event-ID": "1"})
+            invalido = await client.get(f"{BASE}/stream", headers={**jwt, "Last-Event-ID": "x"})
+            return reconexion, invalido
+
+    reconexion, invalido = correr(flujo())
+
+    assert reconexion.status_code == 200
+    assert reconexion.headers["content-type"].startswith("text/event-stream")
+    # 2: envío a aprobación; 3: creación del otro operador (no visible); 4: segunda creación
+    assert _ids(reconexion.text) == [2, 4]
+    assert "event: SUBMITTED" in reconexion.text
+    assert invalido.status_code == 400
@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta
+
+from tests.helpers import cliente
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "op-worker"}
+APROBADOR = {"X-User-Role": "APROBADOR", "X-User-Id": "ap-worker"}
+BASE = "/api/v1/transactions"
+
+
+async def _encolar(cantidad: int = 1) -> list:
+    """Transacciones APPROVED con la ejecución solicitada."""
+    ids = []
+    async with cliente() as client:
+        for i in range(cantidad):
+            response = await client.post(BASE, headers=OPERADOR, json={
+                "reference": f"EXEC-{i}", "amount": "15.00", "currency": "USD"
+            })
+            transaction_id = response.json()["transaction_id"]
+            await client.post(f"{BASE}/{transaction_id}/submit", headers=OPERADOR)
+            await client.post(f"{BASE}/{transaction_id}/approve", headers=APROBADOR)
+            encolada = await client.post(f"{BASE}/{transaction_id}/execute", headers=OPERADOR)
+            assert encolada.status_code == 202
+            ids.append(transaction_id)
+    return ids
+
+
+async def _leer(transaction_id: str):
+    from crud.event import obtener_historial
+    from crud.transaction import obtener_transaccion_por_id
+    from db.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        transaction = await obtener_transaccion_por_id(db, transaction_id)
+        eventos = [e.event_type.value for e in await obtener_historial(db, transaction_id)]
+        return transaction, eventos
+
+
+def _worker(gateway, **kwargs):
+    from services.execution_worker import ExecutionWorker
+    return ExecutionWorker(gateway=gateway, timeout=5, backoff=0, **kwargs)
+
+
+def test_ejecucion_exitosa(db_limpia, correr):
+    from services.gateway import MockGateway
+
+    gateway = MockGateway(latencia=0)
+    worker = _worker(gateway)
+
+    async def flujo():
+        ids = await _encolar(2)
+        procesadas = await worker.drenar()
+        vacia = await worker.drenar()
+        return ids, procesadas, vacia, [await _leer(i) for i in ids]
+
+    ids, procesadas, vacia, leidas = correr(flujo())
+
+    assert (procesadas, vacia) == (2, 0)
+    assert set(gateway.confirmadas) == set(ids)
+    for transaction, eventos in leidas:
+        assert transaction.status.value == "EXECUTED"
+        assert transaction.execution_attempts == 1
+        assert transaction.claimed_by is None and transaction.execution_requested_at is None
+        assert eventos[-1] == "EXECUTED"
+    assert worker.stats()["executed"] == 2
+
+
+def test_fallo_transitorio_se_reintenta(db_limpia, correr):
+    from services.gateway import MockGateway
+
+    gateway = MockGateway(latencia=0, tasa_fallo=1.0)
+    worker = _worker(gateway, max_attempts=3)
+
+    async def flujo():
+        [transaction_id] = await _encolar()
+        await worker.drenar()
+        tras_fallo = await _leer(transaction_id)
+        gateway.tasa_fallo = 0.0
+        # backoff=0: el reintento vence enseguida y vuelve a la cola
+        procesadas = await worker.drenar()
+        return tras_fallo, procesadas, await _leer(transaction_id)
+
+    (fallida, eventos_fallo), procesadas, (ejecutada, eventos) = correr(flujo())
+
+    assert fallida.status.value == "APPROVED"
+    assert fallida.execution_attempts == 1
+    assert fallida.execution_error == "Fallo simulado del gateway"
+    assert fallida.execution_requested_at is not None
+    assert eventos_fallo[-1] == "EXECUTION_FAILED"
+
+    assert procesadas == 1
+    assert ejecutada.status.value == "EXECUTED"
+    assert ejecutada.execution_attempts == 2
+    assert ejecutada.execution_error is None
+    assert eventos[-2:] == ["EXECUTION_FAILED", "EXECUTED"]
+    assert (worker.reintentos, worker.abandonadas) == (1, 0)
+
+
+def test_fallo_permanente_sale_de_la_cola(db_limpia, correr):
+    from services.gateway import GatewayError, MockGateway
+
+    class GatewayRechaza(MockGateway):
+        async def ejecutar(self, transaction):
+            raise GatewayError("Cuenta destino cerrada", reintentable=False)
+
+    worker = _worker(GatewayRechaza(latencia=0), max_attempts=3)
+
+    async def flujo():
+        [transaction_id] = await _encolar()
+        procesadas = await worker.drenar()
+        otra_vuelta = await worker.drenar()
+        return procesadas, otra_vuelta, await _leer(transaction_id)
+
+    procesadas, otra_vuelta, (transaction, eventos) = correr(flujo())
+
+    assert (procesadas, otra_vuelta) == (1, 0)
+    assert transaction.status.value == "APPROVED"
+    assert transaction.execution_attempts == 1
+    assert transaction.execution_error == "Cuenta destino cerrada"
+    assert transaction.execution_requested_at is None and transaction.claim_expires_at is None
+    assert eventos[-1] == "EXECUTION_FAILED"
+    assert (worker.reintentos, worker.abandonadas) == (0, 1)
+
+
+def test_reintentos_agotados_abandonan_la_ejecucion(db_limpia, correr):
+    from services.gateway import MockGateway
+
+    worker = _worker(MockGateway(latencia=0, tasa_fallo=1.0), max_attempts=2)
+
+    async def flujo():
+        [transaction_id] = await _encolar()
+        procesadas = [await worker.drenar() for _ in range(3)]
+        return procesadas, await _leer(transaction_id)
+
+    procesadas, (transaction, eventos) = correr(flujo())
+
+    assert procesadas == [1, 1, 0]
+    assert transaction.status.value == "APPROVED"
+    assert transaction.execution_attempts == 2
+    assert transaction.execution_requested_at is None
+    assert eventos.count("EXECUTION_FAILED") == 2
+    assert (worker.reintentos, worker.abandonadas) == (1, 1)
+
+
+def test_reserva_vencida_la_toma_otro_worker(db_limpia, correr):
+    import crud.transaction as crud_transaction
+    from db.database import AsyncSessionLocal
+    from services.gateway import MockGateway
+
+    gateway = MockGateway(latencia=0)
+    segundo = _worker(gateway)
+    segundo.worker_id = "executor:segundo"
+
+    async def flujo():
+        [transaction_id] = await _encolar()
+        # El primer worker reservó y murió: su reserva ya venció
+        async with AsyncSessionLocal() as db:
+            lote = await crud_transaction.reservar_para_ejecucion(
+                db, "executor:caido", 10, datetime.utcnow() - timedelta(seconds=1)
+            )
+            await db.commit()
+
+        procesadas = await segundo.drenar()
+
+        # El primero revive tarde: ya no tiene la reserva y no pisa el resultado
+        async with AsyncSessionLocal() as db:
+            tardias = await crud_transaction.completar_ejecuciones(db, [transaction_id], "executor:caido")
+            fallo = await crud_transaction.registrar_fallo_ejecucion(
+                db, transaction_id, "executor:caido", "tarde", None
+            )
+            await db.commit()
+        return lote, procesadas, tardias, fallo, await _leer(transaction_id)
+
+    lote, procesadas, tardias, fallo, (transaction, eventos) = correr(flujo())
+
+    assert len(lote) == 1
+    assert procesadas == 1
+    assert tardias == [] and fallo is False
+    assert transaction.status.value == "EXECUTED"
+    assert transaction.execution_attempts == 1
+    assert transaction.execution_error is None
+    assert eventos.count("EXECUTED") == 1
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from tests.helpers import cliente
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "op-idem"}
+ALCANCE = "v1:OPERADOR:op-idem"
+
+
+async def _claves() -> int:
+    from db.database import AsyncSessionLocal
+    from models.idempotency import IdempotencyKey
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(IdempotencyKey))
+
+
+def test_reintento_repite_la_respuesta_2xx(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            headers = {**OPERADOR, "Idempotency-Key": "crear-1"}
+            cuerpo = {"reference": "IDEM-1", "amount": "10.00", "currency": "USD"}
+            primera = await client.post("/api/v1/transactions", headers=headers, json=cuerpo)
+            repetida = await client.post("/api/v1/transactions", headers=headers, json=cuerpo)
+            return primera, repetida
+
+    primera, repetida = correr(flujo())
+
+    assert primera.status_code == repetida.status_code == 201
+    assert repetida.headers["Idempotent-Replayed"] == "true"
+    assert repetida.json()["transaction_id"] == primera.json()["transaction_id"]
+
+
+def test_rechazos_dependientes_del_estado_liberan_la_clave(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            response = await client.post("/api/v1/transactions", headers=OPERADOR, json={
+                "reference": "IDEM-2", "amount": "10.00", "currency": "USD"
+            })
+            url = f"/api/v1/transactions/{response.json()['transaction_id']}/approve"
+            # DRAFT: aprobar es una transición inválida (409), y el OPERADOR no puede aprobar (403)
+            aprobador = {"X-User-Role": "APROBADOR", "X-User-Id": "ap-idem", "Idempotency-Key": "aprobar-1"}
+            invalida = await client.post(url, headers=aprobador)
+            prohibida = await client.post(url, headers={**OPERADOR, "Idempotency-Key": "aprobar-2"})
+            return invalida, prohibida, await _claves()
+
+    invalida, prohibida, claves = correr(flujo())
+
+    assert invalida.status_code == 409
+    assert prohibida.status_code == 403
+    assert claves == 0
+
+
+def test_sin_identidad_no_registra_la_clave(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            await client.post("/api/v2/transactions", headers={"Idempotency-Key": "anon-1"}, json={
+                "amount": "10.00", "currency": "USD"
+            })
+            return await _claves()
+
+    assert correr(flujo()) == 0
+
+
+def test_clave_en_curso_solo_se_toma_con_el_lease_vencido(db_limpia, correr, monkeypatch):
+    from core.config import setting
+    from core.idempotency import _hash_solicitud
+    from db.database import AsyncSessionLocal
+    from models.idempotency import IdempotencyKey
+    import orjson
+
+    monkeypatch.setattr(setting, "IDEMPOTENCY_WAIT_SECONDS", 0.2)
+    cuerpo = {"reference": "IDEM-3", "amount": "10.00", "currency": "USD"}
+    request_hash = _hash_solicitud({"method": "POST", "path": "/api/v1/transactions"}, orjson.dumps(cuerpo))
+
+    async def flujo():
+        ahora = datetime.utcnow()
+        # Otro worker la ejecuta desde hace más de IDEMPOTENCY_LOCK_SECONDS, pero renovó el lease
+        async with AsyncSessionLocal() as db:
+            db.add(IdempotencyKey(
+                scope=ALCANCE, key="lenta", request_hash=request_hash,
+                created_at=ahora - timedelta(seconds=setting.IDEMPOTENCY_LOCK_SECONDS * 5),
+                expires_at=ahora + timedelta(hours=1), lock_expires_at=ahora + timedelta(seconds=30)
+            ))
+            await db.commit()
+
+        async with cliente() as client:
+            headers = {**OPERADOR, "Idempotency-Key": "lenta", "Content-Type": "application/json"}
+            en_curso = await client.post("/api/v1/transactions", headers=headers, content=orjson.dumps(cuerpo))
+
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(IdempotencyKey).values(lock_expires_at=ahora - timedelta(seconds=1)))
+                await db.commit()
+            tomada = await client.post("/api/v1/transactions", headers=headers, content=orjson.dumps(cuerpo))
+            return en_curso, tomada
+
+    en_curso, tomada = correr(flujo())
+
+    assert en_curso.status_code == 409
+    assert tomada.status_code == 201
+
+
+def test_respuesta_enviada_sin_guardar_no_se_repite(db_limpia, correr, monkeypatch):
+    import crud.idempotency as crud_idempotency
+    from db.database import AsyncSessionLocal
+    from models.transaction import Transaction
+
+    guardar_respuesta = crud_idempotency.guardar_respuesta
+    llamadas = []
+
+    async def falla_la_primera(db, *args):
+        llamadas.append(args)
+        if len(llamadas) == 1:
+            raise RuntimeError("BD no disponible")
+        await guardar_respuesta(db, *args)
+
+    monkeypatch.setattr(crud_idempotency, "guardar_respuesta", falla_la_primera)
+
+    async def flujo():
+        async with cliente() as client:
+            headers = {**OPERADOR, "Idempotency-Key": "sin-guardar"}
+            cuerpo = {"reference": "IDEM-4", "amount": "10.00", "currency": "USD"}
+            primera = await client.post("/api/v1/transactions", headers=headers, json=cuerpo)
+            reintento = await client.post("/api/v1/transactions", headers=headers, json=cuerpo)
+        async with AsyncSessionLocal() as db:
+            creadas = await db.scalar(select(func.count()).select_from(Transaction))
+        return primera, reintento, creadas
+
+    primera, reintento, creadas = correr(flujo())
+
+    assert primera.status_code == 201
+    assert reintento.status_code == 409
+    assert reintento.headers["Idempotent-Replayed"] == "true"
+    assert "respuesta no está disponible" in reintento.json()["detail"]
+    assert creadas == 1
@@ -0,0 +1,48 @@
+from tests.helpers import ADMIN, cliente, headers_jwt
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "op-metrics"}
+
+
+def _fallos(metricas: str, api: str) -> float:
+    linea = f'auth_failures_total{{api="{api}",reason="forbidden_role"}} '
+    return next((float(l[len(linea):]) for l in metricas.splitlines() if l.startswith(linea)), 0.0)
+
+
+def test_rechazos_por_rol_se_cuentan_una_vez_con_su_api(db_limpia, admin_key, correr):
+    async def flujo():
+        async with cliente() as client:
+            antes = (await client.get("/metrics", headers=ADMIN)).text
+            response = await client.post("/api/v1/transactions", headers=OPERADOR, json={
+                "reference": "MET-1", "amount": "10.00", "currency": "USD"
+            })
+            transaction_id = response.json()["transaction_id"]
+            v1 = await client.post(f"/api/v1/transactions/{transaction_id}/approve", headers=OPERADOR)
+            jwt = await headers_jwt(client, "OPERADOR")
+            v2 = await client.post(f"/api/v2/transactions/{transaction_id}/approve", headers=jwt)
+            despues = (await client.get("/metrics", headers=ADMIN)).text
+            return antes, v1, v2, despues
+
+    antes, v1, v2, despues = correr(flujo())
+
+    assert v1.status_code == v2.status_code == 403
+    assert _fallos(despues, "v1") - _fallos(antes, "v1") == 1
+    assert _fallos(despues, "v2") - _fallos(antes, "v2") == 1
+
+
+def test_metricas_requieren_clave_de_admin(admin_key, correr, monkeypatch):
+    from core.config import setting
+
+    async def flujo():
+        async with cliente() as client:
+            sin_clave = await client.get("/metrics")
+            clave_invalida = await client.get("/metrics", headers={"X-Admin-Key": "otra"})
+            con_clave = await client.get("/metrics", headers=ADMIN)
+            monkeypatch.setattr(setting, "METRICS_PUBLIC", True)
+            publicas = await client.get("/metrics")
+            return sin_clave, clave_invalida, con_clave, publicas
+
+    sin_clave, clave_invalida, con_clave, publicas = correr(flujo())
+
+    assert sin_clave.status_code == clave_invalida.status_code == 403
+    assert con_clave.status_code == publicas.status_code == 200
+    assert "http_requests_total" in con_clave.text
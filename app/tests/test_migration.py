@@ -0,0 +1,56 @@
+from sqlalchemy import inspect, text
+
+# Tabla transactions antes de las reservas de aprobación y la cola de ejecución
+TRANSACTIONS_ANTERIOR = """
+CREATE TABLE transactions (
+    transaction_id VARCHAR NOT NULL PRIMARY KEY,
+    reference VARCHAR NOT NULL,
+    amount NUMERIC(18, 2) NOT NULL,
+    currency VARCHAR(3) NOT NULL,
+    status VARCHAR(16) NOT NULL,
+    created_by VARCHAR NOT NULL,
+    approved_by VARCHAR,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL
+)
+"""
+
+
+def _bd_anterior():
+    import init_db
+    from db.database import engine
+
+    init_db.drop_all_tables()
+    with engine.begin() as conn:
+        conn.execute(text(TRANSACTIONS_ANTERIOR))
+        conn.execute(text("CREATE UNIQUE INDEX ix_transactions_reference ON transactions (reference)"))
+        conn.execute(text(
+            "INSERT INTO transactions (transaction_id, reference, amount, currency, status, created_by, created_at, updated_at) "
+            "VALUES ('t-1', 'REF-1', 10.00, 'USD', 'DRAFT', 'op-1', '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        ))
+
+
+def test_migracion_agrega_columnas_e_indices_sin_perder_filas(correr):
+    import init_db
+    from db.database import engine, AsyncSessionLocal
+    from crud.transaction import obtener_transaccion_por_id
+
+    _bd_anterior()
+    init_db.init_db()
+    # Idempotente: una segunda corrida no hace nada
+    init_db.init_db()
+
+    inspector = inspect(engine)
+    columnas = {c["name"] for c in inspector.get_columns("transactions")}
+    indices = {i["name"] for i in inspector.get_indexes("transactions")}
+    assert {"claimed_by", "claim_expires_at", "execution_requested_at", "execution_attempts", "execution_error"} <= columnas
+    assert {"ix_transactions_created_at_id", "ix_transactions_status_execution_requested_at"} <= indices
+
+    async def leer():
+        async with AsyncSessionLocal() as db:
+            return await obtener_transaccion_por_id(db, "t-1")
+
+    transaction = correr(leer())
+    assert transaction.reference == "REF-1"
+    assert transaction.claimed_by is None
+    assert transaction.execution_attempts == 0
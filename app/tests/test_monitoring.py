@@ -0,0 +1,30 @@
+from tests.helpers import ADMIN, cliente, headers_jwt
+
+RUTAS = ["pool", "cache", "executor", "stream"]
+
+
+def test_monitoreo_solo_para_administradores(db_limpia, admin_key, correr):
+    async def flujo():
+        async with cliente() as client:
+            jwt = await headers_jwt(client, "APROBADOR")
+            respuestas = {}
+            for ruta in RUTAS:
+                url = f"/api/v2/monitoring/{ruta}"
+                respuestas[ruta] = (
+                    (await client.get(url)).status_code,
+                    (await client.get(url, headers=jwt)).status_code,
+                    (await client.get(url, headers=ADMIN)).status_code,
+                )
+            return respuestas
+
+    respuestas = correr(flujo())
+
+    assert respuestas == {ruta: (403, 403, 200) for ruta in RUTAS}
+
+
+def test_monitoreo_cerrado_sin_admin_api_key(correr):
+    async def flujo():
+        async with cliente() as client:
+            return (await client.get("/api/v2/monitoring/pool", headers=ADMIN)).status_code
+
+    assert correr(flujo()) == 403
@@ -0,0 +1,66 @@
+import base64
+from datetime import datetime
+
+import pytest
+
+from tests.helpers import cliente
+
+
+def _sembrar(cantidad: int, created_at: datetime):
+    from db.database import AsyncSessionLocal
+    from models.transaction import Transaction
+
+    async def sembrar():
+        async with AsyncSessionLocal() as db:
+            db.add_all(
+                Transaction(
+                    reference=f"PAG-{i}", amount="1.00", currency="USD", created_by="op-pag",
+                    created_at=created_at, updated_at=created_at
+                )
+                for i in range(cantidad)
+            )
+            await db.commit()
+
+    return sembrar()
+
+
+def test_cursor_recorre_cada_fila_una_vez_con_fechas_repetidas(db_limpia, correr):
+    # Todas con el mismo created_at: el orden lo desempata transaction_id
+    correr(_sembrar(21, datetime(2024, 1, 1, 12, 0, 0)))
+
+    async def recorrer():
+        vistas, paginas, params = [], 0, {"limit": 7}
+        async with cliente() as client:
+            while True:
+                response = await client.get("/api/v1/transactions", params=params)
+                assert response.status_code == 200
+                vistas += [t["transaction_id"] for t in response.json()]
+                paginas += 1
+                cursor = response.headers.get("X-Next-Cursor")
+                if cursor is None:
+                    return vistas, paginas
+                params = {"limit": 7, "cursor": cursor}
+
+    vistas, paginas = correr(recorrer())
+
+    assert len(vistas) == len(set(vistas)) == 21
+    # 3 páginas llenas + una vacía que confirma el final
+    assert paginas == 4
+
+
+@pytest.mark.parametrize("cursor", [
+    "no-es-base64!",
+    base64.urlsafe_b64encode(b"no es json").decode(),
+    base64.urlsafe_b64encode(b"[1]").decode(),
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    base64.urlsafe_b64encode(b'["ayer", "t-1"]').decode(),
+])
+def test_cursor_malformado_responde_400(cursor, db_limpia, correr):
+    async def listar():
+        async with cliente() as client:
+            return await client.get("/api/v1/transactions", params={"cursor": cursor})
+
+    response = correr(listar())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor de paginación inválido"
@@ -0,0 +1,66 @@
+"""Máximo de consultas SQL por endpoint (mismo presupuesto que benchmarks/query_budget.py)."""
+from benchmarks.query_budget import PRESUPUESTO
+from db.query_metrics import assert_max_queries
+from tests.helpers import cliente, headers_jwt
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "budget-op"}
+APROBADOR = {"X-User-Role": "APROBADOR", "X-User-Id": "budget-ap"}
+
+
+def test_presupuesto_v1(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            base = "/api/v1/transactions"
+            with assert_max_queries(PRESUPUESTO["v1 crear"]):
+                response = await client.post(base, headers=OPERADOR, json={
+                    "reference": "QB-1", "amount": "10.00", "currency": "USD"
+                })
+            assert response.status_code == 201
+            url = f"{base}/{response.json()['transaction_id']}"
+
+            with assert_max_queries(PRESUPUESTO["v1 enviar"]):
+                assert (await client.post(f"{url}/submit", headers=OPERADOR)).status_code == 200
+            with assert_max_queries(PRESUPUESTO["v1 aprobar"]):
+                assert (await client.post(f"{url}/approve", headers=APROBADOR)).status_code == 200
+            with assert_max_queries(PRESUPUESTO["v1 consultar (miss)"]):
+                assert (await client.get(url)).status_code == 200
+            with assert_max_queries(PRESUPUESTO["v1 consultar (hit)"]):
+                assert (await client.get(url)).status_code == 200
+            with assert_max_queries(PRESUPUESTO["v1 listar"]):
+                assert (await client.get(base, params={"limit": 20})).status_code == 200
+            with assert_max_queries(PRESUPUESTO["v1 historial"]):
+                assert (await client.get(f"{url}/history")).status_code == 200
+            with assert_max_queries(PRESUPUESTO["v1 ejecutar"]):
+                assert (await client.post(f"{url}/execute", headers=APROBADOR)).status_code == 202
+            with assert_max_queries(PRESUPUESTO["v1 transición inválida"]):
+                assert (await client.post(f"{url}/submit", headers=OPERADOR)).status_code == 409
+
+    correr(flujo())
+
+
+def test_presupuesto_v2(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            base = "/api/v2/transactions"
+            jwt = await headers_jwt(client, "OPERADOR")
+            # Sin medir: carga el usuario en cache y crea el contador TRX
+            assert (await client.post(base, headers=jwt, json={"amount": "1.00", "currency": "MXN"})).status_code == 201
+
+            with assert_max_queries(PRESUPUESTO["v2 crear"]):
+                response = await client.post(base, headers=jwt, json={"amount": "20.00", "currency": "MXN"})
+            assert response.status_code == 201
+            transaction_id = response.json()["transaction_id"]
+
+            with assert_max_queries(PRESUPUESTO["v2 enviar"]):
+                assert (await client.post(f"{base}/{transaction_id}/submit", headers=jwt)).status_code == 200
+            with assert_max_queries(PRESUPUESTO["v1 rechazar"]):
+                response = await client.post(f"/api/v1/transactions/{transaction_id}/reject", headers=APROBADOR)
+                assert response.status_code == 200
+            with assert_max_queries(PRESUPUESTO["v2 consultar"]):
+                assert (await client.get(f"{base}/{transaction_id}", headers=jwt)).status_code == 200
+            with assert_max_queries(PRESUPUESTO["v2 listar"]):
+                assert (await client.get(base, headers=jwt, params={"limit": 20})).status_code == 200
+            with assert_max_queries(PRESUPUESTO["v2 preview referencia"]):
+                assert (await client.get(f"{base}/next-reference/preview", headers=jwt)).status_code == 200
+
+    correr(flujo())
@@ -0,0 +1,89 @@
+"""
+Planes (EXPLAIN) de las consultas calientes: filtros del listado, cursor y
+colas de aprobación/ejecución. Quitar uno de sus índices hace fallar la prueba.
+Misma verificación que benchmarks/query_plans.py, con menos filas.
+"""
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select
+
+from benchmarks.query_plans import INICIO, analizar_plan, escenarios, sembrar
+from crud.transaction import _aplicar_filtros, _candidatas, _cola_aprobacion, _cola_ejecucion, _paginar
+from models.transaction import Transaction
+
+CURSOR = (INICIO + timedelta(days=180), "00000000-0000-0000-0000-000000000000")
+
+# Índice que debe usar cada filtro (None: cualquiera, sin scan completo)
+INDICE_POR_FILTRO = {
+    "status": "ix_transactions_status_created_at_id",
+    "currency": "ix_transactions_currency_created_at_id",
+    "created_by": "ix_transactions_created_by_created_at_id",
+    "approved_by": "ix_transactions_approved_by_created_at_id",
+    "amount_range": "ix_transactions_amount",
+    "created_range": "ix_transactions_created_at_id",
+    "updated_range": "ix_transactions_updated_at",
+    "created_by+status": "ix_transactions_created_by_created_at_id",
+    "status+currency": None,
+}
+
+
+@pytest.fixture(scope="module")
+def conn():
+    import init_db
+    from db.database import engine
+
+    init_db.reset_db()
+    with engine.begin() as c:
+        sembrar(c, 2000, seed=42)
+    with engine.connect() as c:
+        yield c
+
+
+def _plan(conn, query):
+    lineas, secuencial = analizar_plan(conn, query)
+    return " | ".join(lineas), secuencial
+
+
+@pytest.mark.parametrize("nombre", list(INDICE_POR_FILTRO))
+def test_filtros_del_listado_usan_su_indice(conn, nombre):
+    query = _paginar(_aplicar_filtros(select(Transaction), escenarios()[nombre]), 0, 100, None)
+    plan, secuencial = _plan(conn, query)
+
+    assert not secuencial, plan
+    if INDICE_POR_FILTRO[nombre]:
+        assert INDICE_POR_FILTRO[nombre] in plan
+
+
+def test_primera_pagina_recorre_el_indice_de_orden_sin_ordenar(conn):
+    plan, _ = _plan(conn, _paginar(select(Transaction), 0, 100, None))
+
+    # Sin filtros se recorre el índice en orden y el LIMIT corta: nunca un sort de la tabla
+    assert "ix_transactions_created_at_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.parametrize("created_by, indice", [
+    (None, "ix_transactions_created_at_id"),
+    ("op-042", "ix_transactions_created_by_created_at_id"),
+])
+def test_pagina_con_cursor_busca_desde_el_cursor(conn, created_by, indice):
+    query = select(Transaction)
+    if created_by:
+        query = query.where(Transaction.created_by == created_by)
+    plan, secuencial = _plan(conn, _paginar(query, 0, 100, CURSOR))
+
+    assert not secuencial, plan
+    assert indice in plan
+    assert "TEMP B-TREE FOR ORDER BY" not in plan
+
+
+@pytest.mark.parametrize("cola, indice", [
+    (_cola_aprobacion, "ix_transactions_status_created_at_id"),
+    (_cola_ejecucion, "ix_transactions_status_execution_requested_at"),
+])
+def test_colas_de_reserva_usan_su_indice(conn, cola, indice):
+    plan, secuencial = _plan(conn, _candidatas(*cola(), 50))
+
+    assert not secuencial, plan
+    assert indice in plan
@@ -0,0 +1,49 @@
+import asyncio
+
+from services.reference_service import ReferenceService
+from services.sequence_service import SequenceAllocator
+
+
+def test_referencias_concurrentes_sin_duplicados(db_limpia, correr):
+    async def asignar():
+        lotes = await asyncio.gather(*(ReferenceService.generar_references(5) for _ in range(20)))
+        sueltas = await asyncio.gather(*(ReferenceService.generar_siguiente_reference() for _ in range(20)))
+        return [ref for lote in lotes for ref in lote] + list(sueltas)
+
+    referencias = correr(asignar())
+
+    assert len(referencias) == 120
+    assert len(set(referencias)) == len(referencias)
+    assert sorted(int(r.split("-")[1]) for r in referencias) == list(range(1, 121))
+
+
+def test_bloques_de_varios_asignadores_sin_duplicados(db_limpia, correr):
+    # Cada asignador simula un worker con su propio bloque hi/lo en memoria
+    asignadores = [SequenceAllocator(block_size=7) for _ in range(3)]
+
+    async def seed(db):
+        return 0
+
+    async def asignar():
+        tareas = [a.siguiente("test:bloques", seed) for a in asignadores for _ in range(25)]
+        tareas += [a.reservar("test:bloques", 4, seed) for a in asignadores]
+        resultados = await asyncio.gather(*tareas)
+        return [n for r in resultados for n in (r if isinstance(r, list) else [r])]
+
+    numeros = correr(asignar())
+
+    assert len(numeros) == 3 * 25 + 3 * 4
+    assert len(set(numeros)) == len(numeros)
+
+
+def test_asignador_usable_desde_varios_event_loops(db_limpia, correr):
+    # Como el singleton de ReferenceService: un asyncio.run por script o prueba
+    asignador = SequenceAllocator(block_size=1)
+
+    async def asignar():
+        return await asyncio.gather(*(asignador.siguiente("test:loops") for _ in range(5)))
+
+    primeros = correr(asignar())
+    segundos = correr(asignar())
+
+    assert sorted(primeros + segundos) == list(range(1, 11))
@@ -0,0 +1,60 @@
+"""La salida con orjson es idéntica byte a byte a la del encoder anterior (JSONResponse + response_model)."""
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from tests.helpers import cliente
+
+
+def _encoder_anterior(contenido) -> bytes:
+    return JSONResponse(jsonable_encoder(contenido)).body
+
+
+def test_transaccion_listado_e_historial_identicos_al_encoder_anterior(db_limpia, correr):
+    import crud.event as crud_event
+    from crud.transaction import obtener_transaccion_por_id
+    from db.database import AsyncSessionLocal
+    from models.transaction import Transaction, TransactionStatus
+    from schemas.transaction import TransactionEventResponse, TransactionResponse
+
+    async def flujo():
+        async with AsyncSessionLocal() as db:
+            # Microsegundos, centavos, montos grandes y texto no ASCII
+            db.add_all([
+                Transaction(
+                    transaction_id="t-ser-1", reference="SER-ñ-1", amount="98765432.05", currency="MXN",
+                    status=TransactionStatus.APPROVED, created_by="operador-ñ", approved_by="ap-ü",
+                    created_at=datetime(2024, 2, 29, 23, 59, 59, 123456), updated_at=datetime(2024, 3, 1, 0, 0, 0, 1)
+                ),
+                Transaction(
+                    transaction_id="t-ser-2", reference="SER-2", amount="10.00", currency="USD",
+                    created_by="op-1", created_at=datetime(2024, 3, 1), updated_at=datetime(2024, 3, 1)
+                ),
+            ])
+            await db.commit()
+
+        async with cliente() as client:
+            response = await client.post("/api/v1/transactions", headers={"X-User-Role": "OPERADOR", "X-User-Id": "op-3"}, json={
+                "reference": "SER-3", "amount": "0.10", "currency": "EUR"
+            })
+            creada = response.json()["transaction_id"]
+            await client.post(f"/api/v1/transactions/{creada}/submit", headers={"X-User-Role": "OPERADOR", "X-User-Id": "op-3"})
+            individual = await client.get("/api/v1/transactions/t-ser-1")
+            listado = await client.get("/api/v1/transactions", params={"limit": 10})
+            historial = await client.get(f"/api/v1/transactions/{creada}/history")
+
+        async with AsyncSessionLocal() as db:
+            fila = await obtener_transaccion_por_id(db, "t-ser-1")
+            filas = [await obtener_transaccion_por_id(db, i) for i in ("t-ser-1", "t-ser-2", creada)]
+            eventos = await crud_event.obtener_historial(db, creada)
+            esperado = (
+                _encoder_anterior(TransactionResponse.model_validate(fila)),
+                _encoder_anterior([TransactionResponse.model_validate(f) for f in filas]),
+                _encoder_anterior([TransactionEventResponse.model_validate(e) for e in eventos]),
+            )
+        return (individual.content, listado.content, historial.content), esperado
+
+    obtenido, esperado = correr(flujo())
+
+    assert obtenido == esperado
@@ -0,0 +1,67 @@
+import uuid
+
+from sqlalchemy import delete
+
+from tests.helpers import cliente
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "op-resumen"}
+APROBADOR = {"X-User-Role": "APROBADOR", "X-User-Id": "ap-resumen"}
+BASE = "/api/v1/transactions"
+
+
+async def _crear(client, amount: str, currency: str) -> str:
+    response = await client.post(BASE, headers=OPERADOR, json={
+        "reference": f"RS-{uuid.uuid4().hex[:8]}", "amount": amount, "currency": currency
+    })
+    return response.json()["transaction_id"]
+
+
+async def _movimientos():
+    """Creaciones, transiciones (lote incluido) y un borrado."""
+    from crud.transaction import eliminar_transaccion
+    from db.database import AsyncSessionLocal
+
+    async with cliente() as client:
+        ids = [await _crear(client, monto, moneda) for monto, moneda in [
+            ("10.50", "USD"), ("20.25", "USD"), ("30.00", "MXN"), ("40.10", "MXN"), ("5.00", "EUR")
+        ]]
+        for transaction_id in ids[:4]:
+            await client.post(f"{BASE}/{transaction_id}/submit", headers=OPERADOR)
+        await client.post(f"{BASE}/{ids[0]}/approve", headers=APROBADOR)
+        await client.post(f"{BASE}/{ids[1]}/reject", headers=APROBADOR)
+        await client.post(f"{BASE}/approve:batch", headers=APROBADOR, json={"transaction_ids": ids[2:4]})
+        await client.post(f"{BASE}/batch", headers=OPERADOR, json={"items": [
+            {"reference": f"RS-L-{i}-{uuid.uuid4().hex[:6]}", "amount": "1.00", "currency": "COP"} for i in range(3)
+        ]})
+
+    async with AsyncSessionLocal() as db:
+        assert await eliminar_transaccion(db, ids[2])
+
+
+def test_resumen_incremental_coincide_con_el_recalculado(db_limpia, correr):
+    from db.database import engine
+    from rebuild_summary import leer_resumen, recalcular
+
+    correr(_movimientos())
+
+    with engine.connect() as conn:
+        assert leer_resumen(conn) == recalcular(conn)
+
+
+def test_migracion_carga_el_resumen_vacio(db_limpia, correr):
+    import init_db
+    from db.database import engine
+    from models.summary import TransactionSummary
+    from rebuild_summary import leer_resumen, recalcular
+
+    correr(_movimientos())
+    # BD anterior al resumen: transacciones sin filas en transaction_summary
+    with engine.begin() as conn:
+        conn.execute(delete(TransactionSummary))
+
+    init_db.init_db()
+
+    with engine.connect() as conn:
+        esperado = recalcular(conn)
+        assert esperado
+        assert leer_resumen(conn) == esperado
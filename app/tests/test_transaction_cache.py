@@ -0,0 +1,44 @@
+import pytest
+
+from tests.helpers import cliente
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "op-cache"}
+APROBADOR = {"X-User-Role": "APROBADOR", "X-User-Id": "ap-cache"}
+
+
+@pytest.mark.parametrize("backend", ["memory", "kv"])
+def test_transicion_invalida_el_cache(db_limpia, hub, correr, monkeypatch, backend):
+    import services.transaction_cache as transaction_cache
+
+    cache = transaction_cache.crear_backend(backend)
+    monkeypatch.setattr(transaction_cache, "transaction_cache", cache)
+
+    async def flujo():
+        lecturas = []
+        async with cliente() as client:
+            creada = await client.post("/api/v1/transactions", headers=OPERADOR, json={
+                "reference": f"CACHE-{backend}", "amount": "10.00", "currency": "USD"
+            })
+            transaction_id = creada.json()["transaction_id"]
+            url = f"/api/v1/transactions/{transaction_id}"
+            lecturas.append(await client.get(url))
+            lecturas.append(await client.get(url))
+            en_cache = cache.get(transaction_id) is not None
+
+            await client.post(f"{url}/submit", headers=OPERADOR)
+            lecturas.append(await client.get(url))
+            await client.post(f"{url}/approve", headers=APROBADOR)
+            lecturas.append(await client.get(url))
+            lecturas.append(await client.get(url))
+        return en_cache, lecturas
+
+    en_cache, lecturas = correr(flujo())
+
+    assert en_cache
+    estados = [r.json()["status"] for r in lecturas]
+    assert estados == ["DRAFT", "DRAFT", "PENDING_APPROVAL", "APPROVED", "APPROVED"]
+    etags = [r.headers["ETag"] for r in lecturas]
+    assert etags[0] == etags[1] and etags[3] == etags[4]
+    assert len({etags[0], etags[2], etags[3]}) == 3
+    assert lecturas[3].json()["approved_by"] == APROBADOR["X-User-Id"]
+    assert cache.stats()["hits"] >= 2
@@ -0,0 +1,63 @@
+import asyncio
+import uuid
+
+from tests.helpers import cliente
+
+OPERADOR = {"X-User-Role": "OPERADOR", "X-User-Id": "op-trans"}
+APROBADORES = [{"X-User-Role": "APROBADOR", "X-User-Id": f"ap-trans-{i}"} for i in range(2)]
+BASE = "/api/v1/transactions"
+
+
+async def _pendiente(client) -> str:
+    response = await client.post(BASE, headers=OPERADOR, json={
+        "reference": f"TR-{uuid.uuid4().hex[:8]}", "amount": "10.00", "currency": "USD"
+    })
+    transaction_id = response.json()["transaction_id"]
+    assert (await client.post(f"{BASE}/{transaction_id}/submit", headers=OPERADOR)).status_code == 200
+    return transaction_id
+
+
+def test_aprobaciones_concurrentes_una_gana_y_otra_recibe_409(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            transaction_id = await _pendiente(client)
+            respuestas = await asyncio.gather(*(
+                client.post(f"{BASE}/{transaction_id}/approve", headers=h) for h in APROBADORES
+            ))
+            final = await client.get(f"{BASE}/{transaction_id}")
+            historial = await client.get(f"{BASE}/{transaction_id}/history")
+            return respuestas, final.json(), historial.json()
+
+    respuestas, final, historial = correr(flujo())
+
+    assert sorted(r.status_code for r in respuestas) == [200, 409]
+    ganador = next(h["X-User-Id"] for h, r in zip(APROBADORES, respuestas) if r.status_code == 200)
+    assert final["status"] == "APPROVED"
+    assert final["approved_by"] == ganador
+    # Una sola transición registrada
+    assert [e["event_type"] for e in historial].count("APPROVED") == 1
+
+
+def test_transicion_de_id_inexistente_responde_404(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            transaction_id = str(uuid.uuid4())
+            return [
+                await client.post(f"{BASE}/{transaction_id}/submit", headers=OPERADOR),
+                await client.post(f"{BASE}/{transaction_id}/approve", headers=APROBADORES[0]),
+                await client.post(f"{BASE}/{transaction_id}/reject", headers=APROBADORES[0]),
+            ]
+
+    assert [r.status_code for r in correr(flujo())] == [404, 404, 404]
+
+
+def test_transicion_desde_estado_incorrecto_responde_409(db_limpia, correr):
+    async def flujo():
+        async with cliente() as client:
+            transaction_id = await _pendiente(client)
+            return await client.post(f"{BASE}/{transaction_id}/submit", headers=OPERADOR)
+
+    response = correr(flujo())
+
+    assert response.status_code == 409
+    assert "PENDING_APPROVAL" in response.json()["detail"]
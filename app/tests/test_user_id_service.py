@@ -0,0 +1,43 @@
+from db.database import AsyncSessionLocal
+from models.transaction import UserRole
+from models.user import Usuario
+from services.user_id_service import UserIdService
+
+
+def test_seed_solo_considera_ids_con_el_formato_exacto(db_limpia, correr):
+    async def sembrar_y_generar():
+        async with AsyncSessionLocal() as db:
+            for i, user_id in enumerate(["op-005", "op-12abc", "op-", "xop-900", "ap-050"]):
+                db.add(Usuario(user_id=user_id, nombre=f"U{i}", email=f"u{i}@example.com", role=UserRole.OPERADOR))
+            await db.commit()
+        return await UserIdService.generar_siguiente_user_id(UserRole.OPERADOR)
+
+    assert correr(sembrar_y_generar()) == "op-006"
+
+
+def test_registro_fallido_no_deja_hueco_en_los_user_id(db_limpia, correr):
+    import asyncio
+    from crud.user import crear_usuario
+    from schemas.user import UsuarioCreate
+
+    def datos(nombre: str, email: str) -> UsuarioCreate:
+        return UsuarioCreate(nombre=nombre, email=email, password="secreto", role=UserRole.OPERADOR)
+
+    async def registrar(usuario: UsuarioCreate):
+        async with AsyncSessionLocal() as db:
+            try:
+                return (await crear_usuario(db, usuario)).user_id
+            except ValueError:
+                return None
+
+    async def flujo():
+        # Mismo email en paralelo: ambos pasan la validación previa y uno falla en el commit
+        duplicados = await asyncio.gather(
+            registrar(datos("Uno", "dup@example.com")), registrar(datos("Dos", "dup@example.com"))
+        )
+        return duplicados, await registrar(datos("Tres", "tres@example.com"))
+
+    duplicados, siguiente = correr(flujo())
+
+    assert set(duplicados) == {"op-001", None}
+    assert siguiente == "op-002"
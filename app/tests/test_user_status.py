@@ -0,0 +1,51 @@
+from tests.helpers import ADMIN, PASSWORD, cliente, headers_jwt
+
+
+def test_deshabilitar_revoca_tokens_y_bloquea_login(db_limpia, admin_key, correr):
+    from core.revocation import revocation_list
+
+    async def flujo():
+        async with cliente() as client:
+            jwt = await headers_jwt(client, "OPERADOR")
+            perfil = (await client.get("/api/v1/auth/usuarios/me", headers=jwt)).json()
+            base = f"/api/v1/auth/usuarios/{perfil['user_id']}"
+
+            sin_clave = await client.post(f"{base}/disable")
+            deshabilitado = await client.post(f"{base}/disable", headers=ADMIN)
+            con_token = await client.get("/api/v2/transactions", headers=jwt)
+            login = await client.post("/api/v1/auth/login", data={"username": perfil["email"], "password": PASSWORD})
+
+            habilitado = await client.post(f"{base}/enable", headers=ADMIN)
+            tras_habilitar = await client.get("/api/v2/transactions", headers=jwt)
+            return perfil, sin_clave, deshabilitado, con_token, login, habilitado, tras_habilitar
+
+    perfil, sin_clave, deshabilitado, con_token, login, habilitado, tras_habilitar = correr(flujo())
+
+    assert sin_clave.status_code == 403
+    assert deshabilitado.status_code == 200
+    assert deshabilitado.json()["is_active"] is False
+    assert con_token.status_code == 401
+    assert login.status_code == 403
+    assert habilitado.json()["is_active"] is True
+    assert tras_habilitar.status_code == 200
+    assert not revocation_list.esta_revocado({"user_id": perfil["user_id"]})
+
+
+def test_sincronizacion_carga_deshabilitados_de_otro_worker(db_limpia, admin_key, correr):
+    from core.revocation import revocation_list
+    from services.revocation_sync import revocation_sync
+
+    async def flujo():
+        async with cliente() as client:
+            jwt = await headers_jwt(client, "APROBADOR")
+            perfil = (await client.get("/api/v1/auth/usuarios/me", headers=jwt)).json()
+            await client.post(f"/api/v1/auth/usuarios/{perfil['user_id']}/disable", headers=ADMIN)
+            # Otro worker: su lista en memoria no se enteró de la deshabilitación
+            revocation_list.reemplazar_usuarios([])
+            await revocation_sync.sincronizar()
+            return perfil
+
+    perfil = correr(flujo())
+
+    assert revocation_list.esta_revocado({"user_id": perfil["user_id"]})
+    revocation_list.reemplazar_usuarios([])